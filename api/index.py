@@ -5,154 +5,335 @@ FastAPI application with embedded OCR service for property management
 """
 
 # ===== IMPORTS =====
-from fastapi import FastAPI, UploadFile, File, Form, Query, Response
+from fastapi import FastAPI, UploadFile, File, Form, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
 import json
 import io
+import logging
 import os
-from PIL import Image
-import tempfile
+import threading
+import time
+import zlib
 
 # ===== GOOGLE VISION OCR SERVICE =====
-from google.cloud import vision
+from shared.cached_responses import CachedJSON
+from shared.compression import CompressionMiddleware, CompressionStats, compression_options_from_env
+from shared.image_preprocessing import preprocessor_from_env
+from shared.metrics import MetricsMiddleware, MetricsRegistry
+from shared.ocr_backfill import DEFAULT_CHUNK_SIZE, backfill_processes_from_env, backfill_store, backfill_token_valid
+from shared.ocr_backends import backend_mode_from_env, fake_backend_from_env, recording_backend_from_env
+from shared.ocr_cache import cache_from_env
+from shared.ocr_fields import extract_fields
+from shared.ocr_jobs import QueueFull, job_queue_from_env
+from shared.profiling import ProfilingMiddleware, admin_token_valid, profile_store_from_env, profiling_options_from_env
+from shared.scan_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, ScanStore
+from shared.structured_logging import (RequestContextMiddleware, configure_logging, debug_sample_rate_from_env,
+                                       logging_options_from_env)
+from shared.uploads import UploadLimitMiddleware, UploadedFile, read_upload
+
+# batch_annotate_images accepts at most 16 images per request, and large
+# photos also count against the request size limit
+VISION_BATCH_MAX_IMAGES = 16
+VISION_BATCH_MAX_BYTES = 10 * 1024 * 1024
+
+# ===== LOGGING =====
+# Log lines go through a queue to a background thread, so requests never wait on stdout.
+# Per-request progress is DEBUG, which the default INFO level skips without formatting.
+configure_logging(**logging_options_from_env())
+logger = logging.getLogger(__name__)
+
+# ===== METRICS =====
+# Served on /metrics; the HTTP metrics are added by MetricsMiddleware below
+metrics = MetricsRegistry()
+vision_latency = metrics.histogram(
+    'ocr_vision_request_seconds', 'Google Vision call latency', ('call',))
+extraction_latency = metrics.histogram(
+    'ocr_extraction_seconds', 'Field extraction and confidence scoring time per document')
+text_length = metrics.histogram(
+    'ocr_text_length_chars', 'Characters of text Vision detected per document',
+    buckets=(0, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000))
 
 class OCRService:
     def __init__(self):
-        """Initialize Google Vision OCR service - REQUIRED"""
+        """Set up the OCR service; the Vision client itself is created on first OCR use"""
+        self.cache = cache_from_env()
+        self.preprocessor = preprocessor_from_env()
+
+        # The Vision client is blocking gRPC, so OCR runs on a bounded thread pool
+        # instead of the event loop. Extra scans queue until a worker is free.
+        self.max_concurrency = int(os.getenv('OCR_MAX_CONCURRENCY', '4'))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ocr')
+
+        # OCR_BACKEND=fake swaps Vision for a local stand-in (no credentials or network);
+        # OCR_BACKEND=record calls Vision and saves every response as a replay fixture
+        self.backend_mode = backend_mode_from_env()
+
+        # Importing google.cloud.vision and building the gRPC client takes about a
+        # second, so cold starts that only serve /health or /users never pay for it
+        self.client = None
+        self.status = "not_initialized"
+        self.init_ms: Optional[float] = None
+        self._init_lock = threading.Lock()
+
+    def ensure_client(self) -> str:
+        """Create the Vision client once, on first use, and return the service status"""
+        if self.status == "not_initialized":
+            with self._init_lock:
+                if self.status == "not_initialized":
+                    started = time.perf_counter()
+                    self.client, self.status = self._create_client()
+                    self.init_ms = round((time.perf_counter() - started) * 1000, 2)
+                    logger.info("OCR client initialized", extra={"init_ms": self.init_ms, "ocr_status": self.status})
+        return self.status
+
+    async def ensure_client_async(self) -> str:
+        """ensure_client without blocking the event loop on the first call"""
+        if self.status != "not_initialized":
+            return self.status
+        return await self._run_on_pool(self.ensure_client)
+
+    def _run_on_pool(self, func, *args):
+        """Run func on the OCR pool, carrying the request id over for its log lines"""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, contextvars.copy_context().run, func, *args)
+
+    def _create_client(self):
+        if self.backend_mode == 'fake':
+            client = fake_backend_from_env()
+            logger.info("Using fake OCR backend", extra={"fixtures": len(client.fixtures)})
+            return client, "google_vision_ready"
+
         try:
-            print("🔍 Initializing Google Vision OCR...")
-            
-            # Debug: Check environment variables
-            creds_env = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-            creds_base64 = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_BASE64')
-            
-            print(f"📋 GOOGLE_APPLICATION_CREDENTIALS exists: {bool(creds_env)}")
-            print(f"📋 GOOGLE_APPLICATION_CREDENTIALS_BASE64 exists: {bool(creds_base64)}")
-            
-            credentials_json = None
-            
-            if creds_env:
-                print(f"📋 Credentials length: {len(creds_env)} characters")
-                print(f"📋 Credentials start: {creds_env[:50]}...")
-                
-                # Check if it's valid JSON content (not a file path)
-                try:
-                    parsed = json.loads(creds_env)
-                    print(f"📋 JSON is valid, type: {parsed.get('type', 'unknown')}")
-                    print(f"📋 Project ID: {parsed.get('project_id', 'unknown')}")
-                    credentials_json = creds_env
-                except json.JSONDecodeError as je:
-                    print(f"❌ JSON parsing failed: {je}")
-                    print(f"📋 First 100 chars: {creds_env[:100]}")
-                    # If it's not valid JSON, treat as file path
-                    if os.path.exists(creds_env):
-                        print("📋 Treating as file path...")
-                        with open(creds_env, 'r') as f:
-                            credentials_json = f.read()
-            
-            elif creds_base64:
-                print("🔧 Decoding base64 credentials...")
-                import base64
-                try:
-                    credentials_json = base64.b64decode(creds_base64).decode('utf-8')
-                    parsed = json.loads(credentials_json)
-                    print(f"✅ Base64 credentials decoded, project: {parsed.get('project_id', 'unknown')}")
-                except Exception as be:
-                    print(f"❌ Base64 decoding failed: {be}")
-            
-            # For Vercel serverless, write credentials to temporary file
-            if credentials_json:
-                print("📝 Writing credentials to temporary file for Vercel...")
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                    temp_file.write(credentials_json)
-                    temp_creds_path = temp_file.name
-                
-                # Set the environment variable to point to the temp file
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_creds_path
-                print(f"✅ Temporary credentials file created: {temp_creds_path}")
+            logger.debug("Initializing Google Vision OCR")
+            from google.cloud import vision
+
+            credentials_info = self._load_credentials_info()
+            if credentials_info:
+                # Credentials are built in memory; the private key is never written to disk
+                from google.oauth2 import service_account
+                credentials = service_account.Credentials.from_service_account_info(credentials_info)
+                client = vision.ImageAnnotatorClient(credentials=credentials)
+                logger.info("Using service account credentials",
+                            extra={"project_id": credentials_info.get('project_id', 'unknown')})
             else:
-                print("❌ No valid credentials found")
-            
-            # Initialize Google Vision client
-            self.client = vision.ImageAnnotatorClient()
-            self.status = "google_vision_ready"
-            print("✅ Google Vision OCR initialized successfully")
-            
+                logger.info("No credentials in environment, trying default Google Cloud credentials")
+                client = vision.ImageAnnotatorClient()
+
+            if self.backend_mode == 'record':
+                client = recording_backend_from_env(client)
+                logger.info("Recording Vision responses", extra={"fixture_dir": client.fixture_dir})
+            logger.info("Google Vision OCR initialized")
+            return client, "google_vision_ready"
+
         except Exception as e:
-            print(f"❌ Google Vision initialization failed: {e}")
-            print(f"❌ Error type: {type(e).__name__}")
-            print(f"❌ Error details: {str(e)}")
-            print("📋 To enable OCR, set up Google Cloud credentials:")
-            print("   1. Create Google Cloud service account")
-            print("   2. Enable Vision API")
-            print("   3. Set GOOGLE_APPLICATION_CREDENTIALS environment variable")
-            self.client = None
-            self.status = "google_vision_required"
-    
-    def process_document(self, file_content: bytes, document_type: str) -> Dict[str, Any]:
+            logger.error("Google Vision initialization failed: %s: %s", type(e).__name__, e, extra={
+                "hint": "Create a Google Cloud service account, enable the Vision API and set "
+                        "GOOGLE_APPLICATION_CREDENTIALS"
+            })
+            return None, "google_vision_required"
+
+    def _load_credentials_info(self) -> Optional[Dict[str, Any]]:
+        """Service account info from GOOGLE_APPLICATION_CREDENTIALS (JSON content or a
+        file path) or GOOGLE_APPLICATION_CREDENTIALS_BASE64, or None to use the defaults"""
+        creds_env = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        creds_base64 = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_BASE64')
+
+        if creds_env:
+            try:
+                return json.loads(creds_env)
+            except json.JSONDecodeError:
+                if os.path.exists(creds_env):
+                    logger.info("Reading credentials file from GOOGLE_APPLICATION_CREDENTIALS")
+                    with open(creds_env, 'r') as f:
+                        return json.load(f)
+                logger.error("GOOGLE_APPLICATION_CREDENTIALS is neither valid JSON nor an existing file")
+
+        elif creds_base64:
+            import base64
+            try:
+                return json.loads(base64.b64decode(creds_base64).decode('utf-8'))
+            except Exception as be:
+                logger.error("GOOGLE_APPLICATION_CREDENTIALS_BASE64 could not be decoded: %s", type(be).__name__)
+
+        return None
+
+    def process_document(self, file_content: bytes, document_type: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
         """Process document with Google Vision OCR ONLY"""
+        self.ensure_client()
         if not self.client:
             raise Exception("Google Vision OCR is not configured. Please set up Google Cloud credentials.")
         
-        return self._process_with_google_vision(file_content, document_type)
+        # Identical uploads are served from the cache instead of calling Vision again
+        cache_key = cache_key or self.cache.make_key(file_content, document_type)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return {**cached, 'cache_hit': True}
+        
+        optimized_content, preprocessing = self.preprocessor.optimize(file_content)
+        result = self._process_with_google_vision(optimized_content, document_type)
+        result['preprocessing'] = preprocessing
+        self.cache.put(cache_key, result)
+        return {**result, 'cache_hit': False}
+    
+    async def process_document_async(self, file_content: bytes, document_type: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Run process_document on the OCR thread pool without blocking the event loop"""
+        return await self._run_on_pool(self.process_document, file_content, document_type, cache_key)
+    
+    def process_batch(self, file_contents: List[bytes], document_type: str,
+                      cache_keys: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Process one chunk of documents with a single batch_annotate_images call.
+        
+        Returns one result per input, in order. A failed document gets an error
+        entry instead of failing the whole chunk.
+        """
+        self.ensure_client()
+        if not self.client:
+            raise Exception("Google Vision OCR is not configured. Please set up Google Cloud credentials.")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_contents)
+        pending: Dict[str, List[int]] = {}
+        for index, file_content in enumerate(file_contents):
+            cache_key = cache_keys[index] if cache_keys else self.cache.make_key(file_content, document_type)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[index] = {**cached, 'cache_hit': True}
+            else:
+                # Duplicate files within the chunk are only annotated once
+                pending.setdefault(cache_key, []).append(index)
+        
+        if pending:
+            from google.cloud import vision
+            feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+            requests = []
+            preprocessing_stats = []
+            for indexes in pending.values():
+                optimized_content, preprocessing = self.preprocessor.optimize(file_contents[indexes[0]])
+                preprocessing_stats.append(preprocessing)
+                requests.append(vision.AnnotateImageRequest(image=vision.Image(content=optimized_content), features=[feature]))
+            logger.debug("Processing batch with Google Vision OCR", extra={"images": len(requests)})
+            started = time.perf_counter()
+            batch_response = self.client.batch_annotate_images(requests=requests)
+            vision_latency.observe(time.perf_counter() - started, ('batch_annotate_images',))
+            
+            responses = list(batch_response.responses)
+            for position, ((cache_key, indexes), preprocessing) in enumerate(zip(pending.items(), preprocessing_stats)):
+                try:
+                    if position >= len(responses):
+                        raise Exception(f"Google Vision returned {len(responses)} responses for {len(requests)} images")
+                    result = self._build_ocr_result(responses[position], document_type)
+                    result['preprocessing'] = preprocessing
+                    self.cache.put(cache_key, result)
+                    result = {**result, 'cache_hit': False}
+                except Exception as e:
+                    logger.warning("Google Vision OCR failed: %s", e)
+                    result = {'status': 'error', 'message': f"OCR processing failed: {str(e)}"}
+                for index in indexes:
+                    results[index] = result
+        
+        return results
+    
+    async def process_batch_async(self, file_contents: List[bytes], document_type: str,
+                                  cache_keys: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Split documents into Vision-sized chunks and annotate the chunks in parallel on the OCR pool"""
+        cache_keys = cache_keys or [self.cache.make_key(content, document_type) for content in file_contents]
+        chunks: List[List[int]] = []
+        chunk_bytes = 0
+        for index, file_content in enumerate(file_contents):
+            if not chunks or len(chunks[-1]) >= VISION_BATCH_MAX_IMAGES or chunk_bytes + len(file_content) > VISION_BATCH_MAX_BYTES:
+                chunks.append([])
+                chunk_bytes = 0
+            chunks[-1].append(index)
+            chunk_bytes += len(file_content)
+        
+        chunk_results = await asyncio.gather(*(
+            self._run_on_pool(
+                self.process_batch, [file_contents[i] for i in chunk], document_type, [cache_keys[i] for i in chunk]
+            )
+            for chunk in chunks
+        ), return_exceptions=True)
+        
+        # A chunk whose Vision call failed (quota, deadline) fails only its own files
+        results: List[Dict[str, Any]] = []
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            if isinstance(chunk_result, Exception):
+                logger.warning("Google Vision batch failed: %s", chunk_result, extra={"images": len(chunk)})
+                chunk_result = [{'status': 'error', 'message': f"OCR processing failed: {chunk_result}"}] * len(chunk)
+            elif isinstance(chunk_result, BaseException):
+                raise chunk_result
+            results.extend(chunk_result)
+        return results
     
     def _process_with_google_vision(self, file_content: bytes, document_type: str) -> Dict[str, Any]:
         """Process document with Google Vision OCR"""
         try:
-            print("🤖 Processing with Google Vision OCR...")
+            logger.debug("Processing with Google Vision OCR", extra={"bytes": len(file_content)})
             
             # Create Vision API image object
+            from google.cloud import vision
             image = vision.Image(content=file_content)
             
             # Perform text detection
+            started = time.perf_counter()
             response = self.client.text_detection(image=image)
-            texts = response.text_annotations
-            
-            if response.error.message:
-                raise Exception(f"Google Vision API error: {response.error.message}")
-            
-            if not texts:
-                raise Exception("No text detected in the uploaded document")
-            
-            # Extract raw text
-            raw_text = texts[0].description
-            print(f"📄 Extracted text length: {len(raw_text)} characters")
-            
-            # Parse structured data based on document type
-            extracted_data = self._parse_ocr_text(raw_text, document_type)
-            
-            # Calculate confidence scores from Vision API
-            confidence_scores = self._calculate_confidence_scores(texts, extracted_data)
-            
-            return {
-                'status': 'completed',
-                'extracted_data': extracted_data,
-                'confidence_score': confidence_scores.get('overall', 0.85),
-                'confidence_scores': confidence_scores,
-                'raw_text': raw_text[:500],  # First 500 chars for debugging
-                'processing_time': datetime.now().isoformat(),
-                'mode': 'google_vision_ocr',
-                'text_blocks_detected': len(texts)
-            }
+            vision_latency.observe(time.perf_counter() - started, ('text_detection',))
+            return self._build_ocr_result(response, document_type)
             
         except Exception as e:
-            print(f"❌ Google Vision OCR failed: {e}")
+            logger.warning("Google Vision OCR failed: %s", e)
             raise Exception(f"OCR processing failed: {str(e)}")
     
+    def _build_ocr_result(self, response, document_type: str) -> Dict[str, Any]:
+        """Turn one Vision annotate response into the OCR result dict"""
+        texts = response.text_annotations
+        
+        if response.error.message:
+            raise Exception(f"Google Vision API error: {response.error.message}")
+        
+        if not texts:
+            raise Exception("No text detected in the uploaded document")
+        
+        # Extract raw text
+        raw_text = texts[0].description
+        logger.debug("Extracted text", extra={"text_length": len(raw_text)})
+        text_length.observe(len(raw_text))
+        
+        return {
+            'status': 'completed',
+            **self.parse_text(raw_text, document_type),
+            # The full text is kept so improved parsers can be backfilled without Vision
+            'raw_text': raw_text,
+            'processing_time': datetime.now().isoformat(),
+            'mode': 'google_vision_ocr',
+            'text_blocks_detected': len(texts)
+        }
+    
+    def parse_text(self, raw_text: str, document_type: str) -> Dict[str, Any]:
+        """The scan fields derived from the OCR text: extracted data and confidence scores"""
+        started = time.perf_counter()
+        # Parse structured data based on document type
+        extracted_data = self._parse_ocr_text(raw_text, document_type)
+        
+        # Calculate confidence scores from the detected text
+        confidence_scores = self._calculate_confidence_scores(raw_text, extracted_data)
+        extraction_latency.observe(time.perf_counter() - started)
+        
+        return {
+            'extracted_data': extracted_data,
+            'confidence_score': confidence_scores.get('overall', 0.85),
+            'confidence_scores': confidence_scores
+        }
+    
     def _parse_ocr_text(self, text: str, document_type: str) -> Dict[str, Any]:
         """Parse OCR text to extract structured data"""
-        text_lower = text.lower()
-        extracted = {}
-        
-        if document_type == 'rental_agreement':
-            extracted = self._extract_rental_data(text, text_lower)
-        elif document_type == 'id_card':
-            extracted = self._extract_id_data(text, text_lower)
-        elif document_type == 'property_document':
-            extracted = self._extract_property_data(text, text_lower)
-        else:
+        extracted = extract_fields(text, document_type)
+        
+        if extracted is None:
             # For any other document type, return raw text extraction
             extracted = {
                 'raw_text': text[:500],
@@ -163,190 +344,13 @@ class OCRService:
         
         return extracted
     
-    def _extract_rental_data(self, text: str, text_lower: str) -> Dict[str, Any]:
-        """Extract rental agreement specific data using regex patterns"""
-        import re
-        
-        data = {}
-        
-        # Extract names (improved patterns)
-        name_patterns = [
-            r'tenant[:\s]+([A-Za-z\s]{2,30})',
-            r'landlord[:\s]+([A-Za-z\s]{2,30})',
-            r'lessor[:\s]+([A-Za-z\s]{2,30})',
-            r'lessee[:\s]+([A-Za-z\s]{2,30})',
-            r'owner[:\s]+([A-Za-z\s]{2,30})',
-            r'renter[:\s]+([A-Za-z\s]{2,30})'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                name = match.group(1).strip().title()
-                if 'tenant' in pattern or 'lessee' in pattern or 'renter' in pattern:
-                    data['tenant_name'] = name
-                elif 'landlord' in pattern or 'lessor' in pattern or 'owner' in pattern:
-                    data['landlord_name'] = name
-        
-        # Extract rent amount (improved patterns)
-        rent_patterns = [
-            r'rent[:\s]+\$?(\d+[\d,]*\.?\d*)',
-            r'monthly[:\s]+rent[:\s]+\$?(\d+[\d,]*\.?\d*)',
-            r'\$(\d+[\d,]*\.?\d*)[:\s]*(?:per|/)\s*month',
-            r'amount[:\s]+\$?(\d+[\d,]*\.?\d*)'
-        ]
-        
-        for pattern in rent_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data['monthly_rent'] = match.group(1).replace(',', '')
-                break
-        
-        # Extract security deposit
-        deposit_patterns = [
-            r'security\s+deposit[:\s]+\$?(\d+[\d,]*\.?\d*)',
-            r'deposit[:\s]+\$?(\d+[\d,]*\.?\d*)',
-            r'advance[:\s]+\$?(\d+[\d,]*\.?\d*)'
-        ]
-        
-        for pattern in deposit_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data['security_deposit'] = match.group(1).replace(',', '')
-                break
-        
-        # Extract property address (improved patterns)
-        address_patterns = [
-            r'property\s+(?:address|located)[:\s]+([0-9][^.\n\r]{10,100})',
-            r'premises[:\s]+([0-9][^.\n\r]{10,100})',
-            r'address[:\s]+([0-9][^.\n\r]{10,100})',
-            r'located\s+at[:\s]+([0-9][^.\n\r]{10,100})'
-        ]
-        
-        for pattern in address_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data['property_address'] = match.group(1).strip()
-                break
-        
-        # Extract lease dates (improved patterns)
-        date_patterns = [
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
-            r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{2,4})'
-        ]
-        
-        dates_found = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text_lower)
-            dates_found.extend(matches)
-        
-        if len(dates_found) >= 2:
-            data['lease_start_date'] = dates_found[0]
-            data['lease_end_date'] = dates_found[1]
-        elif len(dates_found) == 1:
-            data['lease_start_date'] = dates_found[0]
-        
-        return data
-    
-    def _extract_id_data(self, text: str, text_lower: str) -> Dict[str, Any]:
-        """Extract ID card specific data"""
-        import re
-        
-        data = {}
-        
-        # Extract name (improved pattern for Indian names)
-        name_patterns = [
-            r'([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)',
-            r'name[:\s]+([A-Za-z\s]{2,30})'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['name'] = match.group(1).strip()
-                break
-        
-        # Extract various ID numbers
-        id_patterns = [
-            (r'(\d{4}\s?\d{4}\s?\d{4})', 'aadhaar'),  # Aadhaar
-            (r'([A-Z]{5}\d{4}[A-Z])', 'pan'),         # PAN
-            (r'([A-Z]{2}\d{13})', 'driving_license'),  # Driving License
-            (r'([A-Z]\d{7})', 'passport')              # Passport
-        ]
-        
-        for pattern, id_type in id_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['id_number'] = match.group(1)
-                data['id_type'] = id_type
-                break
-        
-        # Extract date of birth
-        dob_patterns = [
-            r'(?:dob|birth)[:\s]+(\d{2}[/-]\d{2}[/-]\d{4})',
-            r'(\d{2}[/-]\d{2}[/-]\d{4})'
-        ]
-        
-        for pattern in dob_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data['date_of_birth'] = match.group(1)
-                break
-        
-        return data
-    
-    def _extract_property_data(self, text: str, text_lower: str) -> Dict[str, Any]:
-        """Extract property document specific data"""
-        import re
-        
-        data = {}
-        
-        # Extract property type (improved detection)
-        property_keywords = {
-            'apartment': ['apartment', 'flat', 'unit'],
-            'house': ['house', 'villa', 'bungalow', 'cottage'],
-            'commercial': ['commercial', 'office', 'shop', 'store', 'warehouse']
-        }
-        
-        for prop_type, keywords in property_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                data['property_type'] = prop_type.title()
-                break
-        
-        # Extract area/size (improved patterns)
-        area_patterns = [
-            r'(\d+[\d,]*)\s*(?:sq\.?\s*ft|square\s*feet|sqft)',
-            r'area[:\s]+(\d+[\d,]*)',
-            r'size[:\s]+(\d+[\d,]*)'
-        ]
-        
-        for pattern in area_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data['area'] = match.group(1).replace(',', '')
-                break
-        
-        # Extract bedrooms and bathrooms
-        room_patterns = [
-            (r'(\d+)\s*(?:bedroom|bed|bhk)', 'bedrooms'),
-            (r'(\d+)\s*(?:bathroom|bath)', 'bathrooms')
-        ]
-        
-        for pattern, field in room_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                data[field] = match.group(1)
-        
-        return data
-    
-    def _calculate_confidence_scores(self, texts, extracted_data) -> Dict[str, float]:
-        """Calculate confidence scores based on Vision API results and extraction quality"""
-        if not texts:
+    def _calculate_confidence_scores(self, raw_text: str, extracted_data) -> Dict[str, float]:
+        """Calculate confidence scores based on the detected text and extraction quality"""
+        if not raw_text:
             return {'overall': 0.0}
         
         # Base confidence from Vision API quality
-        text_quality = len(texts[0].description) if texts else 0
+        text_quality = len(raw_text)
         base_confidence = min(0.95, 0.7 + (text_quality / 1000) * 0.2)
         
         # Calculate extraction quality
@@ -362,8 +366,9 @@ class OCRService:
         }
         
         # Add confidence for each extracted field
+        # crc32 is stable across processes, unlike hash() on str
         for key in extracted_data.keys():
-            field_confidence = base_confidence + (hash(key) % 20) / 100
+            field_confidence = base_confidence + (zlib.crc32(key.encode('utf-8')) % 20) / 100
             confidence_scores[key] = round(min(0.95, field_confidence), 2)
         
         return confidence_scores
@@ -371,6 +376,11 @@ class OCRService:
 # ===== GLOBAL INSTANCES =====
 # Initialize service instance BEFORE FastAPI app
 ocr_service = OCRService()
+ocr_jobs = job_queue_from_env()
+
+def reparse_scan_text(raw_text: str, document_type: str) -> Dict[str, Any]:
+    """Backfill worker: rerun the current parsers on a stored scan's text (no Vision call)"""
+    return {**ocr_service.parse_text(raw_text, document_type), 'reparsed_at': datetime.now().isoformat()}
 
 # ===== DEMO DATA =====
 DEMO_USERS = [
@@ -385,8 +395,15 @@ DEMO_PROPERTIES = [
     {"id": "2", "address": "456 Oak Ave", "owner_id": "4", "status": "active"}
 ]
 
-# Storage for OCR results (in-memory for demo)
-ocr_results = []
+# Storage for OCR results (in-memory for demo), indexed by user for paginated listings
+ocr_results = ScanStore()
+
+# ===== UPLOAD LIMITS =====
+SUPPORTED_FILE_TYPES = ['jpg', 'jpeg', 'png', 'pdf', 'tiff', 'bmp']
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB limit for serverless
+MAX_BATCH_FILES = int(os.getenv('OCR_BATCH_MAX_FILES', '50'))
+MAX_BATCH_BYTES = int(os.getenv('OCR_BATCH_MAX_BYTES', str(50 * 1024 * 1024)))
+MULTIPART_OVERHEAD = 64 * 1024  # form fields and part headers around the file bytes
 
 # ===== FASTAPI APPLICATION =====
 # NO LIFESPAN - Not supported in Vercel serverless
@@ -396,6 +413,22 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# ===== UPLOAD LIMIT MIDDLEWARE =====
+# Oversized uploads are rejected before their body is buffered
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/ocr/scan": MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+        "/ocr/scan/batch": MAX_BATCH_BYTES + MULTIPART_OVERHEAD,
+    },
+)
+
+# ===== COMPRESSION MIDDLEWARE =====
+# OCR results and scan lists are mostly JSON text, which brotli/gzip shrink
+# several times over for mobile clients
+compression_stats = CompressionStats()
+app.add_middleware(CompressionMiddleware, stats=compression_stats, **compression_options_from_env())
+
 # ===== CORS MIDDLEWARE =====
 app.add_middleware(
     CORSMiddleware,
@@ -405,6 +438,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ===== PROFILING MIDDLEWARE =====
+# Only installed with PROFILING_ENABLED; X-Profile or PROFILING_SAMPLE_RATE then picks requests to profile
+profile_store = profile_store_from_env()
+profiling_options = profiling_options_from_env()
+if profile_store:
+    app.add_middleware(ProfilingMiddleware, store=profile_store, **profiling_options)
+
+# ===== REQUEST CONTEXT MIDDLEWARE =====
+# Tags log lines with the request's X-Request-ID; LOG_DEBUG_SAMPLE_RATE keeps DEBUG lines for a share of requests
+app.add_middleware(RequestContextMiddleware, debug_sample_rate=debug_sample_rate_from_env())
+
+# ===== METRICS MIDDLEWARE =====
+# Outermost, so latency covers every other middleware and sizes are the bytes on the wire
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# ===== OCR HELPERS =====
+def file_extension_of(filename: Optional[str]) -> str:
+    return filename.lower().split('.')[-1] if filename else ""
+
+def vision_not_configured_error() -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "message": "Google Vision OCR is not configured. Please set up Google Cloud credentials.",
+        "error_code": "GOOGLE_VISION_NOT_CONFIGURED",
+        "instructions": [
+            "1. Create a Google Cloud service account",
+            "2. Enable Vision API",
+            "3. Set GOOGLE_APPLICATION_CREDENTIALS environment variable",
+            "4. Redeploy to Vercel"
+        ],
+        "timestamp": datetime.now().isoformat()
+    }
+
+def validate_upload(filename: Optional[str], upload: UploadedFile) -> Optional[Dict[str, Any]]:
+    """Return an error response for an unusable upload, or None if it can be scanned"""
+    if upload.too_large:
+        return {
+            "status": "error", 
+            "message": "File too large. Maximum size is 5MB.",
+            "error_code": "FILE_TOO_LARGE",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    if upload.size == 0:
+        return {
+            "status": "error",
+            "message": "Empty file uploaded",
+            "error_code": "EMPTY_FILE",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    # Validate file type (basic check)
+    file_extension = file_extension_of(filename)
+    if file_extension not in SUPPORTED_FILE_TYPES:
+        return {
+            "status": "error",
+            "message": f"Unsupported file type: {file_extension}. Supported: {', '.join(SUPPORTED_FILE_TYPES)}",
+            "error_code": "UNSUPPORTED_FILE_TYPE",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    # The extension can lie, so the content must also start like a supported file
+    if upload.sniffed_type is None:
+        return {
+            "status": "error",
+            "message": f"File content is not a supported image or PDF. Supported: {', '.join(SUPPORTED_FILE_TYPES)}",
+            "error_code": "UNSUPPORTED_FILE_TYPE",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    return None
+
+def store_scan_result(user_id: str, document_type: str, filename: Optional[str],
+                      file_content: bytes, ocr_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Add upload metadata to an OCR result and keep it in ocr_results"""
+    scan_result = {
+        "id": ocr_results.next_id(),
+        "user_id": user_id,
+        "document_type": document_type,
+        "filename": filename or "unknown",
+        "file_size": len(file_content),
+        "file_type": file_extension_of(filename),
+        "created_at": datetime.now().isoformat(),
+        **ocr_result
+    }
+    return ocr_results.add(scan_result)
+
 # ===== API ROUTES =====
 
 @app.get("/favicon.ico")
@@ -412,20 +532,60 @@ async def favicon():
     """Handle favicon requests from browsers - return 204 No Content"""
     return Response(status_code=204)
 
+def root_payload() -> Dict[str, Any]:
+    return {
+        "status": "✅ WORKING",
+        "message": "Rentum AI Backend is operational!",
+        "deployment": "vercel-serverless-final-v4",
+        "endpoints": ["/demo", "/users", "/properties", "/health", "/ocr/scan", "/ocr/scan/batch", "/ocr/jobs/{job_id}", "/ocr/scans", "/test"],
+        "version": "1.0.0",
+        "framework": "FastAPI",
+        "python_runtime": "vercel_serverless",
+        "query_handling": "optimized"
+    }
+
+def demo_payload() -> Dict[str, Any]:
+    return {
+        "message": "🎭 Demo data ready for testing",
+        "users": DEMO_USERS,
+        "properties": DEMO_PROPERTIES,
+        "total_users": len(DEMO_USERS),
+        "total_properties": len(DEMO_PROPERTIES),
+        "ocr_service": "✅ Available",
+        "ocr_results": len(ocr_results)
+    }
+
+def health_payload() -> Dict[str, Any]:
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "service": "rentum-api",
+        "version": "1.0.0",
+        "ocr_service": ocr_service.status,
+        "ocr_backend": ocr_service.backend_mode,
+        "ocr_client_init_ms": ocr_service.init_ms,
+        "ocr_cache": ocr_service.cache.stats(),
+        "ocr_max_concurrency": ocr_service.max_concurrency,
+        "ocr_preprocessing": ocr_service.preprocessor.stats(),
+        "ocr_jobs": ocr_jobs.stats(),
+        "environment": "vercel-serverless",
+        "memory_usage": "optimized",
+        "dependencies": "loaded"
+    }
+
+# The frontend polls these on every page load, so their bodies are serialized
+# once and rebuilt only when the data they show changes; clients revalidate
+# with If-None-Match and get a 304. /health is built per request, since its
+# timestamp and live stats are the point of calling it.
+root_response = CachedJSON(root_payload)
+demo_response = CachedJSON(demo_payload, version=lambda: len(ocr_results))
+users_response = CachedJSON(lambda: {"users": DEMO_USERS})
+properties_response = CachedJSON(lambda: {"properties": DEMO_PROPERTIES})
+
 @app.get("/")
-async def root():
+async def root(request: Request):
     try:
-        return {
-            "status": "✅ WORKING",
-            "message": "Rentum AI Backend is operational!",
-            "timestamp": datetime.now().isoformat(),
-            "deployment": "vercel-serverless-final-v4",
-            "endpoints": ["/demo", "/users", "/properties", "/health", "/ocr/scan", "/ocr/scans", "/test"],
-            "version": "1.0.0",
-            "framework": "FastAPI",
-            "python_runtime": "vercel_serverless",
-            "query_handling": "optimized"
-        }
+        return root_response.response(request)
     except Exception as e:
         return {
             "status": "❌ ERROR",
@@ -435,38 +595,21 @@ async def root():
         }
 
 @app.get("/demo")
-async def demo():
-    return {
-        "message": "🎭 Demo data ready for testing",
-        "users": DEMO_USERS,
-        "properties": DEMO_PROPERTIES,
-        "total_users": len(DEMO_USERS),
-        "total_properties": len(DEMO_PROPERTIES),
-        "ocr_service": "✅ Available",
-        "ocr_results": len(ocr_results)
-    }
+async def demo(request: Request):
+    return demo_response.response(request)
 
 @app.get("/users")
-async def get_users():
-    return {"users": DEMO_USERS}
+async def get_users(request: Request):
+    return users_response.response(request)
 
 @app.get("/properties")
-async def get_properties():
-    return {"properties": DEMO_PROPERTIES}
+async def get_properties(request: Request):
+    return properties_response.response(request)
 
 @app.get("/health")
 async def health():
     try:
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "service": "rentum-api",
-            "version": "1.0.0",
-            "ocr_service": ocr_service.status,
-            "environment": "vercel-serverless",
-            "memory_usage": "optimized",
-            "dependencies": "loaded"
-        }
+        return health_payload()
     except Exception as e:
         return {
             "status": "degraded",
@@ -476,6 +619,46 @@ async def health():
             "environment": "vercel-serverless"
         }
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics for this instance"""
+    return metrics.response()
+
+def profiles_forbidden_error() -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "message": "Profiling is disabled, or X-Admin-Token does not match PROFILING_TOKEN.",
+        "error_code": "PROFILING_FORBIDDEN",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Stored request profiles, newest first"""
+    if not admin_token_valid(profile_store, profiling_options["token"], x_admin_token):
+        return JSONResponse(status_code=403, content=profiles_forbidden_error())
+    return {"profiles": profile_store.list(), "max_profiles": profile_store.max_profiles}
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """One stored profile: collapsed stacks (.txt) or cProfile stats (.prof)"""
+    if not admin_token_valid(profile_store, profiling_options["token"], x_admin_token):
+        return JSONResponse(status_code=403, content=profiles_forbidden_error())
+    path = profile_store.path(profile_id)
+    if path is None:
+        return JSONResponse(status_code=404, content={
+            "status": "error",
+            "message": f"Profile {profile_id} not found",
+            "error_code": "PROFILE_NOT_FOUND",
+            "timestamp": datetime.now().isoformat()
+        })
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
+
+@app.get("/compression/stats")
+async def compression_report():
+    """Bytes before and after compression per route, and the time spent compressing"""
+    return compression_stats.stats()
+
 @app.get("/test")
 async def test():
     return {
@@ -484,35 +667,38 @@ async def test():
         "timestamp": datetime.now().isoformat()
     }
 
+async def run_scan(user_id: str, document_type: str, filename: Optional[str], upload: UploadedFile) -> Dict[str, Any]:
+    """OCR one validated upload and store the scan result"""
+    cache_key = ocr_service.cache.key_from_digest(upload.digest, document_type)
+    ocr_result = await ocr_service.process_document_async(upload.content, document_type, cache_key)
+    scan_result = store_scan_result(user_id, document_type, filename, upload.content, ocr_result)
+    logger.info("OCR scan completed", extra={"scan_id": scan_result['id'], "cache_hit": ocr_result.get('cache_hit')})
+    return scan_result
+
 @app.post("/ocr/scan")
 async def scan_document(
     file: UploadFile = File(...),
     user_id: str = Form(...),
-    document_type: str = Form(...)
+    document_type: str = Form(...),
+    background: bool = Form(False)
 ):
-    """OCR document scanning endpoint - Google Vision ONLY"""
+    """OCR document scanning endpoint - Google Vision ONLY
+    
+    With background=true the scan is queued and a job id is returned at once;
+    poll GET /ocr/jobs/{job_id} for the result.
+    """
     try:
-        print(f"🔍 OCR scan request: user={user_id}, type={document_type}, file={file.filename}")
+        logger.debug("OCR scan request",
+                     extra={"user_id": user_id, "document_type": document_type, "upload_name": file.filename})
         
         # Check if Google Vision is available
-        if ocr_service.status != "google_vision_ready":
-            print("❌ Google Vision OCR not configured")
-            return {
-                "status": "error",
-                "message": "Google Vision OCR is not configured. Please set up Google Cloud credentials.",
-                "error_code": "GOOGLE_VISION_NOT_CONFIGURED",
-                "instructions": [
-                    "1. Create a Google Cloud service account",
-                    "2. Enable Vision API",
-                    "3. Set GOOGLE_APPLICATION_CREDENTIALS environment variable",
-                    "4. Redeploy to Vercel"
-                ],
-                "timestamp": datetime.now().isoformat()
-            }
+        if await ocr_service.ensure_client_async() != "google_vision_ready":
+            logger.warning("Google Vision OCR not configured")
+            return vision_not_configured_error()
         
         # Validate file upload
         if not file:
-            print("❌ No file uploaded")
+            logger.warning("No file uploaded")
             return {
                 "status": "error",
                 "message": "No file uploaded",
@@ -520,64 +706,43 @@ async def scan_document(
                 "timestamp": datetime.now().isoformat()
             }
         
-        # Read file content and validate
-        file_content = await file.read()
-        print(f"📄 File size: {len(file_content)} bytes")
-        
-        if len(file_content) > 5 * 1024 * 1024:  # 5MB limit for serverless
-            print("❌ File too large")
+        # Read file content in chunks and validate
+        upload = await read_upload(file, MAX_FILE_SIZE)
+        logger.debug("Upload read", extra={"bytes": upload.size})
+        
+        upload_error = validate_upload(file.filename, upload)
+        if upload_error:
+            logger.info("Upload rejected: %s", upload_error['message'], extra={"error_code": upload_error['error_code']})
+            return upload_error
+        
+        if background:
+            try:
+                job = await ocr_jobs.submit(
+                    lambda: run_scan(user_id, document_type, file.filename, upload),
+                    {"user_id": user_id, "document_type": document_type, "filename": file.filename or "unknown"}
+                )
+            except QueueFull as e:
+                logger.warning("OCR job rejected: %s", e)
+                return {
+                    "status": "error",
+                    "message": f"{e}. Try again shortly.",
+                    "error_code": "OCR_QUEUE_FULL",
+                    "timestamp": datetime.now().isoformat()
+                }
+            logger.info("OCR job queued", extra={"job_id": job['id']})
             return {
-                "status": "error", 
-                "message": "File too large. Maximum size is 5MB.",
-                "error_code": "FILE_TOO_LARGE",
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        if len(file_content) == 0:
-            print("❌ Empty file")
-            return {
-                "status": "error",
-                "message": "Empty file uploaded",
-                "error_code": "EMPTY_FILE",
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        # Validate file type (basic check)
-        file_extension = file.filename.lower().split('.')[-1] if file.filename else ""
-        if file_extension not in ['jpg', 'jpeg', 'png', 'pdf', 'tiff', 'bmp']:
-            print(f"❌ Unsupported file type: {file_extension}")
-            return {
-                "status": "error",
-                "message": f"Unsupported file type: {file_extension}. Supported: jpg, jpeg, png, pdf, tiff, bmp",
-                "error_code": "UNSUPPORTED_FILE_TYPE",
-                "timestamp": datetime.now().isoformat()
+                "status": "queued",
+                "job_id": job["id"],
+                "poll_url": f"/ocr/jobs/{job['id']}",
+                "timestamp": job["created_at"]
             }
         
         # Process with Google Vision OCR
-        print("🤖 Processing with Google Vision OCR...")
-        ocr_result = ocr_service.process_document(file_content, document_type)
-        
-        # Add metadata and ensure consistent response format
-        scan_result = {
-            "id": str(len(ocr_results) + 1),
-            "user_id": user_id,
-            "document_type": document_type,
-            "filename": file.filename or "unknown",
-            "file_size": len(file_content),
-            "file_type": file_extension,
-            "created_at": datetime.now().isoformat(),
-            **ocr_result
-        }
-        
-        # Store result
-        ocr_results.append(scan_result)
-        
-        print(f"✅ Google Vision OCR completed successfully: {scan_result['id']}")
-        return scan_result
+        return await run_scan(user_id, document_type, file.filename, upload)
     
     except Exception as e:
         error_msg = f"Google Vision OCR processing failed: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.exception(error_msg)
         
         # Return detailed error information
         return {
@@ -594,18 +759,141 @@ async def scan_document(
             ]
         }
 
+@app.post("/ocr/scan/batch")
+async def scan_documents_batch(
+    files: List[UploadFile] = File(...),
+    user_id: str = Form(...),
+    document_type: str = Form(...)
+):
+    """Scan many documents in one request using batched Google Vision calls"""
+    try:
+        logger.debug("OCR batch request",
+                     extra={"user_id": user_id, "document_type": document_type, "files": len(files)})
+        
+        if await ocr_service.ensure_client_async() != "google_vision_ready":
+            logger.warning("Google Vision OCR not configured")
+            return vision_not_configured_error()
+        
+        if len(files) > MAX_BATCH_FILES:
+            return {
+                "status": "error",
+                "message": f"Too many files. Maximum is {MAX_BATCH_FILES} per batch.",
+                "error_code": "TOO_MANY_FILES",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        # Invalid files get their error in place; only valid ones go to Vision
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        uploads: List[UploadedFile] = []
+        valid_indexes = []
+        for index, file in enumerate(files):
+            uploads.append(await read_upload(file, MAX_FILE_SIZE))
+            upload_error = validate_upload(file.filename, uploads[index])
+            if upload_error:
+                results[index] = {"filename": file.filename or "unknown", **upload_error}
+            else:
+                valid_indexes.append(index)
+        
+        ocr_batch = await ocr_service.process_batch_async(
+            [uploads[i].content for i in valid_indexes],
+            document_type,
+            [ocr_service.cache.key_from_digest(uploads[i].digest, document_type) for i in valid_indexes]
+        )
+        
+        for index, ocr_result in zip(valid_indexes, ocr_batch):
+            if ocr_result.get('status') == 'error':
+                results[index] = {
+                    "filename": files[index].filename or "unknown",
+                    "error_code": "OCR_PROCESSING_FAILED",
+                    "timestamp": datetime.now().isoformat(),
+                    **ocr_result
+                }
+            else:
+                results[index] = store_scan_result(user_id, document_type, files[index].filename, uploads[index].content, ocr_result)
+        
+        succeeded = sum(1 for result in results if result.get('status') == 'completed')
+        logger.info("OCR batch completed", extra={"files": len(files), "succeeded": succeeded})
+        return {
+            "status": "completed",
+            "total": len(files),
+            "succeeded": succeeded,
+            "failed": len(files) - succeeded,
+            "results": results,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    except Exception as e:
+        error_msg = f"Google Vision OCR batch processing failed: {str(e)}"
+        logger.exception(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "error_code": "OCR_PROCESSING_FAILED",
+            "error_type": type(e).__name__,
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.get("/ocr/jobs/{job_id}")
+async def get_ocr_job(job_id: str):
+    """Poll a background OCR job: queued, processing, completed or failed"""
+    job = ocr_jobs.get(job_id)
+    if job is None:
+        return {
+            "status": "error",
+            "message": f"OCR job {job_id} not found. Jobs are kept in memory and may have expired.",
+            "error_code": "JOB_NOT_FOUND",
+            "timestamp": datetime.now().isoformat()
+        }
+    return job
+
 @app.get("/ocr/scans")
-async def list_ocr_scans(user_id: Optional[str] = Query(None)):
-    """List OCR scan results"""
-    if user_id:
+async def list_ocr_scans(
+    user_id: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_raw_text: bool = Query(False)
+):
+    """List OCR scan results, oldest first, one page at a time"""
+    try:
+        return ocr_results.list_page(user_id, limit, after, full=include_raw_text)
+    except InvalidCursor as e:
         return {
-            "scans": [scan for scan in ocr_results if scan["user_id"] == user_id],
-            "total": len([scan for scan in ocr_results if scan["user_id"] == user_id])
+            "status": "error",
+            "message": str(e),
+            "error_code": "INVALID_CURSOR",
+            "timestamp": datetime.now().isoformat()
         }
-    return {
-        "scans": ocr_results,
-        "total": len(ocr_results)
-    }
+
+@app.post("/ocr/backfill")
+async def backfill_ocr_scans(
+    after: Optional[str] = Query(None, description="next_cursor from the previous run"),
+    max_docs: Optional[int] = Query(None, ge=1),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Rerun the current field parsers over stored scan text, replacing each scan's extracted_data"""
+    if not backfill_token_valid(x_admin_token):
+        return JSONResponse(status_code=403, content={
+            "status": "error",
+            "message": "X-Admin-Token does not match OCR_BACKFILL_TOKEN, or OCR_BACKFILL_TOKEN is not set.",
+            "error_code": "BACKFILL_FORBIDDEN",
+            "timestamp": datetime.now().isoformat()
+        })
+    loop = asyncio.get_running_loop()
+    try:
+        report = await loop.run_in_executor(
+            None, lambda: backfill_store(ocr_results, reparse_scan_text, backfill_processes_from_env(),
+                                         chunk_size, after, max_docs)
+        )
+    except InvalidCursor as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "error_code": "INVALID_CURSOR",
+            "timestamp": datetime.now().isoformat()
+        }
+    logger.info("OCR backfill completed", extra={"processed": report['processed'], "docs_per_sec": report['docs_per_sec']})
+    return {"status": "completed", **report}
 
 # ===== VERCEL ASGI EXPORT =====
 # Vercel has native ASGI support - no mangum needed!
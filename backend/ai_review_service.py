@@ -5,11 +5,13 @@ Analyzes review responses and generates AI scores, risk assessments, and flags
 """
 
 import json
-import re
+from collections import Counter, deque
 from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime
 
+from shared.keyword_matcher import KeywordMatcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,6 +44,54 @@ class AIReviewAnalyzer:
             'communication': ['unresponsive', 'rude', 'aggressive', 'difficult', 'argumentative'],
             'behavior': ['noisy', 'disruptive', 'problematic', 'unreliable', 'dishonest']
         }
+        
+        # Words behind the pattern-based payment flags
+        self.negation_words = ['never', 'not', "didn't", "wouldn't", "couldn't"]
+        self.consistency_words = ['always', 'every time', 'consistently']
+        self.payment_words = ['pay', 'payment', 'rent']
+        
+        # Inflected forms that count as their keyword. Matching is by whole
+        # word, so each form is listed rather than matched as a prefix
+        # ("lately" is not "late", "parent" is not "rent")
+        self.keyword_forms = {
+            'prompt': ['promptly'], 'regular': ['regularly'], 'consistent': ['consistently'],
+            'reliable': ['reliably'], 'punctual': ['punctually'],
+            'clean': ['cleaned', 'cleanly'], 'careful': ['carefully'], 'responsible': ['responsibly'],
+            'clear': ['clearly'], 'polite': ['politely'], 'professional': ['professionally'],
+            'respectful': ['respectfully'], 'quiet': ['quietly'], 'honest': ['honestly'],
+            'delayed': ['delay', 'delays', 'delaying'], 'missed': ['misses', 'missing'],
+            'defaulted': ['defaults', 'defaulting'], 'bounced': ['bounce', 'bounces', 'bouncing'],
+            'damaged': ['damage', 'damages', 'damaging'], 'neglected': ['neglect', 'neglects', 'neglecting'],
+            'careless': ['carelessly'], 'rude': ['rudely'], 'aggressive': ['aggressively'],
+            'noisy': ['noisily'], 'dishonest': ['dishonestly'],
+            'pay': ['pays', 'paid', 'paying'], 'payment': ['payments'], 'rent': ['rents', 'rented', 'renting'],
+        }
+        
+        # Every keyword above compiled once into a single word-boundary matcher
+        self.keyword_matcher = KeywordMatcher(self._keyword_patterns())
+        flag_tags = list(dict.fromkeys(tag for _, tag in self._keyword_patterns() if isinstance(tag, tuple)))
+        self._flag_order = {tag: order for order, tag in enumerate(flag_tags)}
+        self._flag_texts = {tag: f"{tag[1].title()}: {tag[2]}" for tag in flag_tags}
+        self._green_tags = frozenset(tag for tag in flag_tags if tag[0] == 'green')
+        self._red_tags = frozenset(tag for tag in flag_tags if tag[0] == 'red')
+    
+    def _keyword_patterns(self):
+        for flag_type, flag_keywords in (('green', self.green_flag_keywords), ('red', self.red_flag_keywords)):
+            for category, keywords in flag_keywords.items():
+                for keyword in keywords:
+                    for form in self._forms(keyword):
+                        yield form, (flag_type, category, keyword)
+        for word in self.negation_words:
+            yield word, 'negation'
+        for word in self.consistency_words:
+            yield word, 'consistency'
+        for word in self.payment_words:
+            for form in self._forms(word):
+                yield form, 'payment_term'
+        yield 'time', 'time_term'
+    
+    def _forms(self, keyword: str) -> List[str]:
+        return [keyword, *self.keyword_forms.get(keyword, ())]
     
     def analyze_review_response(self, review_data: Dict) -> Dict:
         """Analyze a single review response and generate AI insights"""
@@ -104,33 +154,23 @@ class AIReviewAnalyzer:
     
     def _analyze_comments(self, comments: str) -> Tuple[List[str], List[str]]:
         """Analyze comments text for green and red flags"""
-        green_flags = []
-        red_flags = []
-        
-        # Check for green flag keywords
-        for category, keywords in self.green_flag_keywords.items():
-            for keyword in keywords:
-                if keyword in comments:
-                    flag_text = f"{category.title()}: {keyword}"
-                    if flag_text not in green_flags:
-                        green_flags.append(flag_text)
-        
-        # Check for red flag keywords
-        for category, keywords in self.red_flag_keywords.items():
-            for keyword in keywords:
-                if keyword in comments:
-                    flag_text = f"{category.title()}: {keyword}"
-                    if flag_text not in red_flags:
-                        red_flags.append(flag_text)
+        return self._flags_from_matches(self.keyword_matcher.find(comments))
+    
+    def _flags_from_matches(self, matched) -> Tuple[List[str], List[str]]:
+        # Flags keep the order of the keyword dictionaries, not of the text
+        green_flags = list(dict.fromkeys(
+            self._flag_texts[tag] for tag in sorted(matched & self._green_tags, key=self._flag_order.get)
+        ))
+        red_flags = list(dict.fromkeys(
+            self._flag_texts[tag] for tag in sorted(matched & self._red_tags, key=self._flag_order.get)
+        ))
         
         # Additional pattern-based analysis
-        if re.search(r'never|not|didn\'t|wouldn\'t|couldn\'t', comments):
-            if any(word in comments for word in ['pay', 'payment', 'rent']):
-                red_flags.append("Payment: Negative payment history mentioned")
+        if 'negation' in matched and 'payment_term' in matched:
+            red_flags.append("Payment: Negative payment history mentioned")
         
-        if re.search(r'always|every time|consistently', comments):
-            if any(word in comments for word in ['pay', 'payment', 'rent', 'time']):
-                green_flags.append("Payment: Consistent positive behavior")
+        if 'consistency' in matched and ('payment_term' in matched or 'time_term' in matched):
+            green_flags.append("Payment: Consistent positive behavior")
         
         return green_flags[:5], red_flags[:5]  # Limit to top 5 flags each
     
@@ -205,7 +245,56 @@ class AIReviewAnalyzer:
     
     def aggregate_user_profile(self, user_reviews: List[Dict]) -> Dict:
         """Aggregate multiple reviews to create a comprehensive user profile"""
-        if not user_reviews:
+        aggregate = self.new_profile_aggregate()
+        for review in user_reviews:
+            aggregate.add(review)
+        return aggregate.to_profile()
+    
+    def new_profile_aggregate(self) -> 'UserProfileAggregate':
+        """Empty running aggregate to keep per user and update as reviews arrive"""
+        return UserProfileAggregate(list(self.category_weights.keys()))
+
+class UserProfileAggregate:
+    """Running totals behind a user profile, updated one review at a time.
+    
+    Holds per-category sums and counts, flag counters and the last few AI
+    scores, so adding a review and reading the profile both cost the same
+    however many reviews the user has. to_profile() returns exactly what
+    aggregate_user_profile returns for the same reviews.
+    """
+    
+    RECENT_WINDOW = 3
+    
+    def __init__(self, categories: List[str]):
+        self.categories = categories
+        self.total_reviews = 0
+        self.score_sum = 0
+        self.score_count = 0
+        self.category_totals: Dict[str, List] = {}  # category -> [sum, count]
+        self.green_flags: Counter = Counter()
+        self.red_flags: Counter = Counter()
+        self.recent_scores: deque = deque(maxlen=self.RECENT_WINDOW)
+    
+    def add(self, review: Dict) -> None:
+        self.total_reviews += 1
+        
+        if 'ai_overall_score' in review:
+            self.score_sum += review['ai_overall_score']
+            self.score_count += 1
+            self.recent_scores.append(review['ai_overall_score'])
+        
+        for category in self.categories:
+            # A category left blank on the form is stored as None; it was not rated
+            if review.get(category) is not None:
+                totals = self.category_totals.setdefault(category, [0, 0])
+                totals[0] += review[category]
+                totals[1] += 1
+        
+        self.green_flags.update(review.get('ai_green_flags', []))
+        self.red_flags.update(review.get('ai_red_flags', []))
+    
+    def to_profile(self) -> Dict:
+        if not self.total_reviews:
             return {
                 'overall_ai_score': 0.0,
                 'total_reviews': 0,
@@ -215,53 +304,11 @@ class AIReviewAnalyzer:
                 'risk_trend': 'unknown'
             }
         
-        # Calculate averages
-        total_reviews = len(user_reviews)
-        category_sums = {}
-        all_green_flags = []
-        all_red_flags = []
-        ai_scores = []
-        
-        for review in user_reviews:
-            # Collect AI scores
-            if 'ai_overall_score' in review:
-                ai_scores.append(review['ai_overall_score'])
-            
-            # Collect category scores
-            for category in self.category_weights.keys():
-                if category in review:
-                    if category not in category_sums:
-                        category_sums[category] = []
-                    category_sums[category].append(review[category])
-            
-            # Collect flags
-            if 'ai_green_flags' in review:
-                all_green_flags.extend(review['ai_green_flags'])
-            if 'ai_red_flags' in review:
-                all_red_flags.extend(review['ai_red_flags'])
-        
-        # Calculate averages
-        overall_ai_score = round(sum(ai_scores) / len(ai_scores) if ai_scores else 0, 1)
-        category_averages = {
-            category: round(sum(scores) / len(scores), 2) if scores else 0
-            for category, scores in category_sums.items()
-        }
-        
-        # Count flag frequencies
-        green_flags_count = {}
-        for flag in all_green_flags:
-            green_flags_count[flag] = green_flags_count.get(flag, 0) + 1
-        
-        red_flags_count = {}
-        for flag in all_red_flags:
-            red_flags_count[flag] = red_flags_count.get(flag, 0) + 1
-        
         # Determine risk trend
-        if len(ai_scores) >= 3:
-            recent_scores = ai_scores[-3:]
-            if all(score >= 7 for score in recent_scores):
+        if self.score_count >= self.RECENT_WINDOW:
+            if all(score >= 7 for score in self.recent_scores):
                 risk_trend = 'improving'
-            elif all(score <= 5 for score in recent_scores):
+            elif all(score <= 5 for score in self.recent_scores):
                 risk_trend = 'declining'
             else:
                 risk_trend = 'stable'
@@ -269,13 +316,39 @@ class AIReviewAnalyzer:
             risk_trend = 'insufficient_data'
         
         return {
-            'overall_ai_score': overall_ai_score,
-            'total_reviews': total_reviews,
-            'category_averages': category_averages,
-            'green_flags_summary': green_flags_count,
-            'red_flags_summary': red_flags_count,
+            'overall_ai_score': round(self.score_sum / self.score_count if self.score_count else 0, 1),
+            'total_reviews': self.total_reviews,
+            'category_averages': {
+                category: round(total / count, 2) for category, (total, count) in self.category_totals.items()
+            },
+            'green_flags_summary': dict(self.green_flags),
+            'red_flags_summary': dict(self.red_flags),
             'risk_trend': risk_trend
         }
+    
+    def to_dict(self) -> Dict:
+        """Compact JSON-safe state: a few numbers and counters, never the reviews themselves"""
+        return {
+            'total_reviews': self.total_reviews,
+            'score_sum': self.score_sum,
+            'score_count': self.score_count,
+            'category_totals': self.category_totals,
+            'green_flags': dict(self.green_flags),
+            'red_flags': dict(self.red_flags),
+            'recent_scores': list(self.recent_scores)
+        }
+    
+    @classmethod
+    def from_dict(cls, categories: List[str], data: Dict) -> 'UserProfileAggregate':
+        aggregate = cls(categories)
+        aggregate.total_reviews = data['total_reviews']
+        aggregate.score_sum = data['score_sum']
+        aggregate.score_count = data['score_count']
+        aggregate.category_totals = {category: list(totals) for category, totals in data['category_totals'].items()}
+        aggregate.green_flags = Counter(data['green_flags'])
+        aggregate.red_flags = Counter(data['red_flags'])
+        aggregate.recent_scores.extend(data['recent_scores'])
+        return aggregate
 
 # Initialize AI review analyzer instance
 ai_review_analyzer = AIReviewAnalyzer() 
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Platform Counters for Rentum AI
+Totals, per-category counts and per-minute rates kept current by the stores' write paths
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.repositories import Repository
+
+
+class EventRate:
+    """Events per minute over a sliding window, in a ring of one bucket per minute.
+
+    Recording touches one bucket and a query sums ``minutes`` buckets, so
+    both cost the same however many events came before. A bucket whose
+    minute has gone by is reset the next time its slot comes round.
+    """
+
+    def __init__(self, minutes: int = 60, clock: Callable[[], float] = time.time):
+        self.minutes = minutes
+        self.clock = clock
+        self._counts = [0] * minutes
+        self._minute_of = [-1] * minutes
+
+    def record(self, count: int = 1) -> None:
+        minute = int(self.clock() // 60)
+        slot = minute % self.minutes
+        if self._minute_of[slot] != minute:
+            self._minute_of[slot] = minute
+            self._counts[slot] = 0
+        self._counts[slot] += count
+
+    def per_minute(self) -> List[int]:
+        """Counts for each of the last ``minutes`` minutes, oldest first, current minute last"""
+        now = int(self.clock() // 60)
+        counts = []
+        for minute in range(now - self.minutes + 1, now + 1):
+            slot = minute % self.minutes
+            counts.append(self._counts[slot] if self._minute_of[slot] == minute else 0)
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self.per_minute()
+        total = sum(counts)
+        return {
+            'current_minute': counts[-1],
+            f'last_{self.minutes}_minutes': total,
+            'avg_per_minute': round(total / self.minutes, 2),
+            'peak_per_minute': max(counts),
+        }
+
+
+class CounterRegistry:
+    """Counts for each tracked store, kept current as records are stored.
+
+    ``track`` counts a store's existing records once, grouped by an indexed
+    field (SQLite stores survive restarts), and then subscribes to its
+    writes, so reading the counters never touches the stores. Rates only count writes made by this process.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, rate_minutes: int = 60):
+        self.clock = clock
+        self.rate_minutes = rate_minutes
+        self.totals: Dict[str, int] = {}
+        self.by_field: Dict[str, Dict[str, int]] = {}
+        self.rates: Dict[str, EventRate] = {}
+        self._fields: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def track(self, name: str, repository: Repository, field: Optional[str] = None, rate: bool = False) -> None:
+        """Count ``repository``'s records as ``name``, broken down by ``field``, with a per-minute rate"""
+        self._fields[name] = field
+        self.totals[name] = 0
+        if field:
+            self.by_field[name] = defaultdict(int)
+        if rate:
+            self.rates[name] = EventRate(self.rate_minutes, self.clock)
+        if field:
+            self.by_field[name].update(repository.count_by(field))
+            self.totals[name] = sum(self.by_field[name].values())
+        else:
+            self.totals[name] = repository.count()
+        repository.subscribe(lambda record: self.added(name, record))
+
+    def added(self, name: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._count(name, record)
+            rate = self.rates.get(name)
+            if rate:
+                rate.record()
+
+    def _count(self, name: str, record: Dict[str, Any]) -> None:
+        self.totals[name] += 1
+        field = self._fields[name]
+        if field:
+            self.by_field[name][str(record.get(field))] += 1
+
+    def count(self, name: str, value: Optional[str] = None) -> int:
+        if value is None:
+            return self.totals[name]
+        return self.by_field[name].get(value, 0)
+
+    def breakdown(self, name: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.by_field[name])
+
+    def rate_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {f'{name}_per_minute': rate.stats() for name, rate in self.rates.items()}
@@ -1,10 +1,22 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import json
+import os
 from datetime import datetime
 
+from backend.ai_review_service import ai_review_analyzer
+from backend.counters import CounterRegistry
+from backend.profile_cache import UserProfileCache
+from backend.repositories import repository_from_env
+from shared.cached_responses import CachedJSON, etag_matches
+from shared.compression import CompressionMiddleware, CompressionStats, compression_options_from_env
+from shared.metrics import MetricsMiddleware, MetricsRegistry
+from shared.profiling import ProfilingMiddleware, admin_token_valid, profile_store_from_env, profiling_options_from_env
+from shared.scan_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, summarize_scan
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Rentum AI Backend",
@@ -21,8 +33,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses for mobile clients; per-route byte ratios are in /stats
+compression_stats = CompressionStats()
+app.add_middleware(CompressionMiddleware, stats=compression_stats, **compression_options_from_env())
+
+# Single-request profiling, only installed with PROFILING_ENABLED (see /admin/profiles)
+profile_store = profile_store_from_env()
+profiling_options = profiling_options_from_env()
+if profile_store:
+    app.add_middleware(ProfilingMiddleware, store=profile_store, **profiling_options)
+
+# Request metrics on /metrics; outermost, so latency covers every other middleware
+metrics = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Demo data with proper typing
-users_db: List[Dict[str, Any]] = [
+DEMO_USERS: List[Dict[str, Any]] = [
     {
         "id": "1",
         "name": "Alice Johnson",
@@ -57,7 +83,7 @@ users_db: List[Dict[str, Any]] = [
     }
 ]
 
-properties_db: List[Dict[str, Any]] = [
+DEMO_PROPERTIES: List[Dict[str, Any]] = [
     {
         "id": "1",
         "owner_id": "2",
@@ -76,7 +102,7 @@ properties_db: List[Dict[str, Any]] = [
     }
 ]
 
-agreements_db: List[Dict[str, Any]] = [
+DEMO_AGREEMENTS: List[Dict[str, Any]] = [
     {
         "id": "1",
         "property_id": "1",
@@ -91,10 +117,39 @@ agreements_db: List[Dict[str, Any]] = [
     }
 ]
 
-# Initialize empty lists for runtime data
-ocr_scans_db: List[Dict[str, Any]] = []
-review_requests_db: List[Dict[str, Any]] = []
-review_responses_db: List[Dict[str, Any]] = []
+# Record stores: in-memory lists by default, SQLite with BACKEND_STORE=sqlite.
+# The second argument lists the indexed fields each store can be filtered on.
+users_db = repository_from_env("users", ("role", "email"))
+properties_db = repository_from_env("properties", ("owner_id", "status"))
+agreements_db = repository_from_env("agreements", ("property_id", "landlord_id", "tenant_id"))
+ocr_scans_db = repository_from_env("ocr_scans", ("user_id", "document_type"))
+review_requests_db = repository_from_env("review_requests", ("requester_id", "property_id"))
+review_responses_db = repository_from_env("review_responses", ("request_id", "ai_risk_assessment"))
+
+users_db.seed(DEMO_USERS)
+properties_db.seed(DEMO_PROPERTIES)
+agreements_db.seed(DEMO_AGREEMENTS)
+
+# Counts behind /stats, kept current by every store write instead of counted per request
+platform_counters = CounterRegistry()
+platform_counters.track("users", users_db, field="role")
+platform_counters.track("properties", properties_db, field="status")
+platform_counters.track("agreements", agreements_db)
+platform_counters.track("ocr_scans", ocr_scans_db, field="document_type", rate=True)
+platform_counters.track("review_requests", review_requests_db, rate=True)
+platform_counters.track("review_responses", review_responses_db, field="ai_risk_assessment", rate=True)
+
+def reviews_about_user(user_id: str) -> List[Dict[str, Any]]:
+    """Every review response to a request made by the user (used to fill the profile cache)"""
+    responses = [
+        response
+        for request in review_requests_db.find(requester_id=user_id)
+        for response in review_responses_db.find(request_id=request["id"])
+    ]
+    return sorted(responses, key=lambda response: int(response["id"]))
+
+# Materialized user_profiles, kept current as review responses come in
+user_profiles = UserProfileCache(ai_review_analyzer, reviews_about_user)
 
 # Pydantic models for type safety
 class UserOut(BaseModel):
@@ -160,15 +215,13 @@ class ReviewResponseOut(BaseModel):
     created_at: str
 
 # API Endpoints
-@app.get("/")
-async def read_root() -> Dict[str, Any]:
+def root_payload() -> Dict[str, Any]:
     return {
         "message": "🎉 Rentum AI Backend is WORKING!",
         "status": "operational",
         "version": "1.0.0",
         "environment": "production",
         "deployment": "vercel",
-        "timestamp": datetime.now().isoformat(),
         "features": [
             "✅ User Management",
             "✅ Property Management", 
@@ -179,16 +232,15 @@ async def read_root() -> Dict[str, Any]:
         ]
     }
 
-@app.get("/demo")
-async def get_demo_info() -> Dict[str, Any]:
+def demo_payload() -> Dict[str, Any]:
     return {
         "message": "🎭 Demo users and data available for testing",
         "total_users": len(users_db),
         "total_properties": len(properties_db),
         "total_agreements": len(agreements_db),
-        "users": users_db,
-        "properties": properties_db,
-        "agreements": agreements_db,
+        "users": users_db.all(),
+        "properties": properties_db.all(),
+        "agreements": agreements_db.all(),
         "instructions": [
             "Use any email from users list to test login",
             "Upload documents for OCR testing",
@@ -204,13 +256,12 @@ async def get_demo_info() -> Dict[str, Any]:
         ]
     }
 
-@app.get("/health")
-async def health_check() -> Dict[str, Any]:
+def health_payload() -> Dict[str, Any]:
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "uptime": "running",
-        "database": "in-memory",
+        "database": users_db.backend,
         "services": {
             "api": "✅ operational",
             "ocr": "✅ ready", 
@@ -219,17 +270,43 @@ async def health_check() -> Dict[str, Any]:
         }
     }
 
+# The frontend polls these on every page load, so their bodies are serialized
+# once and rebuilt only when a store they read from changes; clients
+# revalidate with If-None-Match and get a 304. /health is built per request,
+# since its timestamp is the point of calling it.
+root_response = CachedJSON(root_payload)
+demo_response = CachedJSON(demo_payload,
+                           version=lambda: (users_db.version, properties_db.version, agreements_db.version))
+users_response = CachedJSON(users_db.all, version=lambda: users_db.version)
+properties_response = CachedJSON(properties_db.all, version=lambda: properties_db.version)
+
+@app.get("/")
+async def read_root(request: Request) -> Response:
+    return root_response.response(request)
+
+@app.get("/demo")
+async def get_demo_info(request: Request) -> Response:
+    return demo_response.response(request)
+
+@app.get("/health")
+async def health_check() -> Dict[str, Any]:
+    return health_payload()
+
+# These two only touch the store when it has changed since the cached body was
+# built, so they stay on the event loop instead of a thread pool hop per request
 @app.get("/users", response_model=List[UserOut])
-async def list_users() -> List[Dict[str, Any]]:
-    return users_db
+async def list_users(request: Request) -> Response:
+    return users_response.response(request)
 
 @app.get("/properties", response_model=List[PropertyOut]) 
-async def list_properties() -> List[Dict[str, Any]]:
-    return properties_db
+async def list_properties(request: Request) -> Response:
+    return properties_response.response(request)
 
+# Store reads are plain (sync) handlers so FastAPI runs them on its thread pool,
+# where the SQLite backend serves them concurrently from per-thread connections
 @app.get("/agreements", response_model=List[AgreementOut])
-async def list_agreements() -> List[Dict[str, Any]]:
-    return agreements_db
+def list_agreements() -> List[Dict[str, Any]]:
+    return agreements_db.all()
 
 @app.post("/ocr/scan", response_model=OCRScanOut)
 async def scan_document(
@@ -241,7 +318,6 @@ async def scan_document(
     
     # Simulate OCR processing
     new_scan = {
-        "id": str(len(ocr_scans_db) + 1),
         "user_id": user_id,
         "document_type": document_type,
         "extracted_data": {
@@ -262,15 +338,27 @@ async def scan_document(
         "created_at": datetime.now().isoformat()
     }
     
-    ocr_scans_db.append(new_scan)
-    return new_scan
+    return ocr_scans_db.add(new_scan)
 
 @app.get("/ocr/scans")
-async def list_ocr_scans(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    """List OCR scans, optionally filtered by user"""
-    if user_id:
-        return [scan for scan in ocr_scans_db if scan["user_id"] == user_id]
-    return ocr_scans_db
+def list_ocr_scans(
+    user_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+) -> Dict[str, Any]:
+    """List OCR scans oldest first, optionally filtered by user; pass next_cursor as after for the next page"""
+    filters = {"user_id": user_id} if user_id else {}
+    try:
+        scans, next_cursor = ocr_scans_db.page(limit, after, **filters)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "scans": [summarize_scan(scan) for scan in scans],
+        "total": ocr_scans_db.count(**filters),
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
 
 @app.post("/reviews/request", response_model=ReviewRequestOut)
 async def create_review_request(
@@ -281,7 +369,6 @@ async def create_review_request(
 ) -> Dict[str, Any]:
     """Create a new review request"""
     new_request = {
-        "id": str(len(review_requests_db) + 1),
         "requester_id": requester_id,
         "reviewer_email": reviewer_email,
         "request_type": request_type,
@@ -291,15 +378,14 @@ async def create_review_request(
         "created_at": datetime.now().isoformat()
     }
     
-    review_requests_db.append(new_request)
-    return new_request
+    return review_requests_db.add(new_request)
 
 @app.get("/reviews/requests")
-async def list_review_requests(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+def list_review_requests(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """List review requests"""
     if user_id:
-        return [req for req in review_requests_db if req["requester_id"] == user_id]
-    return review_requests_db
+        return review_requests_db.find(requester_id=user_id)
+    return review_requests_db.all()
 
 @app.post("/reviews/response", response_model=ReviewResponseOut)
 async def submit_review_response(
@@ -321,7 +407,6 @@ async def submit_review_response(
     risk_level = "low" if overall_rating >= 4 else "medium" if overall_rating >= 3 else "high"
     
     new_response = {
-        "id": str(len(review_responses_db) + 1),
         "request_id": request_id,
         "overall_rating": overall_rating,
         "comments": comments,
@@ -336,26 +421,74 @@ async def submit_review_response(
         "created_at": datetime.now().isoformat()
     }
     
-    review_responses_db.append(new_response)
+    new_response = review_responses_db.add(new_response)
+
+    review_request = review_requests_db.get(request_id)
+    if review_request:
+        user_profiles.record_review(review_request["requester_id"], new_response)
     return new_response
 
+@app.get("/users/{user_id}/profile")
+def get_user_profile(user_id: str, request: Request, response: Response):
+    """Aggregated review profile for a user, served from the user_profiles cache with an ETag"""
+    if users_db.get(user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    entry = user_profiles.get(user_id)
+    headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+    # Compression weakens the ETag, so clients may send back W/"..."
+    if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+        user_profiles.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return {"user_id": user_id, **entry["profile"], "last_updated": entry["last_updated"]}
+
 @app.get("/stats")
 async def get_stats() -> Dict[str, Any]:
-    """Get platform statistics"""
+    """Get platform statistics (from platform_counters; no store is read)"""
     return {
-        "total_users": len(users_db),
-        "total_properties": len(properties_db), 
-        "total_agreements": len(agreements_db),
-        "total_ocr_scans": len(ocr_scans_db),
-        "total_review_requests": len(review_requests_db),
-        "total_review_responses": len(review_responses_db),
+        "total_users": platform_counters.count("users"),
+        "total_properties": platform_counters.count("properties"), 
+        "total_agreements": platform_counters.count("agreements"),
+        "total_ocr_scans": platform_counters.count("ocr_scans"),
+        "total_review_requests": platform_counters.count("review_requests"),
+        "total_review_responses": platform_counters.count("review_responses"),
+        "user_profile_cache": user_profiles.stats(),
+        "compression": compression_stats.stats(),
         "user_breakdown": {
-            "tenants": len([u for u in users_db if u["role"] == "tenant"]),
-            "landlords": len([u for u in users_db if u["role"] == "landlord"])
+            "tenants": platform_counters.count("users", "tenant"),
+            "landlords": platform_counters.count("users", "landlord")
         },
+        "properties_by_status": platform_counters.breakdown("properties"),
+        "scans_by_document_type": platform_counters.breakdown("ocr_scans"),
+        "reviews_by_risk_level": platform_counters.breakdown("review_responses"),
+        "rates": platform_counters.rate_stats(),
         "system_status": "operational"
     }
 
+@app.get("/metrics")
+async def metrics_endpoint() -> Response:
+    """Prometheus metrics for this instance"""
+    return metrics.response()
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """Stored request profiles, newest first"""
+    if not admin_token_valid(profile_store, profiling_options["token"], x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the admin token is wrong")
+    return {"profiles": profile_store.list(), "max_profiles": profile_store.max_profiles}
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)) -> FileResponse:
+    """One stored profile: collapsed stacks (.txt) or cProfile stats (.prof)"""
+    if not admin_token_valid(profile_store, profiling_options["token"], x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the admin token is wrong")
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
+
 # Add some utility endpoints for demo
 @app.get("/test")
 async def test_endpoint() -> Dict[str, str]:
@@ -1,9 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Type
+from datetime import datetime
+from decimal import Decimal
+import anyio
 import asyncpg
+import codecs
+import csv
+import json
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -185,10 +193,183 @@ class ChatMessageOut(BaseModel):
     property_id: Optional[str]
     created_at: str
 
+class InsertStatement:
+    """INSERT ... RETURNING for one table.
+
+    Columns not in ``columns`` (created_at, and status where the handler uses
+    the schema default) are filled in by the database and sent back through
+    RETURNING, so a create is a single round trip. The SQL text never
+    changes, so asyncpg keeps it prepared in each connection's statement
+    cache and repeat inserts skip the Parse step.
+    """
+
+    def __init__(self, table: str, columns: Tuple[str, ...], returning: Tuple[str, ...]):
+        self.columns = columns
+        placeholders = ", ".join(f"${position}" for position in range(1, len(columns) + 1))
+        self.sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+                    f"RETURNING {', '.join(returning)}")
+
+    async def execute(self, connection, record: Dict[str, Any]) -> Dict[str, Any]:
+        row = await connection.fetchrow(self.sql, *[record[column] for column in self.columns])
+        return {key: str(value) if isinstance(value, datetime) else value for key, value in row.items()}
+
+INSERTS = {
+    "users": InsertStatement("users", ("id", "name", "email", "phone", "profile_photo", "role"), ("created_at",)),
+    "properties": InsertStatement("properties", ("id", "owner_id", "address", "details", "status"), ("created_at",)),
+    "agreements": InsertStatement(
+        "agreements",
+        ("id", "property_id", "landlord_id", "tenant_id", "start_date", "end_date", "rent", "deposit", "clauses", "document_url"),
+        ("status", "created_at")
+    ),
+    "documents": InsertStatement("documents", ("id", "user_id", "property_id", "doc_type", "url"), ("uploaded_at",)),
+    "payments": InsertStatement(
+        "payments", ("id", "user_id", "property_id", "amount", "payment_type", "proof_url"), ("status", "created_at")
+    ),
+    "recommendations": InsertStatement(
+        "recommendations", ("id", "from_user_id", "to_user_id", "text", "property_id", "ai_rating"), ("created_at",)
+    ),
+    "issues": InsertStatement("issues", ("id", "property_id", "raised_by", "details"), ("status", "created_at")),
+    "notifications": InsertStatement(
+        "notifications", ("id", "recipient_id", "notif_type", "method", "content"), ("status", "created_at")
+    ),
+    "chat_messages": InsertStatement(
+        "chat_messages", ("id", "from_user_id", "to_user_id", "message", "property_id"), ("created_at",)
+    ),
+}
+
+async def insert_record(table: str, record: Dict[str, Any], fallback: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Insert a new record with one INSERT ... RETURNING, or keep it in memory without a database"""
+    if app.state.db:
+        try:
+            async with app.state.db.acquire() as connection:
+                record.update(await INSERTS[table].execute(connection, record))
+            return record
+        except Exception as e:
+            print(f"Database error, using in-memory: {e}")
+    fallback.append(record)
+    return record
+
+# ===== STREAMED LISTS =====
+# List endpoints read through a server-side cursor and write JSON as rows arrive,
+# so memory stays flat and the first bytes go out after the first batch
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "500"))
+
+def json_default(value: Any) -> Any:
+    """Encode the column types asyncpg returns that json does not know"""
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class JSONRowEncoder:
+    """Encodes batches of rows as one JSON array spread over many chunks, or as NDJSON.
+
+    Rows come from our own tables, so they are written as they are instead of
+    being re-validated through the endpoint's response_model.
+    """
+
+    def __init__(self, ndjson: bool):
+        self.ndjson = ndjson
+        self.media_type = "application/x-ndjson" if ndjson else "application/json"
+        self._wrote_row = False
+
+    def head(self) -> bytes:
+        return b"" if self.ndjson else b"["
+
+    def rows(self, rows: Iterable[Any]) -> bytes:
+        encoded = [json.dumps(dict(row), default=json_default, separators=(",", ":")) for row in rows]
+        if not encoded:
+            return b""
+        if self.ndjson:
+            return ("\n".join(encoded) + "\n").encode("utf-8")
+        text = ",".join(encoded)
+        if self._wrote_row:
+            text = "," + text
+        self._wrote_row = True
+        return text.encode("utf-8")
+
+    def tail(self) -> bytes:
+        return b"" if self.ndjson else b"]"
+
+def wants_ndjson(request: Request) -> bool:
+    return (request.query_params.get("format") == "ndjson"
+            or "application/x-ndjson" in request.headers.get("accept", ""))
+
+async def stream_cursor(connection, transaction, cursor, first_batch: List[Any],
+                        encoder: JSONRowEncoder) -> AsyncIterator[bytes]:
+    try:
+        yield encoder.head()
+        batch = first_batch
+        while batch:
+            yield encoder.rows(batch)
+            if len(batch) < STREAM_BATCH_ROWS:
+                break
+            batch = await cursor.fetch(STREAM_BATCH_ROWS)
+        yield encoder.tail()
+    finally:
+        # A client disconnect cancels the response mid-stream; shield the cleanup
+        # so the cancellation can't interrupt it and leak the pooled connection
+        with anyio.CancelScope(shield=True):
+            try:
+                await transaction.rollback()
+            finally:
+                await app.state.db.release(connection)
+
+async def stream_records(records: List[Dict[str, Any]], encoder: JSONRowEncoder) -> AsyncIterator[bytes]:
+    yield encoder.head()
+    # Records appended while streaming are left for the next request
+    total = len(records)
+    for start in range(0, total, STREAM_BATCH_ROWS):
+        yield encoder.rows(records[start:min(start + STREAM_BATCH_ROWS, total)])
+    yield encoder.tail()
+
+async def stream_list(request: Request, sql: str, fallback: List[Dict[str, Any]]) -> StreamingResponse:
+    """Stream a table as a JSON array (or NDJSON with ?format=ndjson or Accept: application/x-ndjson).
+
+    The cursor is opened and the first batch fetched before the response
+    starts, so a database failure still falls back to the in-memory list.
+    """
+    encoder = JSONRowEncoder(wants_ndjson(request))
+    if app.state.db:
+        try:
+            connection = await app.state.db.acquire()
+            try:
+                # Postgres cursors only live inside a transaction
+                transaction = connection.transaction(readonly=True)
+                await transaction.start()
+                cursor = await connection.cursor(sql)
+                first_batch = await cursor.fetch(STREAM_BATCH_ROWS)
+            except BaseException:
+                await app.state.db.release(connection)
+                raise
+            return StreamingResponse(stream_cursor(connection, transaction, cursor, first_batch, encoder),
+                                     media_type=encoder.media_type)
+        except Exception as e:
+            print(f"Database error, using in-memory: {e}")
+    return StreamingResponse(stream_records(fallback, encoder), media_type=encoder.media_type)
+
+async def init_connection(connection):
+    # JSONB columns (details, clauses) take and return dicts. The codec is binary
+    # (a version byte, then the JSON text) so COPY can encode them too.
+    await connection.set_type_codec(
+        "jsonb",
+        encoder=lambda value: b"\x01" + json.dumps(value).encode("utf-8"),
+        decoder=lambda data: json.loads(data[1:]),
+        schema="pg_catalog",
+        format="binary"
+    )
+
 @app.on_event("startup")
 async def startup():
     try:
-        app.state.db = await asyncpg.create_pool(DATABASE_URL)
+        # Set DB_STATEMENT_CACHE_SIZE=0 behind a transaction-mode pooler (e.g. Supabase's
+        # pgbouncer on port 6543), which cannot keep prepared statements per connection
+        app.state.db = await asyncpg.create_pool(
+            DATABASE_URL,
+            init=init_connection,
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+        )
         print("✅ Connected to Supabase database successfully!")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
@@ -224,33 +405,11 @@ async def create_user(user: UserCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_user["created_at"] = str(result)
-                await connection.execute("INSERT INTO users (id, name, email, phone, profile_photo, role, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7)",
-                                        new_user["id"], new_user["name"], new_user["email"], new_user["phone"], new_user["profile_photo"], new_user["role"], new_user["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            users_db.append(new_user)
-    else:
-        users_db.append(new_user)
-    
-    return new_user
+    return await insert_record("users", new_user, users_db)
 
 @app.get("/users", response_model=List[UserOut])
-async def list_users():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, name, email, phone, profile_photo, role, created_at FROM users")
-                return [{"id": row["id"], "name": row["name"], "email": row["email"], "phone": row["phone"], "profile_photo": row["profile_photo"], "role": row["role"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return users_db
-    else:
-        return users_db
+async def list_users(request: Request):
+    return await stream_list(request, "SELECT id, name, email, phone, profile_photo, role, created_at FROM users", users_db)
 
 @app.post("/properties", response_model=PropertyOut)
 async def create_property(property: PropertyCreate):
@@ -263,33 +422,11 @@ async def create_property(property: PropertyCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_property["created_at"] = str(result)
-                await connection.execute("INSERT INTO properties (id, owner_id, address, details, status, created_at) VALUES ($1, $2, $3, $4, $5, $6)",
-                                        new_property["id"], new_property["owner_id"], new_property["address"], new_property["details"], new_property["status"], new_property["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            properties_db.append(new_property)
-    else:
-        properties_db.append(new_property)
-    
-    return new_property
+    return await insert_record("properties", new_property, properties_db)
 
 @app.get("/properties", response_model=List[PropertyOut])
-async def list_properties():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, owner_id, address, details, status, created_at FROM properties")
-                return [{"id": row["id"], "owner_id": row["owner_id"], "address": row["address"], "details": dict(row["details"]) if row["details"] else None, "status": row["status"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return properties_db
-    else:
-        return properties_db
+async def list_properties(request: Request):
+    return await stream_list(request, "SELECT id, owner_id, address, details, status, created_at FROM properties", properties_db)
 
 @app.post("/auth/otp")
 async def request_otp(email_or_phone: str):
@@ -344,33 +481,11 @@ async def create_agreement(agreement: AgreementCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_agreement["created_at"] = str(result)
-                await connection.execute("INSERT INTO agreements (id, property_id, landlord_id, tenant_id, start_date, end_date, rent, deposit, clauses, document_url, status, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)",
-                                        new_agreement["id"], new_agreement["property_id"], new_agreement["landlord_id"], new_agreement["tenant_id"], new_agreement["start_date"], new_agreement["end_date"], new_agreement["rent"], new_agreement["deposit"], new_agreement["clauses"], new_agreement["document_url"], new_agreement["status"], new_agreement["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            agreements_db.append(new_agreement)
-    else:
-        agreements_db.append(new_agreement)
-    
-    return new_agreement
+    return await insert_record("agreements", new_agreement, agreements_db)
 
 @app.get("/agreements", response_model=List[AgreementOut])
-async def list_agreements():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, property_id, landlord_id, tenant_id, start_date, end_date, rent, deposit, clauses, document_url, status, created_at FROM agreements")
-                return [{"id": row["id"], "property_id": row["property_id"], "landlord_id": row["landlord_id"], "tenant_id": row["tenant_id"], "start_date": row["start_date"], "end_date": row["end_date"], "rent": float(row["rent"]), "deposit": float(row["deposit"]), "clauses": dict(row["clauses"]) if row["clauses"] else None, "document_url": row["document_url"], "status": row["status"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return agreements_db
-    else:
-        return agreements_db
+async def list_agreements(request: Request):
+    return await stream_list(request, "SELECT id, property_id, landlord_id, tenant_id, start_date, end_date, rent, deposit, clauses, document_url, status, created_at FROM agreements", agreements_db)
 
 @app.post("/documents", response_model=DocumentOut)
 async def upload_document(document: DocumentCreate):
@@ -380,33 +495,11 @@ async def upload_document(document: DocumentCreate):
         "uploaded_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_document["uploaded_at"] = str(result)
-                await connection.execute("INSERT INTO documents (id, user_id, property_id, doc_type, url, uploaded_at) VALUES ($1, $2, $3, $4, $5, $6)",
-                                        new_document["id"], new_document["user_id"], new_document["property_id"], new_document["doc_type"], new_document["url"], new_document["uploaded_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            documents_db.append(new_document)
-    else:
-        documents_db.append(new_document)
-    
-    return new_document
+    return await insert_record("documents", new_document, documents_db)
 
 @app.get("/documents", response_model=List[DocumentOut])
-async def list_documents():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, user_id, property_id, doc_type, url, uploaded_at FROM documents")
-                return [{"id": row["id"], "user_id": row["user_id"], "property_id": row["property_id"], "doc_type": row["doc_type"], "url": row["url"], "uploaded_at": str(row["uploaded_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return documents_db
-    else:
-        return documents_db
+async def list_documents(request: Request):
+    return await stream_list(request, "SELECT id, user_id, property_id, doc_type, url, uploaded_at FROM documents", documents_db)
 
 @app.post("/payments", response_model=PaymentOut)
 async def create_payment(payment: PaymentCreate):
@@ -417,33 +510,11 @@ async def create_payment(payment: PaymentCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_payment["created_at"] = str(result)
-                await connection.execute("INSERT INTO payments (id, user_id, property_id, amount, payment_type, proof_url, status, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)",
-                                        new_payment["id"], new_payment["user_id"], new_payment["property_id"], new_payment["amount"], new_payment["payment_type"], new_payment["proof_url"], new_payment["status"], new_payment["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            payments_db.append(new_payment)
-    else:
-        payments_db.append(new_payment)
-    
-    return new_payment
+    return await insert_record("payments", new_payment, payments_db)
 
 @app.get("/payments", response_model=List[PaymentOut])
-async def list_payments():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, user_id, property_id, amount, payment_type, proof_url, status, created_at FROM payments")
-                return [{"id": row["id"], "user_id": row["user_id"], "property_id": row["property_id"], "amount": row["amount"], "payment_type": row["payment_type"], "proof_url": row["proof_url"], "status": row["status"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return payments_db
-    else:
-        return payments_db
+async def list_payments(request: Request):
+    return await stream_list(request, "SELECT id, user_id, property_id, amount, payment_type, proof_url, status, created_at FROM payments", payments_db)
 
 @app.post("/recommendations", response_model=RecommendationOut)
 async def create_recommendation(rec: RecommendationCreate):
@@ -454,33 +525,11 @@ async def create_recommendation(rec: RecommendationCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_recommendation["created_at"] = str(result)
-                await connection.execute("INSERT INTO recommendations (id, from_user_id, to_user_id, text, property_id, ai_rating, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7)",
-                                        new_recommendation["id"], new_recommendation["from_user_id"], new_recommendation["to_user_id"], new_recommendation["text"], new_recommendation["property_id"], new_recommendation["ai_rating"], new_recommendation["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            recommendations_db.append(new_recommendation)
-    else:
-        recommendations_db.append(new_recommendation)
-    
-    return new_recommendation
+    return await insert_record("recommendations", new_recommendation, recommendations_db)
 
 @app.get("/recommendations", response_model=List[RecommendationOut])
-async def list_recommendations():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, from_user_id, to_user_id, text, property_id, ai_rating, created_at FROM recommendations")
-                return [{"id": row["id"], "from_user_id": row["from_user_id"], "to_user_id": row["to_user_id"], "text": row["text"], "property_id": row["property_id"], "ai_rating": row["ai_rating"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return recommendations_db
-    else:
-        return recommendations_db
+async def list_recommendations(request: Request):
+    return await stream_list(request, "SELECT id, from_user_id, to_user_id, text, property_id, ai_rating, created_at FROM recommendations", recommendations_db)
 
 @app.post("/issues", response_model=IssueOut)
 async def create_issue(issue: IssueCreate):
@@ -491,33 +540,11 @@ async def create_issue(issue: IssueCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_issue["created_at"] = str(result)
-                await connection.execute("INSERT INTO issues (id, property_id, raised_by, details, status, created_at) VALUES ($1, $2, $3, $4, $5, $6)",
-                                        new_issue["id"], new_issue["property_id"], new_issue["raised_by"], new_issue["details"], new_issue["status"], new_issue["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            issues_db.append(new_issue)
-    else:
-        issues_db.append(new_issue)
-    
-    return new_issue
+    return await insert_record("issues", new_issue, issues_db)
 
 @app.get("/issues", response_model=List[IssueOut])
-async def list_issues():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, property_id, raised_by, details, status, created_at FROM issues")
-                return [{"id": row["id"], "property_id": row["property_id"], "raised_by": row["raised_by"], "details": row["details"], "status": row["status"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return issues_db
-    else:
-        return issues_db
+async def list_issues(request: Request):
+    return await stream_list(request, "SELECT id, property_id, raised_by, details, status, created_at FROM issues", issues_db)
 
 @app.post("/notifications", response_model=NotificationOut)
 async def create_notification(notif: NotificationCreate):
@@ -528,33 +555,11 @@ async def create_notification(notif: NotificationCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_notification["created_at"] = str(result)
-                await connection.execute("INSERT INTO notifications (id, recipient_id, notif_type, method, content, status, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7)",
-                                        new_notification["id"], new_notification["recipient_id"], new_notification["notif_type"], new_notification["method"], new_notification["content"], new_notification["status"], new_notification["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            notifications_db.append(new_notification)
-    else:
-        notifications_db.append(new_notification)
-    
-    return new_notification
+    return await insert_record("notifications", new_notification, notifications_db)
 
 @app.get("/notifications", response_model=List[NotificationOut])
-async def list_notifications():
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, recipient_id, notif_type, method, content, status, created_at FROM notifications")
-                return [{"id": row["id"], "recipient_id": row["recipient_id"], "notif_type": row["notif_type"], "method": row["method"], "content": row["content"], "status": row["status"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            return notifications_db
-    else:
-        return notifications_db
+async def list_notifications(request: Request):
+    return await stream_list(request, "SELECT id, recipient_id, notif_type, method, content, status, created_at FROM notifications", notifications_db)
 
 @app.post("/chat", response_model=ChatMessageOut)
 async def send_message(msg: ChatMessageCreate):
@@ -564,33 +569,192 @@ async def send_message(msg: ChatMessageCreate):
         "created_at": "2024-01-01T00:00:00"
     }
     
-    if app.state.db:
-        try:
-            async with app.state.db.acquire() as connection:
-                result = await connection.fetchval("SELECT NOW()")
-                new_message["created_at"] = str(result)
-                await connection.execute("INSERT INTO chat_messages (id, from_user_id, to_user_id, message, property_id, created_at) VALUES ($1, $2, $3, $4, $5, $6)",
-                                        new_message["id"], new_message["from_user_id"], new_message["to_user_id"], new_message["message"], new_message["property_id"], new_message["created_at"])
-        except Exception as e:
-            print(f"Database error, using in-memory: {e}")
-            chat_db.append(new_message)
-    else:
-        chat_db.append(new_message)
-    
-    return new_message
+    return await insert_record("chat_messages", new_message, chat_db)
 
 @app.get("/chat", response_model=List[ChatMessageOut])
-async def list_messages():
+async def list_messages(request: Request):
+    return await stream_list(request, "SELECT id, from_user_id, to_user_id, message, property_id, created_at FROM chat_messages", chat_db)
+
+# ===== BULK IMPORT =====
+# CSV (with a header row; quoted fields may span lines) or NDJSON, streamed from the request body
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+MAX_REPORTED_ERRORS = 100
+CSV_JSON_FIELDS = ("clauses",)
+
+class ImportTarget:
+    """How rows for one table are validated, completed and stored"""
+
+    def __init__(self, table: str, model: Type[BaseModel], defaults: Dict[str, Any], fallback: List[Dict[str, Any]]):
+        self.table = table
+        self.model = model
+        self.defaults = defaults
+        self.fallback = fallback
+
+    def new_record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a row and build the record the matching create endpoint would store"""
+        return {**self.model(**row).dict(), "id": get_next_id(), **self.defaults}
+
+IMPORT_TARGETS = {
+    "payments": ImportTarget("payments", PaymentCreate, {"status": "pending", "created_at": "2024-01-01T00:00:00"}, payments_db),
+    "documents": ImportTarget("documents", DocumentCreate, {"uploaded_at": "2024-01-01T00:00:00"}, documents_db),
+    "agreements": ImportTarget("agreements", AgreementCreate, {"status": "pending", "created_at": "2024-01-01T00:00:00"}, agreements_db),
+}
+
+async def request_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body as it arrives and yield it line by line"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+def parse_csv_row(header: List[str], values: List[str]) -> Any:
+    row = {name: value if value != "" else None for name, value in zip(header, values)}
+    for field in CSV_JSON_FIELDS:
+        if row.get(field):
+            try:
+                row[field] = json.loads(row[field])
+            except json.JSONDecodeError as e:
+                return ValueError(f"{field} is not valid JSON: {e}")
+    return row
+
+async def import_rows(request: Request, file_format: str) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, parsed row or the parse error) for each non-blank record"""
+    header = None
+    number = 0
+    # A quoted CSV field may contain newlines, so physical lines are collected
+    # until their quotes balance and then parsed as one record
+    pending: List[str] = []
+    quotes = 0
+    async for line in request_lines(request):
+        line = line.rstrip("\r")
+        if file_format == "csv":
+            if not pending and not line.strip():
+                continue
+            pending.append(line + "\n")
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            values = next(csv.reader(pending))
+            pending, quotes = [], 0
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            number += 1
+            yield number, parse_csv_row(header, values)
+        elif line.strip():
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, ValueError(f"Invalid JSON: {e}")
+    if pending:
+        yield number + 1, ValueError("Unterminated quoted field at end of file")
+
+async def store_import_chunk(target: ImportTarget, records: List[Tuple[int, Dict[str, Any]]],
+                             errors: List[Dict[str, Any]]) -> Tuple[int, str]:
+    """COPY one chunk of validated records, falling back to the in-memory list without a database.
+
+    If the database rejects the chunk (a foreign key or check constraint on
+    some row), the chunk is retried row by row so only the bad rows fail.
+    If the connection is lost during that retry, only the rows not yet
+    inserted or rejected fall back to memory. Returns the number stored and
+    where they went ("database", "in-memory" or "mixed").
+    """
+    stored = done = 0
     if app.state.db:
+        columns = INSERTS[target.table].columns
         try:
             async with app.state.db.acquire() as connection:
-                result = await connection.fetch("SELECT id, from_user_id, to_user_id, message, property_id, created_at FROM chat_messages")
-                return [{"id": row["id"], "from_user_id": row["from_user_id"], "to_user_id": row["to_user_id"], "message": row["message"], "property_id": row["property_id"], "created_at": str(row["created_at"])} for row in result]
-        except Exception as e:
+                try:
+                    await connection.copy_records_to_table(
+                        target.table, columns=list(columns),
+                        records=[tuple(record[column] for column in columns) for _, record in records]
+                    )
+                    return len(records), "database"
+                except asyncpg.PostgresError:
+                    for number, record in records:
+                        try:
+                            await INSERTS[target.table].execute(connection, record)
+                            stored += 1
+                        except asyncpg.PostgresError as e:
+                            errors.append({"row": number, "error": str(e)})
+                        done += 1
+                    return stored, "database"
+        except (OSError, asyncpg.InterfaceError) as e:
             print(f"Database error, using in-memory: {e}")
-            return chat_db
-    else:
-        return chat_db
+    target.fallback.extend(record for _, record in records[done:])
+    return stored + len(records) - done, "mixed" if stored else "in-memory"
+
+async def bulk_import(target: ImportTarget, request: Request, file_format: Optional[str]) -> Dict[str, Any]:
+    """Validate and store a CSV/NDJSON upload in chunks; bad rows are reported, not fatal"""
+    content_type = request.headers.get("content-type", "")
+    file_format = (file_format or ("csv" if "csv" in content_type else "ndjson")).lower()
+    if file_format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+    started = time.perf_counter()
+    received = imported = 0
+    errors: List[Dict[str, Any]] = []
+    storages = set()
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    async for number, row in import_rows(request, file_format):
+        received += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            if not isinstance(row, dict):
+                raise ValueError("Each row must be an object")
+            chunk.append((number, target.new_record(row)))
+        except ValueError as e:
+            errors.append({"row": number, "error": str(e)})
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            stored, storage = await store_import_chunk(target, chunk, errors)
+            imported += stored
+            storages.add(storage)
+            chunk = []
+    if chunk:
+        stored, storage = await store_import_chunk(target, chunk, errors)
+        imported += stored
+        storages.add(storage)
+
+    failed = received - imported
+    seconds = time.perf_counter() - started
+    return {
+        "table": target.table,
+        "format": file_format,
+        # "mixed" when the database went away partway and later chunks were kept in memory
+        "storage": storages.pop() if len(storages) == 1 else "mixed" if storages
+                   else "database" if app.state.db else "in-memory",
+        "received": received,
+        "imported": imported,
+        "failed": failed,
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "errors_truncated": len(errors) > MAX_REPORTED_ERRORS,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(received / seconds) if seconds > 0 else 0
+    }
+
+@app.post("/payments/import")
+async def import_payments(request: Request, file_format: Optional[str] = Query(None, alias="format")):
+    """Bulk-load payments from a CSV or NDJSON body (format from ?format= or the Content-Type)"""
+    return await bulk_import(IMPORT_TARGETS["payments"], request, file_format)
+
+@app.post("/documents/import")
+async def import_documents(request: Request, file_format: Optional[str] = Query(None, alias="format")):
+    """Bulk-load documents from a CSV or NDJSON body (format from ?format= or the Content-Type)"""
+    return await bulk_import(IMPORT_TARGETS["documents"], request, file_format)
+
+@app.post("/agreements/import")
+async def import_agreements(request: Request, file_format: Optional[str] = Query(None, alias="format")):
+    """Bulk-load agreements from a CSV or NDJSON body (format from ?format= or the Content-Type)"""
+    return await bulk_import(IMPORT_TARGETS["agreements"], request, file_format)
 
 @app.post("/dual-approval")
 async def dual_approval(action_id: str, user_id: str):
@@ -5,11 +5,12 @@ Simplified version for Vercel deployment without heavy dependencies
 
 import os
 import json
-import re
 from typing import Dict, Any, Optional
 from google.cloud import vision
 from google.cloud.vision_v1 import types
 
+from shared.ocr_fields import extract_fields
+
 class OCRService:
     def __init__(self):
         """Initialize Google Cloud Vision client with flexible authentication"""
@@ -132,137 +133,10 @@ class OCRService:
     
     def _extract_structured_data(self, text: str, document_type: str) -> Dict[str, Any]:
         """Extract structured data from OCR text based on document type"""
-        
-        if document_type == 'rental_agreement':
-            return self._extract_rental_agreement_data(text)
-        elif document_type == 'id_card':
-            return self._extract_id_card_data(text)
-        elif document_type == 'property_document':
-            return self._extract_property_document_data(text)
-        else:
+        extracted = extract_fields(text, document_type)
+        if extracted is None:
             return {'raw_text': text}
-    
-    def _extract_rental_agreement_data(self, text: str) -> Dict[str, Any]:
-        """Extract rental agreement specific information"""
-        data = {}
-        
-        # Enhanced patterns for rental agreement data
-        patterns = {
-            'tenant_name': [
-                r'tenant[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)',
-                r'lessee[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)',
-                r'renter[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)'
-            ],
-            'landlord_name': [
-                r'landlord[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)',
-                r'lessor[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)',
-                r'owner[:\s]+([a-zA-Z\s]+?)(?:\n|,|;)'
-            ],
-            'property_address': [
-                r'property[:\s]+([^,\n]+(?:,\s*[^,\n]+)*)',
-                r'premises[:\s]+([^,\n]+(?:,\s*[^,\n]+)*)',
-                r'address[:\s]+([^,\n]+(?:,\s*[^,\n]+)*)'
-            ],
-            'monthly_rent': [
-                r'rent[:\s]*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                r'monthly\s+rent[:\s]*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)\s*per\s*month'
-            ],
-            'security_deposit': [
-                r'security\s+deposit[:\s]*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                r'deposit[:\s]*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                r'bond[:\s]*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)'
-            ],
-            'lease_start_date': [
-                r'start\s+date[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'commence[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'beginning[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-            ],
-            'lease_end_date': [
-                r'end\s+date[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'expir[ye][:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'terminat[ie][:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-            ]
-        }
-        
-        # Apply patterns to extract data
-        for field, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    data[field] = match.group(1).strip()
-                    break
-        
-        return data
-    
-    def _extract_id_card_data(self, text: str) -> Dict[str, Any]:
-        """Extract ID card information"""
-        data = {}
-        
-        patterns = {
-            'name': [
-                r'name[:\s]+([a-zA-Z\s]+?)(?:\n|,)',
-                r'([A-Z][a-z]+\s+[A-Z][a-z]+)'  # Full name pattern
-            ],
-            'id_number': [
-                r'id[:\s]*(\w+)',
-                r'number[:\s]*(\w+)',
-                r'(\d{8,})'  # Long number sequence
-            ],
-            'date_of_birth': [
-                r'dob[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'birth[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                r'born[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-            ],
-            'address': [
-                r'address[:\s]+([^,\n]+(?:,\s*[^,\n]+)*)',
-                r'residence[:\s]+([^,\n]+(?:,\s*[^,\n]+)*)'
-            ]
-        }
-        
-        for field, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    data[field] = match.group(1).strip()
-                    break
-        
-        return data
-    
-    def _extract_property_document_data(self, text: str) -> Dict[str, Any]:
-        """Extract property document information"""
-        data = {}
-        
-        patterns = {
-            'property_type': [
-                r'type[:\s]+([a-zA-Z\s]+?)(?:\n|,)',
-                r'(apartment|house|condo|townhouse|villa)',
-            ],
-            'area': [
-                r'area[:\s]*(\d+(?:\.\d+)?)\s*(?:sq\.?\s*ft\.?|square\s*feet)',
-                r'(\d+(?:\.\d+)?)\s*(?:sq\.?\s*ft\.?|square\s*feet)',
-                r'size[:\s]*(\d+(?:\.\d+)?)\s*(?:sq\.?\s*ft\.?|square\s*feet)'
-            ],
-            'bedrooms': [
-                r'bedroom[s]?[:\s]*(\d+)',
-                r'(\d+)\s*bedroom[s]?',
-                r'bed[:\s]*(\d+)'
-            ],
-            'bathrooms': [
-                r'bathroom[s]?[:\s]*(\d+(?:\.\d+)?)',
-                r'(\d+(?:\.\d+)?)\s*bathroom[s]?',
-                r'bath[:\s]*(\d+(?:\.\d+)?)'
-            ]
-        }
-        
-        for field, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    data[field] = match.group(1).strip()
-                    break
-        
-        return data
+        return extracted
     
     def _calculate_confidence_scores(self, texts, extracted_data: Dict[str, Any]) -> Dict[str, float]:
         """Calculate confidence scores for extracted data"""
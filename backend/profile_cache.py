@@ -0,0 +1,87 @@
+"""
+Materialized User Profile Cache for Rentum AI
+Keeps each user's aggregated review profile ready to serve, updated as reviews arrive
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from backend.ai_review_service import AIReviewAnalyzer
+
+
+class UserProfileCache:
+    """In-memory user_profiles table: one running aggregate, rendered profile and ETag per user.
+
+    Submitting a review updates the user's entry write-through. A user with no
+    entry yet (first view, or first review) is built once from ``load_reviews``;
+    after that reads never touch the review history. Reads come from the
+    threadpool and writes from the event loop, so both hold a lock and readers
+    get a snapshot of the entry rather than the entry itself.
+    """
+
+    def __init__(self, analyzer: AIReviewAnalyzer, load_reviews: Callable[[str], List[Dict[str, Any]]]):
+        self.analyzer = analyzer
+        self.load_reviews = load_reviews
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.write_throughs = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """A snapshot of the user's entry: {'profile', 'etag', 'last_updated'}"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                entry = self._build(user_id)
+            return {key: entry[key] for key in ('profile', 'etag', 'last_updated')}
+
+    def record_review(self, user_id: str, review: Dict[str, Any]) -> None:
+        """Fold a newly stored review into the user's profile"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                # The review is already in the store, so the full build includes it
+                self._build(user_id)
+            else:
+                entry['aggregate'].add(review)
+                self._render(entry)
+            self.write_throughs += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def _build(self, user_id: str) -> Dict[str, Any]:
+        aggregate = self.analyzer.new_profile_aggregate()
+        for review in self.load_reviews(user_id):
+            aggregate.add(review)
+        entry = self._entries[user_id] = {'aggregate': aggregate}
+        self._render(entry)
+        return entry
+
+    @staticmethod
+    def _render(entry: Dict[str, Any]) -> None:
+        profile = entry['aggregate'].to_profile()
+        digest = hashlib.sha256(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()
+        entry['profile'] = profile
+        entry['etag'] = f'"{digest[:32]}"'
+        entry['last_updated'] = datetime.now().isoformat()
+
+    def stats(self) -> Dict[str, Any]:
+        reads = self.hits + self.misses
+        return {
+            'profiles': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'write_throughs': self.write_throughs,
+            'hit_rate': round(self.hits / reads, 3) if reads else 0.0
+        }
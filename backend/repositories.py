@@ -0,0 +1,350 @@
+"""
+Record Repositories for Rentum AI
+One interface over the backend's record stores: in-memory lists for tests and demos, SQLite (WAL) for persistence
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from shared.scan_store import InvalidCursor
+
+
+class Repository(ABC):
+    """A table of JSON records with sequential string ids ("1", "2", ...).
+
+    ``indexed`` names the fields records can be filtered on (foreign keys
+    such as user_id, and a few enums such as role). Filtering on any other
+    field raises ValueError, so every lookup the backend makes is indexed.
+    """
+
+    def __init__(self, name: str, indexed: Tuple[str, ...] = ()):
+        self.name = name
+        self.indexed = tuple(indexed)
+        # Bumped on every write, so payloads built from the records know when to rebuild
+        self.version = 0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a record and return it with its id (assigned when the record has none)"""
+
+    @abstractmethod
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Store records without ids in one batch and return how many were stored"""
+
+    @abstractmethod
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def page(self, limit: int, after: Optional[str] = None,
+             **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Up to ``limit`` matching records after the ``after`` id, oldest first,
+        and the cursor for the following page (None on the last page)"""
+
+    @abstractmethod
+    def count(self, **filters: Any) -> int:
+        ...
+
+    @abstractmethod
+    def count_by(self, field: str) -> Dict[str, int]:
+        """Record count per value of the indexed ``field``, keyed by str(value) ("None" when unset)"""
+
+    def find(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Every record matching the filters, oldest first"""
+        records, _ = self.page(len(self), **filters)
+        return records
+
+    def all(self) -> List[Dict[str, Any]]:
+        return self.find()
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``listener`` with every record stored from now on (e.g. to keep counters current)"""
+        self._listeners.append(listener)
+
+    def _stored(self, records: Iterable[Dict[str, Any]]) -> None:
+        self.version += 1
+        for listener in self._listeners:
+            for record in records:
+                listener(record)
+
+    def seed(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Load demo records into an empty repository"""
+        if not len(self):
+            for record in records:
+                self.add(record)
+
+    def _check_filters(self, filters: Dict[str, Any]) -> None:
+        unknown = set(filters) - set(self.indexed)
+        if unknown:
+            raise ValueError(f"{self.name} has no index on {', '.join(sorted(unknown))}")
+
+
+def _position_of(record_id: Optional[str]) -> Optional[int]:
+    try:
+        position = int(record_id) - 1
+    except (TypeError, ValueError):
+        return None
+    return position if position >= 0 else None
+
+
+def _after_position(after: Optional[str]) -> int:
+    """List position of the first record after the cursor"""
+    if after is None:
+        return 0
+    position = _position_of(after)
+    if position is None:
+        raise InvalidCursor(f"Invalid cursor {after!r}")
+    return position + 1
+
+
+class ListRepository(Repository):
+    """Records in a Python list plus a value -> positions index per indexed field.
+
+    Nothing survives a restart; this is the default backend and the one the
+    tests run against. A record's position is its id minus one.
+    """
+
+    backend = "in-memory"
+
+    def __init__(self, name: str, indexed: Tuple[str, ...] = ()):
+        super().__init__(name, indexed)
+        self._records: List[Dict[str, Any]] = []
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {field: defaultdict(list) for field in self.indexed}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        position = len(self._records)
+        if 'id' not in record:
+            record = {'id': str(position + 1), **record}
+        elif record['id'] != str(position + 1):
+            raise ValueError(f"{self.name} id {record['id']!r} is not the next id {position + 1}")
+        self._records.append(record)
+        for field, index in self._indexes.items():
+            index[record.get(field)].append(position)
+        self._stored((record,))
+        return record
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        added = 0
+        for record in records:
+            self.add(record)
+            added += 1
+        return added
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        position = _position_of(record_id)
+        return self._records[position] if position is not None and position < len(self._records) else None
+
+    def _positions(self, filters: Dict[str, Any]) -> Optional[List[int]]:
+        """Positions matching the filters in order, or None for every record"""
+        self._check_filters(filters)
+        if not filters:
+            return None
+        candidates = [self._indexes[field].get(value, []) for field, value in filters.items()]
+        shortest = min(candidates, key=len)
+        if len(candidates) == 1:
+            return shortest
+        others = [set(positions) for positions in candidates if positions is not shortest]
+        return [position for position in shortest if all(position in other for other in others)]
+
+    def page(self, limit: int, after: Optional[str] = None,
+             **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        start = _after_position(after)
+        positions = self._positions(filters)
+        if positions is None:
+            records = self._records[start:start + limit]
+            has_more = start + limit < len(self._records)
+        else:
+            first = bisect_right(positions, start - 1)
+            records = [self._records[p] for p in positions[first:first + limit]]
+            has_more = first + limit < len(positions)
+        return records, records[-1]['id'] if records and has_more else None
+
+    def count(self, **filters: Any) -> int:
+        positions = self._positions(filters)
+        return len(self._records) if positions is None else len(positions)
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        self._check_filters({field: None})
+        return {str(value): len(positions) for value, positions in self._indexes[field].items() if positions}
+
+
+class SQLiteDatabase:
+    """A SQLite file in WAL mode shared by several repositories.
+
+    WAL lets readers run alongside the writer, so each thread reads through
+    its own connection while writes go through one connection under a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.write_lock = threading.Lock()
+        self.writer = self._connect()
+        self.writer.execute('PRAGMA journal_mode=WAL')
+        # WAL keeps committed transactions safe with NORMAL; only the last ones can be lost on power failure
+        self.writer.execute('PRAGMA synchronous=NORMAL')
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; multi-row writes open their own transaction
+        return sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+
+    def reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            connection.execute('PRAGMA query_only=ON')
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    def repository(self, name: str, indexed: Tuple[str, ...] = ()) -> 'SQLiteRepository':
+        return SQLiteRepository(self, name, indexed)
+
+    def close(self) -> None:
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+        self.writer.close()
+
+
+class SQLiteRepository(Repository):
+    """One table: an INTEGER PRIMARY KEY id, a column per indexed field, and the record as JSON.
+
+    Each indexed field gets an index on (field, id), so a filtered page is an
+    index range scan that already comes back in id order.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, database: SQLiteDatabase, name: str, indexed: Tuple[str, ...] = ()):
+        super().__init__(name, indexed)
+        self.database = database
+        columns = ''.join(f', "{field}" TEXT' for field in self.indexed)
+        with database.write_lock:
+            database.writer.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" (id INTEGER PRIMARY KEY{columns}, data TEXT NOT NULL)'
+            )
+            for field in self.indexed:
+                database.writer.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{name}_{field}" ON "{name}" ("{field}", id)'
+                )
+        placeholders = ', '.join('?' for _ in range(len(self.indexed) + 2))
+        field_columns = ''.join(f', "{field}"' for field in self.indexed)
+        self._insert_sql = f'INSERT INTO "{name}" (id{field_columns}, data) VALUES ({placeholders})'
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _row(self, record_id: Optional[int], record: Dict[str, Any]) -> Tuple[Any, ...]:
+        data = {key: value for key, value in record.items() if key != 'id'}
+        return (record_id, *(_column_value(record.get(field)) for field in self.indexed), json.dumps(data))
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        record_id = None
+        if 'id' in record:
+            record_id = _position_of(record['id'])
+            if record_id is None:
+                raise ValueError(f"{self.name} id {record['id']!r} is not a sequential id")
+            record_id += 1
+        with self.database.write_lock:
+            cursor = self.database.writer.execute(self._insert_sql, self._row(record_id, record))
+        stored = {'id': str(cursor.lastrowid), **{key: value for key, value in record.items() if key != 'id'}}
+        self._stored((stored,))
+        return stored
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        records = list(records)
+        writer = self.database.writer
+        with self.database.write_lock:
+            writer.execute('BEGIN')
+            try:
+                cursor = writer.executemany(self._insert_sql, (self._row(None, record) for record in records))
+                writer.execute('COMMIT')
+            except BaseException:
+                writer.execute('ROLLBACK')
+                raise
+        self._stored(records)
+        return cursor.rowcount
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        position = _position_of(record_id)
+        if position is None:
+            return None
+        row = self.database.reader().execute(
+            f'SELECT id, data FROM "{self.name}" WHERE id = ?', (position + 1,)
+        ).fetchone()
+        return _record(row) if row else None
+
+    def find(self, **filters: Any) -> List[Dict[str, Any]]:
+        clauses, params = self._where(filters)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        rows = self.database.reader().execute(f'SELECT id, data FROM "{self.name}"{where} ORDER BY id', params)
+        return [_record(row) for row in rows]
+
+    def _where(self, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        self._check_filters(filters)
+        return [f'"{field}" IS ?' for field in filters], [_column_value(value) for value in filters.values()]
+
+    def page(self, limit: int, after: Optional[str] = None,
+             **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        clauses, params = self._where(filters)
+        clauses.append('id > ?')
+        params.append(_after_position(after))
+        rows = self.database.reader().execute(
+            f'SELECT id, data FROM "{self.name}" WHERE {" AND ".join(clauses)} ORDER BY id LIMIT ?',
+            (*params, limit + 1)
+        ).fetchall()
+        records = [_record(row) for row in rows[:limit]]
+        return records, records[-1]['id'] if len(rows) > limit else None
+
+    def count(self, **filters: Any) -> int:
+        clauses, params = self._where(filters)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        return self.database.reader().execute(f'SELECT COUNT(*) FROM "{self.name}"{where}', params).fetchone()[0]
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        self._check_filters({field: None})
+        rows = self.database.reader().execute(f'SELECT "{field}", COUNT(*) FROM "{self.name}" GROUP BY "{field}"')
+        return {str(value): count for value, count in rows}
+
+
+def _column_value(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _record(row: Tuple[int, str]) -> Dict[str, Any]:
+    return {'id': str(row[0]), **json.loads(row[1])}
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def repository_from_env(name: str, indexed: Tuple[str, ...] = ()) -> Repository:
+    """BACKEND_STORE=memory (default) keeps records in lists; BACKEND_STORE=sqlite
+    persists them to BACKEND_SQLITE_PATH (default rentum.db)"""
+    if os.getenv('BACKEND_STORE', 'memory').lower() != 'sqlite':
+        return ListRepository(name, indexed)
+    path = os.getenv('BACKEND_SQLITE_PATH', 'rentum.db')
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = _databases[path] = SQLiteDatabase(path)
+    return database.repository(name, indexed)
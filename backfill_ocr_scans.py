@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Backfill OCR extraction over stored scans with the current parsers
+
+Usage:
+    python backfill_ocr_scans.py scans.ndjson scans.reparsed.ndjson [--processes N] [--chunk-size N]
+
+The input is one scan record per line, as stored by /ocr/scan (it needs
+raw_text and document_type). Every record is written to the output with
+extracted_data and the confidence scores recomputed from raw_text; no
+Vision calls are made. Rerunning the same command after an interruption
+carries on after the last chunk that reached the output file.
+"""
+
+import argparse
+import json
+import os
+
+from api.index import reparse_scan_text
+from shared.ocr_backfill import DEFAULT_CHUNK_SIZE, backfill_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('source', help='NDJSON file of stored scan records')
+    parser.add_argument('target', help='NDJSON output; appended to when resuming')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    def progress(report):
+        print(f"📊 {report.resumed_from + report.processed} scans done "
+              f"({report.updated} reparsed, {report.failed} failed), {report.docs_per_sec} docs/sec")
+
+    report = backfill_file(args.source, args.target, reparse_scan_text,
+                           args.processes, args.chunk_size, progress)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
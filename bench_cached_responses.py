@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Requests/sec for the polled demo and metadata routes: rebuilt per request vs precomputed bytes
+
+Usage:
+    python bench_cached_responses.py [requests]
+
+Drives each app in-process through ASGI (no server or network), so the
+numbers are the framework and handler cost per request. "rebuilt" mounts
+the route's payload function the way the handlers used to answer: a fresh
+dict on every call, run through FastAPI's JSON encoding. "cached" is the
+route as it ships; "304" sends the ETag back in If-None-Match.
+"""
+
+import asyncio
+import sys
+import time
+
+async def call(app, path, headers):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "http_version": "1.1", "method": "GET", "path": path, "raw_path": path.encode(),
+             "root_path": "", "scheme": "http", "query_string": b"", "headers": headers,
+             "client": ("bench", 0), "server": ("bench", 80), "app": app}
+    await app(scope, receive, send)
+
+async def rate(app, path, requests, headers=()):
+    headers = [(name.encode(), value.encode()) for name, value in headers]
+    for _ in range(50):
+        await call(app, path, headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path, headers)
+    return requests / (time.perf_counter() - started)
+
+async def bench(name, module, payloads, requests):
+    print(f"📊 {name}")
+    for path, (payload, cached) in payloads.items():
+        module.app.add_api_route(f"/bench/rebuilt{path}", payload, methods=["GET"])
+        _, etag = cached.body()
+        before = await rate(module.app, f"/bench/rebuilt{path}", requests)
+        after = await rate(module.app, path, requests)
+        not_modified = await rate(module.app, path, requests, [("if-none-match", etag)])
+        print(f"   {path:<12} rebuilt {before:8,.0f} req/s   cached {after:8,.0f} req/s ({after / before:4.1f}x)"
+              f"   304 {not_modified:8,.0f} req/s")
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    import api.index as api
+    import backend.index as backend
+
+    asyncio.run(bench("api/index.py", api, {
+        "/": (api.root_payload, api.root_response),
+        "/demo": (api.demo_payload, api.demo_response),
+        "/users": (lambda: {"users": api.DEMO_USERS}, api.users_response),
+        "/properties": (lambda: {"properties": api.DEMO_PROPERTIES}, api.properties_response),
+    }, requests))
+    asyncio.run(bench("backend/index.py", backend, {
+        "/": (backend.root_payload, backend.root_response),
+        "/demo": (backend.demo_payload, backend.demo_response),
+        "/users": (backend.users_db.all, backend.users_response),
+        "/properties": (backend.properties_db.all, backend.properties_response),
+    }, requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cold-start report for the Vercel API: what a fresh process pays before its first response
+
+Usage:
+    python bench_cold_start.py [runs]
+
+Each measurement runs in a new interpreter, like a serverless cold start.
+The Vision client is built with anonymous credentials so no key or network
+is needed; that is the cost api/index.py used to pay at import time and now
+defers to the first OCR request.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    'import api.index': """
+import time; t = time.perf_counter()
+import api.index
+print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))
+""",
+    'import + first /health': """
+import time; t = time.perf_counter()
+from fastapi.testclient import TestClient
+import api.index
+TestClient(api.index.app).get('/health')
+print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))
+""",
+    'import + first /users': """
+import time; t = time.perf_counter()
+from fastapi.testclient import TestClient
+import api.index
+TestClient(api.index.app).get('/users')
+print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))
+""",
+    'Vision client build (deferred)': """
+import time; t = time.perf_counter()
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import vision
+vision.ImageAnnotatorClient(credentials=AnonymousCredentials())
+print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))
+""",
+    'import + first /ocr/scan (fake backend)': """
+import os; os.environ['OCR_BACKEND'] = 'fake'
+import time; t = time.perf_counter()
+from fastapi.testclient import TestClient
+import api.index
+TestClient(api.index.app).post('/ocr/scan', files={'file': ('a.jpg', b'\\xff\\xd8\\xff', 'image/jpeg')},
+                               data={'user_id': '1', 'document_type': 'rental_agreement'})
+print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))
+""",
+}
+
+def measure(snippet):
+    output = subprocess.run(
+        [sys.executable, '-c', 'import json\n' + snippet],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])['ms']
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"📊 Cold-start timings, median of {runs} fresh interpreters")
+    for label, snippet in SNIPPETS.items():
+        timings = [measure(snippet) for _ in range(runs)]
+        print(f"   {label:<42} {statistics.median(timings):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Response compression: CPU cost vs bytes saved for the API's largest JSON payloads
+
+Usage:
+    python bench_compression.py [scans] [--mbps 8]
+
+Fills the API with scans from the fake Vision backend, captures the bodies
+of a single /ocr/scan result, an /ocr/scans page and /demo, and compresses
+each with gzip and (when installed) brotli at several levels. For every
+setting it prints the compressed size, CPU time per response, and the
+transfer time saved on a link of --mbps megabits per second (8 is a
+typical Indian 4G download speed). The fake backend returns the same text
+for every scan, so the list ratios are better than real traffic will see.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+import zlib
+
+from shared.compression import StreamCompressor, brotli
+
+os.environ['OCR_BACKEND'] = 'fake'
+os.environ.setdefault('OCR_FAKE_LATENCY_MS', '0')
+os.environ.setdefault('OCR_FAKE_JITTER_MS', '0')
+os.environ.setdefault('OCR_FAKE_ERROR_RATE', '0')
+
+SETTINGS = [("gzip", level) for level in (1, 6, 9)] + ([("br", quality) for quality in (1, 4, 11)] if brotli else [])
+
+def capture_payloads(scans):
+    from fastapi.testclient import TestClient
+    from api.index import app
+
+    client = TestClient(app)
+    identity = {"Accept-Encoding": "identity"}
+    scan = None
+    with contextlib.redirect_stdout(io.StringIO()):  # the scan handler logs per request
+        scan = capture_scans(client, scans, identity)
+    return {
+        "POST /ocr/scan": scan,
+        "GET /ocr/scans?limit=50": client.get("/ocr/scans", params={"limit": 50}, headers=identity).content,
+        "GET /demo": client.get("/demo", headers=identity).content,
+    }
+
+def capture_scans(client, scans, identity):
+    scan = None
+    for i in range(scans):
+        files = {"file": (f"{i}.jpg", b"\xff\xd8\xff" + str(i).encode(), "image/jpeg")}
+        scan = client.post("/ocr/scan", files=files, data={"user_id": "1", "document_type": "rental_agreement"},
+                           headers=identity).content
+    return scan
+
+def cpu_ms_per_response(body, encoding, level):
+    rounds = max(5, int(2_000_000 / max(len(body), 1)))
+    started = time.process_time()
+    for _ in range(rounds):
+        compressed = StreamCompressor(encoding, level, level).compress(body, final=True)
+    return (time.process_time() - started) * 1000 / rounds, compressed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scans", nargs="?", type=int, default=60)
+    parser.add_argument("--mbps", type=float, default=8.0)
+    args = parser.parse_args()
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+
+    print(f"📊 Compression cost vs savings ({args.mbps:g} Mbit/s link, brotli {'on' if brotli else 'not installed'})")
+    for label, body in capture_payloads(args.scans).items():
+        print(f"   {label}: {len(body):,} bytes uncompressed ({len(body) / bytes_per_ms:.1f} ms to send)")
+        for encoding, level in SETTINGS:
+            cpu_ms, compressed = cpu_ms_per_response(body, encoding, level)
+            saved_ms = (len(body) - len(compressed)) / bytes_per_ms
+            assert encoding != "gzip" or zlib.decompress(compressed, 31) == body
+            print(f"      {encoding:<4} {level:>2}  {len(compressed):>8,} bytes  ratio {len(compressed) / len(body):5.3f}"
+                  f"   cpu {cpu_ms:7.3f} ms   transfer saved {saved_ms:7.1f} ms"
+                  f"   {saved_ms / cpu_ms if cpu_ms else float('inf'):8.0f}x")
+
+if __name__ == "__main__":
+    main()
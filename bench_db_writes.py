@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Create-endpoint write latency for the asyncpg backend: SELECT NOW() + INSERT vs INSERT ... RETURNING
+
+Usage:
+    python bench_db_writes.py [creates] [--rtt-ms MS] [--database-url URL]
+
+With --database-url the benchmark runs against that Postgres in a temporary
+users table. Without it, a small wire-compatible stand-in speaks enough of
+the Postgres protocol for these two statements and adds --rtt-ms (default 1)
+to every round trip, like a database on another host; it stores nothing.
+Each path runs with asyncpg's statement cache on and off (the latter is what
+a transaction-mode pgbouncer forces).
+"""
+
+import argparse
+import asyncio
+import re
+import statistics
+import struct
+import time
+from datetime import datetime, timezone
+
+import asyncpg
+
+from backend.main_backup import INSERTS
+
+USER = {"name": "Bench User", "phone": None, "profile_photo": None, "role": "tenant"}
+OLD_INSERT = ("INSERT INTO users (id, name, email, phone, profile_photo, role, created_at) "
+              "VALUES ($1, $2, $3, $4, $5, $6, $7)")
+TEMP_USERS = ("CREATE TEMP TABLE users (id TEXT PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, "
+              "phone TEXT, profile_photo TEXT, role TEXT NOT NULL, created_at TIMESTAMPTZ DEFAULT NOW())")
+
+TEXT_OID, TIMESTAMPTZ_OID = 25, 1184
+TIMESTAMP_COLUMNS = {"now", "created_at", "uploaded_at"}
+POSTGRES_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class StandInPostgres:
+    """Answers asyncpg's extended-protocol messages for single INSERT/SELECT statements.
+
+    Parameter and result types come from the column names in the SQL:
+    timestamps for created_at/uploaded_at/now, text for everything else.
+    Every Sync waits ``rtt`` seconds before the replies are flushed.
+    """
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+
+    async def handle(self, reader, writer):
+        length, code = struct.unpack("!ii", await reader.readexactly(8))
+        if code == 80877103:  # SSLRequest
+            writer.write(b"N")
+            length, code = struct.unpack("!ii", await reader.readexactly(8))
+        await reader.readexactly(length - 8)
+        startup = message(b"R", struct.pack("!i", 0))
+        for name, value in (("server_version", "15.0"), ("server_encoding", "UTF8"), ("client_encoding", "UTF8"),
+                            ("DateStyle", "ISO, MDY"), ("integer_datetimes", "on"), ("TimeZone", "UTC"),
+                            ("standard_conforming_strings", "on")):
+            startup += message(b"S", name.encode() + b"\0" + value.encode() + b"\0")
+        writer.write(startup + message(b"K", struct.pack("!ii", 1, 1)) + message(b"Z", b"I"))
+
+        statements, portals, pending = {}, {}, b""
+        while True:
+            kind = await reader.readexactly(1)
+            body = await reader.readexactly(struct.unpack("!i", await reader.readexactly(4))[0] - 4)
+            if kind == b"X":
+                break
+            if kind == b"P":
+                name, query = body.split(b"\0")[:2]
+                statements[name] = query.decode()
+                pending += message(b"1", b"")
+            elif kind == b"D":
+                query = statements[body[1:].split(b"\0")[0]]
+                params = parameter_types(query)
+                pending += message(b"t", struct.pack(f"!h{len(params)}i", len(params), *params))
+                columns = result_columns(query)
+                pending += row_description(columns) if columns else message(b"n", b"")
+            elif kind == b"B":
+                portal, name = body.split(b"\0")[:2]
+                portals[portal] = statements[name]
+                pending += message(b"2", b"")
+            elif kind == b"E":
+                query = portals[body.split(b"\0")[0]]
+                columns = result_columns(query)
+                if columns:
+                    pending += data_row(columns)
+                tag = "INSERT 0 1" if query.lstrip().upper().startswith("INSERT") else "SELECT 1"
+                pending += message(b"C", tag.encode() + b"\0")
+            elif kind == b"C":
+                pending += message(b"3", b"")
+            elif kind == b"Q":
+                pending += message(b"I", b"") + message(b"Z", b"I")
+                await self.reply(writer, pending)
+                pending = b""
+            elif kind == b"H":
+                await self.reply(writer, pending)
+                pending = b""
+            elif kind == b"S":
+                await self.reply(writer, pending + message(b"Z", b"I"))
+                pending = b""
+        writer.close()
+
+    async def reply(self, writer, data: bytes):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+        writer.write(data)
+        await writer.drain()
+
+
+def message(kind: bytes, body: bytes) -> bytes:
+    return kind + struct.pack("!i", len(body) + 4) + body
+
+
+def parameter_types(query: str):
+    count = max((int(n) for n in re.findall(r"\$(\d+)", query)), default=0)
+    insert = re.search(r"\(([^)]*)\)\s*VALUES", query, re.I)
+    columns = [c.strip() for c in insert.group(1).split(",")] if insert else []
+    return [TIMESTAMPTZ_OID if i < len(columns) and columns[i] in TIMESTAMP_COLUMNS else TEXT_OID
+            for i in range(count)]
+
+
+def result_columns(query: str):
+    returning = re.search(r"RETURNING\s+(.*)$", query, re.I | re.S)
+    if returning:
+        return [c.strip() for c in returning.group(1).split(",")]
+    select = re.match(r"\s*SELECT\s+(\w+)\(\)", query, re.I)
+    return [select.group(1).lower()] if select else []
+
+
+def row_description(columns) -> bytes:
+    body = struct.pack("!h", len(columns))
+    for column in columns:
+        oid, size = (TIMESTAMPTZ_OID, 8) if column in TIMESTAMP_COLUMNS else (TEXT_OID, -1)
+        body += column.encode() + b"\0" + struct.pack("!ihihih", 0, 0, oid, size, -1, 1)
+    return message(b"T", body)
+
+
+def data_row(columns) -> bytes:
+    body = struct.pack("!h", len(columns))
+    for column in columns:
+        if column in TIMESTAMP_COLUMNS:
+            value = struct.pack("!q", (datetime.now(timezone.utc) - POSTGRES_EPOCH) // (datetime.resolution))
+        else:
+            value = b"pending"
+        body += struct.pack("!i", len(value)) + value
+    return message(b"D", body)
+
+
+async def old_create(connection, record):
+    """What the handlers did before: fetch NOW() and then INSERT.
+
+    (They passed str(NOW()) for created_at, which asyncpg rejects for a
+    timestamptz column; the benchmark passes the datetime.)
+    """
+    created_at = await connection.fetchval("SELECT NOW()")
+    await connection.execute(OLD_INSERT, record["id"], record["name"], record["email"], record["phone"],
+                             record["profile_photo"], record["role"], created_at)
+
+
+async def new_create(connection, record):
+    record.update(await INSERTS["users"].execute(connection, record))
+
+
+async def measure(connect, create, creates, label):
+    connection = await connect()
+    latencies = []
+    try:
+        for i in range(creates):
+            record = {**USER, "id": f"{label}-{i}", "email": f"{label}-{i}@bench.example"}
+            started = time.perf_counter()
+            await create(connection, record)
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        await connection.close()
+    latencies.sort()
+    return statistics.mean(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("creates", nargs="?", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    server = stand_in = None
+    if args.database_url:
+        dsn, target = args.database_url, "Postgres"
+    else:
+        stand_in = StandInPostgres(args.rtt_ms / 1000)
+        server = await asyncio.start_server(stand_in.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        dsn, target = f"postgresql://bench@127.0.0.1:{port}/bench", f"stand-in Postgres, {args.rtt_ms} ms RTT"
+
+    print(f"📊 {args.creates} user creates per run against {target}")
+    for cache_size in (100, 0):
+        async def connect():
+            connection = await asyncpg.connect(dsn, ssl=False, statement_cache_size=cache_size)
+            if args.database_url:
+                await connection.execute(TEMP_USERS)
+            return connection
+
+        for label, create in (("SELECT NOW() + INSERT", old_create), ("INSERT ... RETURNING", new_create)):
+            trips_before = stand_in.round_trips if stand_in else 0
+            mean, p50, p95 = await measure(connect, create, args.creates, f"{label[:6]}{cache_size}")
+            trips = f"   {(stand_in.round_trips - trips_before) / args.creates:4.1f} round trips" if stand_in else ""
+            print(f"   cache {cache_size:>3}  {label:<22} mean {mean:6.2f} ms   p50 {p50:6.2f} ms"
+                  f"   p95 {p95:6.2f} ms{trips}")
+
+    if server:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
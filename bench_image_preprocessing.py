@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark OCR image preprocessing: upload bytes, preprocessing time and extraction recall
+
+Usage:
+    python bench_image_preprocessing.py [image_dir] [document_type]
+
+Without image_dir a few synthetic phone photos are used. When Google Vision
+credentials are configured, every image is also sent to Vision twice
+(original and optimized) to compare Vision latency and the extracted fields.
+"""
+
+import io
+import os
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from shared.image_preprocessing import ImagePreprocessor
+
+def synthetic_photos():
+    for width, height in [(4032, 3024), (3000, 4000), (1600, 1200)]:
+        image = Image.effect_noise((width, height), 25).convert('RGB')
+        draw = ImageDraw.Draw(image)
+        for line in range(0, height, 100):
+            draw.text((150, line), "Tenant: Priya Sharma  Rent: 25,000  Deposit: 75,000  01/04/2024", fill=(0, 0, 0))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=92)
+        yield f"synthetic_{width}x{height}.jpg", buffer.getvalue()
+
+def corpus_photos(image_dir):
+    for name in sorted(os.listdir(image_dir)):
+        with open(os.path.join(image_dir, name), 'rb') as f:
+            yield name, f.read()
+
+def vision_service():
+    """The live OCR service, or None when credentials are not configured"""
+    from api.index import ocr_service
+    return ocr_service if ocr_service.client else None
+
+def main():
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    document_type = sys.argv[2] if len(sys.argv) > 2 else 'rental_agreement'
+    photos = corpus_photos(image_dir) if image_dir else synthetic_photos()
+    preprocessor = ImagePreprocessor()
+    service = vision_service() if image_dir else None
+
+    print(f"{'file':32} {'before':>10} {'after':>10} {'prep ms':>8} {'vision ms':>16} {'fields':>8}")
+    fields_before = fields_after = fields_kept = 0
+    for name, content in photos:
+        optimized, stats = preprocessor.optimize(content)
+        vision_column = fields_column = "-"
+
+        if service:
+            started = time.perf_counter()
+            original_data = service._process_with_google_vision(content, document_type)['extracted_data']
+            original_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            optimized_data = service._process_with_google_vision(optimized, document_type)['extracted_data']
+            optimized_ms = (time.perf_counter() - started) * 1000
+
+            kept = sum(1 for key, value in original_data.items() if optimized_data.get(key) == value)
+            fields_before += len(original_data)
+            fields_after += len(optimized_data)
+            fields_kept += kept
+            vision_column = f"{original_ms:.0f} -> {optimized_ms:.0f}"
+            fields_column = f"{kept}/{len(original_data)}"
+
+        print(f"{name[:32]:32} {stats['original_bytes']:>10} {stats['optimized_bytes']:>10} "
+              f"{stats['preprocessing_ms']:>8.1f} {vision_column:>16} {fields_column:>8}")
+
+    totals = preprocessor.stats()
+    print(f"\n📉 Bytes saved: {totals['bytes_saved_ratio'] * 100:.1f}% "
+          f"({totals['bytes_in']} -> {totals['bytes_out']}), avg {totals['avg_preprocessing_ms']} ms per image")
+    if service:
+        recall = fields_kept / fields_before if fields_before else 1.0
+        print(f"🎯 Field recall vs original: {recall * 100:.1f}% ({fields_before} fields before, {fields_after} after)")
+    else:
+        print("💡 Pass an image directory with Google Vision credentials configured to measure recall")
+
+if __name__ == "__main__":
+    main()
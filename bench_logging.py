@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Per-request logging cost on the /ocr/scan path: the old print() calls vs the structured logger
+
+Usage:
+    python bench_logging.py [requests] [sink_delay_ms]
+
+Replays the lines one successful scan used to print (six print() calls)
+and the logger calls that replaced them (five DEBUG lines, skipped at the
+default INFO level, and one INFO line through the queue). Each runs against
+a fast stdout and one that takes sink_delay_ms per write, like a backed-up
+log pipe, to show that requests no longer wait on it.
+"""
+
+import contextlib
+import logging
+import sys
+import time
+
+from shared.structured_logging import configure_logging, dropped_records
+
+class Sink:
+    """A stdout stand-in that takes delay seconds per write"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+def print_request(i):
+    print(f"🔍 OCR scan request: user=1, type=rental_agreement, file=lease-{i}.jpg")
+    print("📄 File size: 48213 bytes")
+    print("🤖 Processing with Google Vision OCR...")
+    print("🤖 Processing with Google Vision OCR...")
+    print("📄 Extracted text length: 1873 characters")
+    print(f"✅ Google Vision OCR completed successfully: scan-{i}")
+
+def log_request(i, logger=logging.getLogger("api.index")):
+    logger.debug("OCR scan request",
+                 extra={"user_id": "1", "document_type": "rental_agreement", "upload_name": f"lease-{i}.jpg"})
+    logger.debug("Upload read", extra={"bytes": 48213})
+    logger.debug("Processing with Google Vision OCR", extra={"bytes": 48213})
+    logger.debug("Extracted text", extra={"text_length": 1873})
+    logger.info("OCR scan completed", extra={"scan_id": f"scan-{i}", "cache_hit": False})
+
+def per_request_us(replay, requests, sink):
+    with contextlib.redirect_stdout(sink):
+        started = time.perf_counter()
+        for i in range(requests):
+            replay(i)
+        elapsed = time.perf_counter() - started
+    return elapsed * 1e6 / requests
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sink_delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    print(f"📊 Logging per /ocr/scan request x{requests:,}")
+    for label, delay in (("fast stdout", 0.0), (f"stdout at {sink_delay_ms}ms/write", sink_delay_ms / 1000)):
+        printed = per_request_us(print_request, requests, Sink(delay))
+
+        sink = Sink(delay)
+        listener = configure_logging(queue_size=requests * 2)
+        logged = per_request_us(log_request, requests, sink)
+        drain_started = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            listener.stop()
+        drain_ms = (time.perf_counter() - drain_started) * 1000
+        print(f"   {label:<22} print() {printed:8.1f} µs   logger {logged:6.1f} µs"
+              f"   ({printed / logged:5.1f}x; queue drained {drain_ms:.0f}ms later, {dropped_records()} dropped)")
+
+    sink = Sink()
+    listener = configure_logging(levels={"api.index": "DEBUG"}, queue_size=requests * 10)
+    logged = per_request_us(log_request, requests, sink)
+    with contextlib.redirect_stdout(sink):
+        listener.stop()
+    print(f"   {'LOG_LEVELS=api.index=DEBUG':<22}                   logger {logged:6.1f} µs   ({sink.writes // requests} writes per request)")
+    configure_logging()
+
+if __name__ == "__main__":
+    main()
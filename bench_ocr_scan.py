@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+End-to-end /ocr/scan throughput benchmark against the fake Vision backend
+
+Usage:
+    python bench_ocr_scan.py [requests] [concurrency] [latency_ms] [jitter_ms] [error_rate]
+
+No credentials or network are needed. Point OCR_FIXTURE_DIR at fixtures
+captured with OCR_BACKEND=record to replay real Vision responses.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+os.environ['OCR_BACKEND'] = 'fake'
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+async def run(app, total, concurrency):
+    form = {'user_id': '1', 'document_type': 'rental_agreement'}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def one(i):
+            # Unique bytes per request so every scan reaches the backend
+            files = {'file': (f'{i}.jpg', b'\xff\xd8\xff' + str(i).encode(), 'image/jpeg')}
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/ocr/scan", files=files, data=form)
+                latencies.append((time.perf_counter() - started) * 1000)
+            status = response.json().get('status')
+            statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return elapsed, latencies, statuses
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    os.environ['OCR_FAKE_LATENCY_MS'] = sys.argv[3] if len(sys.argv) > 3 else '150'
+    os.environ['OCR_FAKE_JITTER_MS'] = sys.argv[4] if len(sys.argv) > 4 else '50'
+    os.environ['OCR_FAKE_ERROR_RATE'] = sys.argv[5] if len(sys.argv) > 5 else '0.02'
+    os.environ.setdefault('OCR_FAKE_SEED', '42')
+
+    from api.index import app, ocr_service
+
+    elapsed, latencies, statuses = asyncio.run(run(app, total, concurrency))
+    print(f"📊 /ocr/scan x{total}, concurrency {concurrency}, OCR pool {ocr_service.max_concurrency}")
+    print(f"   fake backend: {ocr_service.client.stats()}")
+    print(f"   throughput: {total / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"   latency ms: p50 {percentile(latencies, 0.5):.1f}  p95 {percentile(latencies, 0.95):.1f}  max {max(latencies):.1f}")
+    print(f"   outcomes: {statuses}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+List vs SQLite repository speed at scale
+
+Usage:
+    python bench_repositories.py [rows] [threads]
+
+Loads the same synthetic OCR scan records into a ListRepository and a
+SQLiteRepository (WAL file in a temp directory), then times bulk load,
+lookups by id, filtered pages on an indexed foreign key and filtered
+counts, with the old linear-scan filter for reference, then the SQLite
+reads spread over a few threads. Defaults to 1M rows.
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from backend.repositories import ListRepository, SQLiteDatabase
+
+INDEXED = ("user_id", "document_type")
+DOCUMENT_TYPES = ["rental_agreement", "id_card", "property_document", "receipt"]
+LOOKUPS = 20_000
+
+def make_records(count, rng):
+    users = max(1, count // 100)
+    for _ in range(count):
+        yield {
+            "user_id": str(rng.randrange(users)),
+            "document_type": rng.choice(DOCUMENT_TYPES),
+            "extracted_data": {"monthly_rent": str(rng.randint(500, 5000)), "tenant_name": "John Doe"},
+            "status": "completed",
+            "created_at": "2024-01-01T00:00:00"
+        }
+
+def timed(function):
+    gc.collect()
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+def run_reads(repository, ids, users):
+    for record_id in ids:
+        repository.get(record_id)
+    for user_id in users:
+        repository.page(50, None, user_id=user_id)
+
+def report(label, count, seconds):
+    print(f"   {label:<34} {seconds * 1000:9.1f} ms   {count / seconds:12,.0f} ops/s")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    rng = random.Random(7)
+    ids = [str(rng.randint(1, rows)) for _ in range(LOOKUPS)]
+    users = [str(rng.randrange(max(1, rows // 100))) for _ in range(LOOKUPS // 10)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(os.path.join(directory, "bench.db"))
+        backends = {
+            "list": ListRepository("ocr_scans", INDEXED),
+            "sqlite": database.repository("ocr_scans", INDEXED),
+        }
+        print(f"📊 {rows:,} OCR scan rows, {LOOKUPS:,} id lookups, {len(users):,} user pages")
+        for name, repository in backends.items():
+            print(f"🗄️  {name}")
+            _, seconds = timed(lambda: repository.add_many(make_records(rows, random.Random(1))))
+            report("bulk load", rows, seconds)
+            _, seconds = timed(lambda: [repository.get(record_id) for record_id in ids])
+            report("get by id", len(ids), seconds)
+            _, seconds = timed(lambda: [repository.page(50, None, user_id=user_id) for user_id in users])
+            report("page of 50 by user_id", len(users), seconds)
+            _, seconds = timed(lambda: [repository.count(user_id=user_id) for user_id in users])
+            report("count by user_id", len(users), seconds)
+            _, seconds = timed(lambda: repository.count(document_type="receipt"))
+            report("count by document_type (~25%)", 1, seconds)
+            if name == "list":
+                # What the endpoints did before the repositories: a comprehension over the list
+                records = repository.all()
+                _, seconds = timed(lambda: [[r for r in records if r["user_id"] == u] for u in users[:20]])
+                report("linear scan by user_id (before)", 20, seconds)
+
+        sqlite = backends["sqlite"]
+        workers = [threading.Thread(target=run_reads, args=(sqlite, ids, users)) for _ in range(threads)]
+        _, seconds = timed(lambda: ([worker.start() for worker in workers], [worker.join() for worker in workers]))
+        report(f"sqlite get + page on {threads} threads", threads * (len(ids) + len(users)), seconds)
+        print(f"   sqlite file size: {os.path.getsize(database.path) / 1024 ** 2:,.0f} MB")
+        database.close()
+
+if __name__ == "__main__":
+    main()
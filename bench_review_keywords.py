@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Throughput of AIReviewAnalyzer comment analysis on long review comments
+
+Usage:
+    python bench_review_keywords.py [words_per_comment] [comments]
+
+Compares the keyword matcher with the previous substring scan, which ran one
+`in` test per keyword plus two regex searches over every comment. Scenarios:
+plain comments, comments where a multi-word phrase ("every time") occurs so
+the automaton walk runs, and a 10x larger keyword vocabulary.
+"""
+
+import random
+import re
+import sys
+import time
+
+from backend.ai_review_service import AIReviewAnalyzer
+from shared.keyword_matcher import KeywordMatcher
+
+VOCABULARY = (
+    "the tenant was always timely with rent and kept the flat clean quiet respectful "
+    "but the heater was damaged once and they were late every time in winter nothing "
+    "to translate parent current payment communication was polite and professional "
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor"
+).split()
+PHRASE_WORDS = ['every']
+
+def substring_scan(analyzer, comments):
+    """The pre-matcher implementation, kept here as the baseline"""
+    green_flags, red_flags = [], []
+    for flags, keyword_dict in ((green_flags, analyzer.green_flag_keywords), (red_flags, analyzer.red_flag_keywords)):
+        for category, keywords in keyword_dict.items():
+            for keyword in keywords:
+                if keyword in comments:
+                    flag_text = f"{category.title()}: {keyword}"
+                    if flag_text not in flags:
+                        flags.append(flag_text)
+    if re.search(r'never|not|didn\'t|wouldn\'t|couldn\'t', comments):
+        if any(word in comments for word in ['pay', 'payment', 'rent']):
+            red_flags.append("Payment: Negative payment history mentioned")
+    if re.search(r'always|every time|consistently', comments):
+        if any(word in comments for word in ['pay', 'payment', 'rent', 'time']):
+            green_flags.append("Payment: Consistent positive behavior")
+    return green_flags[:5], red_flags[:5]
+
+def throughput(function, comments):
+    started = time.perf_counter()
+    for comment in comments:
+        function(comment)
+    elapsed = time.perf_counter() - started
+    return len(comments) / elapsed, sum(len(c) for c in comments) / elapsed / 1e6
+
+def make_comments(count, words, vocabulary):
+    return [" ".join(random.choice(vocabulary) for _ in range(words)).lower() for _ in range(count)]
+
+def large_vocabulary_analyzer():
+    analyzer = AIReviewAnalyzer()
+    for category, keywords in analyzer.red_flag_keywords.items():
+        keywords.extend(f"{category}{i}" for i in range(100))
+    analyzer.keyword_matcher = KeywordMatcher(analyzer._keyword_patterns())
+    return analyzer
+
+def main():
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    random.seed(7)
+    plain_vocabulary = [word for word in VOCABULARY if word not in PHRASE_WORDS]
+    scenarios = [
+        ("plain comments", AIReviewAnalyzer(), make_comments(count, words, plain_vocabulary)),
+        ("phrase in every comment", AIReviewAnalyzer(), make_comments(count, words, VOCABULARY)),
+        ("10x keyword vocabulary", large_vocabulary_analyzer(), make_comments(count, words, plain_vocabulary)),
+    ]
+
+    print(f"📊 {count} comments of {words} words each")
+    for scenario, analyzer, comments in scenarios:
+        print(f"   {scenario} (~{sum(len(c) for c in comments) // count // 1024} KB each)")
+        for label, function in (("substring scan (old)", lambda c: substring_scan(analyzer, c)),
+                                ("keyword matcher", analyzer._analyze_comments)):
+            per_second, mb_per_second = throughput(function, comments)
+            print(f"      {label:<22} {per_second:9.0f} comments/s  {mb_per_second:6.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
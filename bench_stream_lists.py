@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time to first byte for the asyncpg backend's list endpoints
+
+Usage:
+    python bench_stream_lists.py [rows]
+
+Fills the in-memory payments list (no DATABASE_URL) and fetches /payments
+twice through the ASGI app: once the way the handler used to answer, by
+returning the whole list through response_model, and once streamed by
+stream_list. With a database the streamed path reads the same way from a
+server-side cursor, so the shape of the numbers carries over.
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+from typing import List
+
+from backend import main_backup
+from backend.main_backup import PaymentOut, app, payments_db
+
+@app.get("/bench/payments-buffered", response_model=List[PaymentOut])
+async def buffered_payments():
+    return payments_db
+
+async def fetch(path):
+    """Drive one GET through the app and report (time to first byte, total time, bytes)"""
+    sent, started, first = 0, time.perf_counter(), None
+    requested, done = False, asyncio.Event()
+
+    async def receive():
+        # Starlette waits on receive() for a disconnect while streaming
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal sent, first
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first is None:
+                first = time.perf_counter() - started
+            sent += len(message["body"])
+
+    scope = {"type": "http", "http_version": "1.1", "method": "GET", "path": path, "raw_path": path.encode(),
+             "root_path": "", "scheme": "http", "query_string": b"", "headers": [], "client": ("bench", 0),
+             "server": ("bench", 80), "app": app}
+    await app(scope, receive, send)
+    done.set()
+    return first, time.perf_counter() - started, sent
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    main_backup.app.state.db = None
+    payments_db[:] = [{"id": str(i), "user_id": str(i % 50), "property_id": str(i % 7), "amount": 1000.0 + i % 500,
+                       "payment_type": "rent", "proof_url": None, "status": "pending",
+                       "created_at": "2024-01-01T00:00:00"} for i in range(rows)]
+
+    print(f"📊 GET /payments with {rows:,} rows (batches of {main_backup.STREAM_BATCH_ROWS})")
+    for label, path in (("buffered", "/bench/payments-buffered"), ("streamed", "/payments")):
+        tracemalloc.start()
+        first, total, sent = asyncio.run(fetch(path))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"   {label:<9} first byte {first * 1000:8.1f} ms   total {total:6.2f} s   "
+              f"{sent / 1024 ** 2:6.1f} MB sent   peak {peak / 1024 ** 2:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
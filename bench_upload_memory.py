@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Measure peak Python memory per /ocr/scan request under concurrent large uploads
+
+Usage:
+    python bench_upload_memory.py [concurrency] [upload_mb]
+
+Runs entirely in-process against a fake Vision client, so no credentials or
+network are needed. Oversized uploads are measured separately to show they
+are rejected without being buffered.
+"""
+
+import asyncio
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+import httpx
+
+from shared.ocr_cache import OCRResultCache
+
+class FakeVisionClient:
+    def text_detection(self, image):
+        return SimpleNamespace(
+            text_annotations=[SimpleNamespace(description="Tenant: John Doe\nRent: $1,500")],
+            error=SimpleNamespace(message="")
+        )
+
+async def upload_all(app, payloads):
+    form = {'user_id': '1', 'document_type': 'rental_agreement'}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        responses = await asyncio.gather(*(
+            client.post("/ocr/scan", files={'file': (f'{i}.jpg', payload, 'image/jpeg')}, data=form)
+            for i, payload in enumerate(payloads)
+        ))
+    return [response.status_code for response in responses]
+
+def measure(app, payloads):
+    tracemalloc.start()
+    statuses = asyncio.run(upload_all(app, payloads))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statuses, peak
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    upload_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4.5
+
+    from api.index import app, ocr_service, MAX_FILE_SIZE
+    ocr_service.client, ocr_service.status = FakeVisionClient(), "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+    ocr_service.preprocessor.enabled = False
+
+    size = int(upload_mb * 1024 * 1024)
+    # Distinct payloads so every request reaches Vision instead of the cache
+    payloads = [b'\xff\xd8\xff' + bytes([i % 256]) * (size - 3) for i in range(concurrency)]
+    statuses, peak = measure(app, payloads)
+    print(f"📦 {concurrency} concurrent {upload_mb}MB uploads -> {statuses.count(200)}/{len(statuses)} OK")
+    print(f"📈 Peak traced memory: {peak / 2**20:.1f}MB total, {peak / concurrency / 2**20:.1f}MB per request "
+          f"({peak / concurrency / size:.2f}x upload size, includes the in-process test client)")
+
+    oversized = [b'\xff\xd8\xff' + b'x' * (MAX_FILE_SIZE * 4) for _ in range(concurrency)]
+    statuses, peak = measure(app, oversized)
+    print(f"🚫 {concurrency} concurrent {MAX_FILE_SIZE * 4 / 2**20:.0f}MB uploads -> statuses {sorted(set(statuses))}")
+    print(f"📈 Peak traced memory: {peak / 2**20:.1f}MB total")
+
+if __name__ == "__main__":
+    main()
@@ -211,7 +211,7 @@ function App() {
     if (currentUser) {
       fetch(`${API_BASE}/ocr/scans?user_id=${currentUser.id}`)
         .then(res => res.json())
-        .then(setOcrScans)
+        .then(data => setOcrScans(Array.isArray(data) ? data : data.scans || []))
         .catch(err => console.log('OCR scans fetch error:', err));
     }
   }, [currentUser]);
@@ -0,0 +1,4 @@
+"""
+Shared modules for Rentum AI
+Code used by both the Vercel API (api/index.py) and the backend service (backend/)
+"""
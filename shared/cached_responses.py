@@ -0,0 +1,67 @@
+"""
+Cached JSON Responses for Rentum AI
+Payloads serialized once to bytes with an ETag, rebuilt only when the data behind them changes
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+_UNBUILT = object()
+
+
+class CachedJSON:
+    """One route's JSON body, kept as bytes together with its ETag.
+
+    ``version`` returns something that changes whenever the data behind the
+    payload does (a store's length or change counter, a tuple of stats). The
+    body is rebuilt and re-serialized only when it differs from the version
+    the cached body was built at; without it the body is built once. Any
+    timestamp in the payload is therefore when the body was last built.
+    """
+
+    def __init__(self, build: Callable[[], Any], version: Optional[Callable[[], Any]] = None):
+        self.build = build
+        self.version = version
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+        # (version, body, etag) swapped as one tuple, so concurrent readers never mix two builds
+        self._cached: Tuple[Any, bytes, str] = (_UNBUILT, b'', '')
+
+    def body(self) -> Tuple[bytes, str]:
+        """The serialized payload and its ETag, rebuilding them if the data changed"""
+        version = self.version() if self.version else None
+        cached_version, body, etag = self._cached
+        if cached_version is not _UNBUILT and cached_version == version:
+            self.hits += 1
+            return body, etag
+        body = json.dumps(self.build(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._cached = (version, body, etag)
+        self.builds += 1
+        return body, etag
+
+    def response(self, request: Request) -> Response:
+        """200 with the cached body, or 304 when If-None-Match already names its ETag"""
+        body, etag = self.body()
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'builds': self.builds, 'hits': self.hits, 'not_modified': self.not_modified}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (one tag, a list, or *) against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
@@ -0,0 +1,233 @@
+"""
+Response Compression for Rentum AI
+Brotli or gzip for JSON and text responses above a size threshold, with per-route byte ratios
+"""
+
+import os
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from shared.route_labels import route_template
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it every client gets gzip
+    brotli = None
+
+DEFAULT_MINIMUM_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+# Quality 4 is the usual setting for dynamic responses: close to gzip 6 in
+# CPU time with noticeably smaller output; 11 is only worth it for static files
+DEFAULT_BROTLI_QUALITY = 4
+
+# Only text-like bodies are compressed; images, PDFs and archives already are
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return (media_type.startswith('text/') or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith('+json') or media_type.endswith('+xml'))
+
+
+@lru_cache(maxsize=256)
+def choose_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """'br', 'gzip' or None for an Accept-Encoding header, honouring q-values (br wins ties)"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    wildcard = weights.get('*', 0.0)
+    candidates = (('br', 'gzip') if brotli_available else ('gzip',))
+    best, best_weight = None, 0.0
+    for coding in candidates:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressionStats:
+    """Per-route totals of bytes before and after compression, and the time spent compressing"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, bytes_in: int, bytes_out: int, compressed: bool, compress_ms: float):
+        with self._lock:
+            totals = self._routes.get(route)
+            if totals is None:
+                totals = self._routes[route] = {
+                    'responses': 0, 'compressed': 0, 'bytes_in': 0, 'bytes_out': 0, 'compress_ms': 0.0
+                }
+            totals['responses'] += 1
+            totals['compressed'] += compressed
+            totals['bytes_in'] += bytes_in
+            totals['bytes_out'] += bytes_out
+            totals['compress_ms'] += compress_ms
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {route: dict(totals) for route, totals in self._routes.items()}
+        for totals in routes.values():
+            totals['ratio'] = round(totals['bytes_out'] / totals['bytes_in'], 3) if totals['bytes_in'] else 1.0
+            totals['compress_ms'] = round(totals['compress_ms'], 2)
+        return {'brotli_available': brotli is not None, 'routes': routes}
+
+
+def weaken_etag(headers: MutableHeaders):
+    """Compressed bytes differ from the identity body a strong ETag names, so the tag becomes weak"""
+    etag = headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        headers['ETag'] = 'W/' + etag
+
+
+class StreamCompressor:
+    """Incremental gzip or brotli; every chunk is flushed so streamed responses stay streamed"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data) if data else b''
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses responses with the client's preferred encoding.
+
+    A whole-body response is compressed only when it is at least
+    ``minimum_size`` bytes; streamed responses are compressed chunk by chunk.
+    Responses that already have a Content-Encoding, are not text-like, or
+    are 204/304 pass through untouched. Every response is counted in
+    ``stats`` under its route template.
+    """
+
+    def __init__(self, app, stats: Optional[CompressionStats] = None, minimum_size: int = DEFAULT_MINIMUM_SIZE,
+                 gzip_level: int = DEFAULT_GZIP_LEVEL, brotli_quality: int = DEFAULT_BROTLI_QUALITY):
+        self.app = app
+        self.stats = stats or CompressionStats()
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = if_none_match = ''
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+            elif name == b'if-none-match':
+                if_none_match = value.decode('latin-1')
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+
+        start_message = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+        bytes_in = bytes_out = 0
+        compress_ms = 0.0
+
+        async def compressing_send(message):
+            nonlocal start_message, compressor, passthrough, bytes_in, bytes_out, compress_ms
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(raw=message['headers'])
+                if message['status'] == 304 and headers.get('etag') and 'W/' + headers['etag'] in if_none_match:
+                    # The client's copy came compressed, under the weak tag
+                    weaken_etag(headers)
+                passthrough = (encoding is None or message['status'] in (204, 304)
+                               or 'content-encoding' in headers
+                               or not is_compressible(headers.get('content-type', '')))
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth compressing
+                    start_message = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            bytes_in += len(body)
+
+            if not passthrough and compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                else:
+                    compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+
+            if passthrough:
+                bytes_out += len(body)
+                await send(message)
+                if not more_body:
+                    self._record(scope, bytes_in, bytes_out, False, 0.0)
+                return
+
+            started = time.perf_counter()
+            chunk = compressor.compress(body, final=not more_body)
+            compress_ms += (time.perf_counter() - started) * 1000
+            bytes_out += len(chunk)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message['headers'])
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                weaken_etag(headers)
+                if more_body:
+                    del headers['Content-Length']
+                else:
+                    headers['Content-Length'] = str(len(chunk))
+                await send(start_message)
+                start_message = None
+
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+            if not more_body:
+                self._record(scope, bytes_in, bytes_out, True, compress_ms)
+
+        await self.app(scope, receive, compressing_send)
+
+    def _record(self, scope, bytes_in: int, bytes_out: int, compressed: bool, compress_ms: float):
+        self.stats.record(route_template(scope), bytes_in, bytes_out, compressed, compress_ms)
+
+
+def compression_options_from_env() -> Dict[str, int]:
+    """Middleware options from COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL and COMPRESSION_BROTLI_QUALITY"""
+    return {
+        'minimum_size': int(os.getenv('COMPRESSION_MIN_SIZE', str(DEFAULT_MINIMUM_SIZE))),
+        'gzip_level': int(os.getenv('COMPRESSION_GZIP_LEVEL', str(DEFAULT_GZIP_LEVEL))),
+        'brotli_quality': int(os.getenv('COMPRESSION_BROTLI_QUALITY', str(DEFAULT_BROTLI_QUALITY))),
+    }
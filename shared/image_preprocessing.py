@@ -0,0 +1,149 @@
+"""
+Image Preprocessing for Rentum AI OCR
+Shrinks phone photos before they are uploaded to Google Vision
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from PIL import Image, ImageOps
+
+# Formats Pillow can re-encode safely; PDFs and anything else pass through untouched
+OPTIMIZABLE_FORMATS = {'JPEG', 'PNG', 'BMP', 'TIFF', 'WEBP', 'MPO'}
+
+# Images that would still decode to more pixels than this are sent to Vision as
+# uploaded. A small PNG can declare a huge canvas (a 440 KB 12000x12000 PNG
+# decodes to over 1 GB), and several OCR workers decode at once.
+DEFAULT_MAX_PIXELS = 40_000_000
+
+# ImageOps.exif_transpose's table, for images downscaled before they are rotated
+EXIF_ORIENTATION = 0x0112
+ORIENTATION_TRANSPOSES = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+# Modes Image.reduce() accepts; others ('1' scans, 'P' palettes, 'I;16') are converted first
+REDUCIBLE_MODES = {'L', 'LA', 'RGB', 'RGBA', 'CMYK', 'YCbCr', 'I', 'F', 'PA'}
+
+
+class ImagePreprocessor:
+    """Fix EXIF orientation, downscale, convert to grayscale and re-encode as JPEG.
+
+    Vision's text detection does not need more than ~2 MP for printed documents,
+    so a 12 MP colour photo can be sent at a fraction of its size. The original
+    bytes are kept whenever the optimized version would not be smaller.
+    """
+
+    def __init__(self, enabled: bool = True, max_dimension: int = 2048, jpeg_quality: int = 85,
+                 max_pixels: int = DEFAULT_MAX_PIXELS):
+        self.enabled = enabled
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+        self.max_pixels = max_pixels
+        self._lock = threading.Lock()
+        self.images_processed = 0
+        self.images_optimized = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_ms = 0.0
+
+    def optimize(self, file_content: bytes) -> Tuple[bytes, Dict[str, Any]]:
+        """Return the bytes to send to Vision and a record of what was done"""
+        started = time.perf_counter()
+        optimized = file_content
+        outcome = 'disabled'
+
+        if self.enabled:
+            try:
+                optimized, outcome = self._reencode(file_content)
+            except Exception as e:
+                outcome = f'skipped: {type(e).__name__}'
+
+            if len(optimized) >= len(file_content):
+                optimized = file_content
+                if outcome == 'optimized':
+                    outcome = 'kept_original'
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = {
+            'outcome': outcome,
+            'original_bytes': len(file_content),
+            'optimized_bytes': len(optimized),
+            'preprocessing_ms': round(elapsed_ms, 2)
+        }
+
+        with self._lock:
+            self.images_processed += 1
+            self.images_optimized += optimized is not file_content
+            self.bytes_in += len(file_content)
+            self.bytes_out += len(optimized)
+            self.total_ms += elapsed_ms
+
+        return optimized, stats
+
+    def _reencode(self, file_content: bytes) -> Tuple[bytes, str]:
+        with Image.open(io.BytesIO(file_content)) as image:
+            if image.format not in OPTIMIZABLE_FORMATS:
+                return file_content, f'skipped: {image.format} not supported'
+            if getattr(image, 'n_frames', 1) > 1 and image.format != 'MPO':
+                return file_content, 'skipped: multi-page image'
+
+            # Let the JPEG decoder scale down by a power of two while decoding
+            if image.format in ('JPEG', 'MPO'):
+                image.draft('L', (self.max_dimension, self.max_dimension))
+
+            # image.size is read from the header (or the draft scale); nothing is decoded yet
+            width, height = image.size
+            if width * height > self.max_pixels:
+                return file_content, f'skipped: {width}x{height} exceeds {self.max_pixels} pixels'
+
+            factor = max(image.size) // self.max_dimension
+            if image.format not in ('JPEG', 'MPO') and factor >= 2:
+                # Shrink by a whole factor first, so the rotation and mode
+                # conversion below copy a small image instead of the full canvas
+                orientation = image.getexif().get(EXIF_ORIENTATION)
+                if image.mode not in REDUCIBLE_MODES:
+                    image = image.convert('L')
+                processed = image.reduce(factor)
+                if orientation in ORIENTATION_TRANSPOSES:
+                    processed = processed.transpose(ORIENTATION_TRANSPOSES[orientation])
+                processed = processed.convert('L')
+            else:
+                processed = ImageOps.exif_transpose(image).convert('L')
+            if max(processed.size) > self.max_dimension:
+                processed.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            processed.save(buffer, format='JPEG', quality=self.jpeg_quality, optimize=True)
+            return buffer.getvalue(), 'optimized'
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'images_processed': self.images_processed,
+                'images_optimized': self.images_optimized,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved_ratio': round(1 - self.bytes_out / self.bytes_in, 3) if self.bytes_in else 0.0,
+                'avg_preprocessing_ms': round(self.total_ms / self.images_processed, 2) if self.images_processed else 0.0
+            }
+
+
+def preprocessor_from_env() -> ImagePreprocessor:
+    """Build the preprocessor from OCR_PREPROCESS, OCR_MAX_DIMENSION, OCR_JPEG_QUALITY and OCR_MAX_PIXELS"""
+    return ImagePreprocessor(
+        enabled=os.getenv('OCR_PREPROCESS', 'true').lower() not in ('0', 'false', 'no'),
+        max_dimension=int(os.getenv('OCR_MAX_DIMENSION', '2048')),
+        jpeg_quality=int(os.getenv('OCR_JPEG_QUALITY', '85')),
+        max_pixels=int(os.getenv('OCR_MAX_PIXELS', str(DEFAULT_MAX_PIXELS)))
+    )
@@ -0,0 +1,104 @@
+"""
+Word-Boundary Keyword Matcher for Rentum AI
+Finds every keyword and phrase from a fixed vocabulary in one pass over the text
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+# ASCII punctuation and whitespace become token separators; apostrophes stay so
+# "didn't" is one token, and curly apostrophes are folded into straight ones
+_SEPARATORS = {
+    code: ' ' for code in range(128)
+    if not (chr(code).isalnum() or chr(code) == "'")
+}
+_SEPARATORS[ord('’')] = "'"
+TOKEN_TABLE = str.maketrans(_SEPARATORS)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words split on whitespace and punctuation ("well-maintained" -> well, maintained)"""
+    return text.lower().translate(TOKEN_TABLE).split()
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Working on tokens instead of characters makes every match word-bounded
+    ("late" never fires inside "translate") and keeps the automaton small.
+    Single-word keywords, the common case, are resolved with one set
+    intersection against the text's tokens; the goto/fail walk only runs
+    when every token of some multi-word phrase occurs in the text.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        self._word_tags: Dict[str, Set[Hashable]] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[Set[Hashable]] = [set()]
+        self._phrase_tokens: List[FrozenSet[str]] = []
+
+        for phrase, tag in patterns:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            if len(tokens) == 1:
+                self._word_tags.setdefault(tokens[0], set()).add(tag)
+                continue
+            self._phrase_tokens.append(frozenset(tokens))
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._outputs.append(set())
+                state = next_state
+            self._outputs[state].add(tag)
+
+        self._words = frozenset(self._word_tags)
+        self._vocabulary = self._words.union(*self._phrase_tokens)
+        self._fail = self._build_failure_links()
+
+    def _build_failure_links(self) -> List[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] |= self._outputs[fail[next_state]]
+        return fail
+
+    def find(self, text: str) -> Set[Hashable]:
+        """Tags of every keyword or phrase that occurs in the text as whole words"""
+        tokens = tokenize(text)
+        present = self._vocabulary.intersection(tokens)
+        tags: Set[Hashable] = set()
+        for word in present & self._words:
+            tags |= self._word_tags[word]
+
+        if any(phrase <= present for phrase in self._phrase_tokens):
+            tags |= self._walk(tokens)
+        return tags
+
+    def _walk(self, tokens: List[str]) -> Set[Hashable]:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        tags: Set[Hashable] = set()
+        state = 0
+        root = goto[0]
+        for token in tokens:
+            if not state:
+                # Most tokens start nothing; skip the failure chain entirely
+                state = root.get(token, 0)
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if outputs[state]:
+                tags |= outputs[state]
+        return tags
@@ -0,0 +1,234 @@
+"""
+Prometheus Metrics for Rentum AI
+Counters, gauges and histograms rendered in the Prometheus text format, plus HTTP middleware
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+from starlette.responses import Response
+
+from shared.route_labels import route_template
+
+# Seconds; covers cached routes (well under 5ms) through Vision calls (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Bytes; JSON bodies at the small end, photo uploads at the top
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 10485760, 52428800)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    """A metric whose values live in per-thread shards.
+
+    Each thread only ever writes its own shard, so recording takes no lock;
+    the lock is only taken the first time a thread records anything. A
+    scrape adds the shards up, and may miss an update still in progress.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, Any]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Labels, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[Labels, Any] = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _label_text(self, labels: Labels, extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def _samples(self) -> List[str]:
+        return [f'{self.name}{self._label_text(labels)} {_number(value)}'
+                for labels, value in sorted(self.values().items())]
+
+
+class Gauge(Counter):
+    """A counter that can go down (e.g. requests in flight)"""
+
+    kind = 'gauge'
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # One count per bucket, one for +Inf, then the running sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def values(self) -> Dict[Labels, List[float]]:
+        totals: Dict[Labels, List[float]] = {}
+        for shard in list(self._shards):
+            for labels, entry in list(shard.items()):
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(entry)
+                else:
+                    for i, value in enumerate(entry):
+                        total[i] += value
+        return totals
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), entry):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                le_label = f'le="{le}"'
+                lines.append(f'{self.name}_bucket{self._label_text(labels, le_label)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(labels)} {_number(entry[-1])}')
+            lines.append(f'{self.name}_count{self._label_text(labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics one app exposes on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric):
+        # Starlette rebuilds the middleware stack each time a middleware is
+        # added, so a name registered again gets the metric it already has
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def response(self) -> Response:
+        return Response(content=self.render(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency, in-flight requests and body sizes.
+
+    Requests are labelled by route template ('/ocr/jobs/{job_id}'), so ids
+    in paths don't create a new series per request. Response sizes are the
+    bytes actually sent, after any compression inside this middleware.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.requests = registry.counter(
+            'http_requests_total', 'HTTP requests by method, route and status', ('method', 'route', 'status'))
+        self.latency = registry.histogram(
+            'http_request_duration_seconds', 'Time from request to the last response byte', ('method', 'route'))
+        self.in_flight = registry.gauge('http_requests_in_flight', 'HTTP requests being handled')
+        self.request_size = registry.histogram(
+            'http_request_size_bytes', 'Request body size (uploads)', ('route',), SIZE_BUCKETS)
+        self.response_size = registry.histogram(
+            'http_response_size_bytes', 'Response body size as sent', ('route',), SIZE_BUCKETS)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        received = sent = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+            return message
+
+        async def counting_send(message):
+            nonlocal sent, status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                sent += len(message.get('body', b''))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            self.in_flight.dec()
+            route = route_template(scope)
+            method = scope['method']
+            self.requests.inc((method, route, str(status)))
+            self.latency.observe(time.perf_counter() - started, (method, route))
+            self.request_size.observe(received, (route,))
+            self.response_size.observe(sent, (route,))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
@@ -0,0 +1,203 @@
+"""
+Pluggable OCR Backends for Rentum AI
+Local stand-ins for the Google Vision client so the OCR path can be tested and benchmarked offline
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Returned by the fake backend when no fixture has been recorded
+DEFAULT_FIXTURE_TEXT = (
+    "RESIDENTIAL LEASE AGREEMENT\n"
+    "Landlord: Bob Smith\n"
+    "Tenant: John Doe\n"
+    "Property Address: 123 Main St, Springfield\n"
+    "Monthly Rent: $1,500\n"
+    "Security Deposit: $3,000\n"
+    "Lease Term: 01/01/2024 to 12/31/2024\n"
+)
+
+
+class OCRBackend(ABC):
+    """The part of vision.ImageAnnotatorClient that OCRService calls.
+
+    The real Vision client satisfies this by duck typing. Responses only need
+    ``text_annotations`` (items with ``description``) and ``error.message``,
+    and batch responses a ``responses`` list.
+    """
+
+    @abstractmethod
+    def text_detection(self, image):
+        """Annotate one vision.Image"""
+
+    @abstractmethod
+    def batch_annotate_images(self, requests):
+        """Annotate a list of vision.AnnotateImageRequest"""
+
+
+def fixture_key(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_response(descriptions: List[str], error_message: str = ""):
+    return SimpleNamespace(
+        text_annotations=[SimpleNamespace(description=description) for description in descriptions],
+        error=SimpleNamespace(message=error_message)
+    )
+
+
+def response_to_fixture(response) -> Dict[str, Any]:
+    return {
+        'text_annotations': [{'description': text.description} for text in response.text_annotations],
+        'error': {'message': response.error.message}
+    }
+
+
+def fixture_to_response(fixture: Dict[str, Any]):
+    return make_response(
+        [text['description'] for text in fixture.get('text_annotations', [])],
+        fixture.get('error', {}).get('message', '')
+    )
+
+
+class FakeVisionBackend(OCRBackend):
+    """Replays recorded responses with simulated latency, jitter and errors.
+
+    An image whose sha256 matches a recorded fixture gets that response. Any
+    other image gets one of the fixtures picked by its hash, so the same bytes
+    always produce the same text. A batch call pays the latency once, like a
+    single round trip to Vision.
+    """
+
+    def __init__(self, fixture_dir: Optional[str] = None, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.images = 0
+        self.errors = 0
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+
+        if fixture_dir and os.path.isdir(fixture_dir):
+            for name in sorted(os.listdir(fixture_dir)):
+                if name.endswith('.json'):
+                    with open(os.path.join(fixture_dir, name), 'r') as f:
+                        self.fixtures[name[:-len('.json')]] = json.load(f)
+        self._fallbacks = list(self.fixtures.values()) or [
+            {'text_annotations': [{'description': DEFAULT_FIXTURE_TEXT}], 'error': {'message': ''}}
+        ]
+
+    def text_detection(self, image):
+        self._simulate_latency()
+        return self._respond(image.content)
+
+    def batch_annotate_images(self, requests):
+        self._simulate_latency()
+        return SimpleNamespace(responses=[self._respond(request.image.content) for request in requests])
+
+    def _simulate_latency(self):
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay_ms = max(0.0, self.latency_ms + jitter)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+    def _respond(self, content: bytes):
+        with self._lock:
+            self.images += 1
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            self.errors += failed
+        if failed:
+            return make_response([], "Simulated Vision error (fake backend)")
+
+        key = fixture_key(content)
+        fixture = self.fixtures.get(key) or self._fallbacks[int(key, 16) % len(self._fallbacks)]
+        return fixture_to_response(fixture)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'fake',
+            'fixtures': len(self.fixtures),
+            'latency_ms': self.latency_ms,
+            'jitter_ms': self.jitter_ms,
+            'error_rate': self.error_rate,
+            'calls': self.calls,
+            'images': self.images,
+            'errors': self.errors
+        }
+
+
+class RecordingBackend(OCRBackend):
+    """Passes calls through to a real client and saves each response as a fixture.
+
+    Fixtures are named by the sha256 of the image bytes sent to Vision, which
+    is what FakeVisionBackend looks them up by.
+    """
+
+    def __init__(self, client, fixture_dir: str):
+        self.client = client
+        self.fixture_dir = fixture_dir
+        self.recorded = 0
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def text_detection(self, image):
+        response = self.client.text_detection(image=image)
+        self._record(image.content, response)
+        return response
+
+    def batch_annotate_images(self, requests):
+        batch_response = self.client.batch_annotate_images(requests=requests)
+        for request, response in zip(requests, batch_response.responses):
+            self._record(request.image.content, response)
+        return batch_response
+
+    def _record(self, content: bytes, response):
+        path = os.path.join(self.fixture_dir, f"{fixture_key(content)}.json")
+        try:
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(response_to_fixture(response), f, indent=2)
+            os.replace(temp_path, path)
+            self.recorded += 1
+        except OSError as e:
+            logger.warning("OCR fixture write failed: %s", e, extra={"path": path})
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'record', 'fixture_dir': self.fixture_dir, 'recorded': self.recorded}
+
+
+def backend_mode_from_env() -> str:
+    """OCR_BACKEND: vision (default), fake or record"""
+    return os.getenv('OCR_BACKEND', 'vision').lower()
+
+
+def fake_backend_from_env() -> FakeVisionBackend:
+    """Build the fake backend from OCR_FIXTURE_DIR, OCR_FAKE_LATENCY_MS, OCR_FAKE_JITTER_MS,
+    OCR_FAKE_ERROR_RATE and OCR_FAKE_SEED"""
+    seed = os.getenv('OCR_FAKE_SEED')
+    return FakeVisionBackend(
+        fixture_dir=os.getenv('OCR_FIXTURE_DIR') or None,
+        latency_ms=float(os.getenv('OCR_FAKE_LATENCY_MS', '0')),
+        jitter_ms=float(os.getenv('OCR_FAKE_JITTER_MS', '0')),
+        error_rate=float(os.getenv('OCR_FAKE_ERROR_RATE', '0')),
+        seed=int(seed) if seed else None
+    )
+
+
+def recording_backend_from_env(client) -> RecordingBackend:
+    return RecordingBackend(client, os.getenv('OCR_FIXTURE_DIR') or 'ocr_fixtures')
@@ -0,0 +1,213 @@
+"""
+OCR Backfill Pipeline for Rentum AI
+Re-runs the current field parsers over stored scan text on a process pool, without calling Vision
+"""
+
+import hmac
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 200
+
+# reparse(raw_text, document_type) -> fields to overwrite on the stored scan.
+# It runs in worker processes, so it must be a module-level function.
+Reparse = Callable[[str, str], Dict[str, Any]]
+
+# (raw_text, document_type), or None for a scan with no stored text
+BackfillItem = Optional[Tuple[str, str]]
+Outcome = Tuple[str, Any]  # ('updated', fields), ('skipped', None) or ('failed', message)
+
+
+def _reparse_chunk(reparse: Reparse, items: List[BackfillItem]) -> List[Outcome]:
+    outcomes: List[Outcome] = []
+    for item in items:
+        if item is None:
+            outcomes.append(('skipped', None))
+            continue
+        try:
+            outcomes.append(('updated', reparse(*item)))
+        except Exception as e:
+            outcomes.append(('failed', f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def _backfill_item(record: Dict[str, Any]) -> BackfillItem:
+    raw_text = record.get('raw_text')
+    if not raw_text:
+        return None
+    return raw_text, record.get('document_type', '')
+
+
+def _chunked(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def reparse_chunks(records: Iterable[Dict[str, Any]], reparse: Reparse, processes: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[List[Dict[str, Any]], List[Outcome]]]:
+    """Yield each chunk of records with its reparse outcomes, in input order.
+
+    Only the text and document type are sent to the workers. At most two
+    chunks per worker are in flight, so a long history streams through in
+    bounded memory. processes <= 1 reparses in this process.
+
+    Workers are spawned, not forked: the API calls this from a threaded
+    server, and a fork taken while another thread holds a lock (the OCR
+    pool's, the log listener's) leaves that lock held in the child forever.
+    """
+    chunks = _chunked(records, chunk_size)
+    if processes <= 1:
+        for chunk in chunks:
+            yield chunk, _reparse_chunk(reparse, [_backfill_item(record) for record in chunk])
+        return
+
+    with multiprocessing.get_context('spawn').Pool(processes) as pool:
+        pending = deque()
+        for chunk in chunks:
+            items = [_backfill_item(record) for record in chunk]
+            pending.append((chunk, pool.apply_async(_reparse_chunk, (reparse, items))))
+            if len(pending) >= processes * 2:
+                chunk, result = pending.popleft()
+                yield chunk, result.get()
+        while pending:
+            chunk, result = pending.popleft()
+            yield chunk, result.get()
+
+
+class BackfillReport:
+    """Counts and throughput of one backfill run"""
+
+    def __init__(self, resumed_from: int = 0):
+        self.resumed_from = resumed_from
+        self.processed = 0
+        self.updated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def add(self, record: Dict[str, Any], outcome: Outcome) -> None:
+        status, payload = outcome
+        self.processed += 1
+        if status == 'updated':
+            self.updated += 1
+        elif status == 'skipped':
+            self.skipped += 1
+        else:
+            self.failed += 1
+            if len(self.errors) < 20:
+                self.errors.append({'id': record.get('id'), 'error': payload})
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    @property
+    def docs_per_sec(self) -> float:
+        seconds = self.seconds
+        return round(self.processed / seconds, 1) if seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'resumed_from': self.resumed_from,
+            'processed': self.processed,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'docs_per_sec': self.docs_per_sec
+        }
+
+
+def backfill_store(store, reparse: Reparse, processes: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   after: Optional[str] = None, max_docs: Optional[int] = None) -> Dict[str, Any]:
+    """Reparse the scans of a ScanStore, oldest first.
+
+    Each updated scan is swapped in as a new record with ScanStore.replace,
+    so requests reading the store meanwhile never see a half-updated one.
+    When max_docs stops the run early, the report's next_cursor is the id to
+    pass as ``after`` to carry on from there.
+    """
+    def records() -> Iterator[Dict[str, Any]]:
+        cursor, remaining = after, max_docs
+        while remaining is None or remaining > 0:
+            limit = chunk_size if remaining is None else min(chunk_size, remaining)
+            page, cursor = store.page(None, limit, cursor)
+            yield from page
+            if remaining is not None:
+                remaining -= len(page)
+            if cursor is None:
+                return
+
+    report = BackfillReport()
+    last_id = after
+    for chunk, outcomes in reparse_chunks(records(), reparse, processes, chunk_size):
+        for record, outcome in zip(chunk, outcomes):
+            if outcome[0] == 'updated':
+                store.replace({**record, **outcome[1]})
+            report.add(record, outcome)
+        last_id = chunk[-1]['id']
+
+    has_more = last_id is not None and bool(store.page(None, 1, last_id)[0])
+    return {**report.to_dict(), 'next_cursor': last_id if has_more else None}
+
+
+def _count_complete_lines(path: str) -> int:
+    """Lines already written to a previous run's output, dropping a half-written last line"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as f:
+        data = f.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            f.truncate(complete)
+    return data.count(b'\n', 0, complete)
+
+
+def backfill_file(source: str, target: str, reparse: Reparse, processes: int = 1,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  progress: Optional[Callable[[BackfillReport], None]] = None) -> Dict[str, Any]:
+    """Reparse an NDJSON export of scan records into ``target``, one record per line.
+
+    Each chunk is flushed and fsynced before the next is written, so an
+    interrupted run resumes by skipping the records already in ``target``.
+    """
+    done = _count_complete_lines(target)
+    report = BackfillReport(resumed_from=done)
+
+    with open(source, 'r', encoding='utf-8') as src, open(target, 'a', encoding='utf-8') as out:
+        lines = islice((line for line in src if line.strip()), done, None)
+        records = (json.loads(line) for line in lines)
+        for chunk, outcomes in reparse_chunks(records, reparse, processes, chunk_size):
+            for record, outcome in zip(chunk, outcomes):
+                if outcome[0] == 'updated':
+                    record.update(outcome[1])
+                report.add(record, outcome)
+            out.write(''.join(json.dumps(record) + '\n' for record in chunk))
+            out.flush()
+            os.fsync(out.fileno())
+            if progress:
+                progress(report)
+
+    return report.to_dict()
+
+
+def backfill_processes_from_env() -> int:
+    """OCR_BACKFILL_PROCESSES: worker processes for the /ocr/backfill endpoint (1 = in process)"""
+    return int(os.getenv('OCR_BACKFILL_PROCESSES', '1'))
+
+
+def backfill_token_valid(token: Optional[str]) -> bool:
+    """Whether /ocr/backfill may run: OCR_BACKFILL_TOKEN is set and X-Admin-Token matches it"""
+    expected = os.getenv('OCR_BACKFILL_TOKEN')
+    return bool(expected) and token is not None and hmac.compare_digest(token.encode(), expected.encode())
@@ -0,0 +1,122 @@
+"""
+Content-Addressed OCR Result Cache for Rentum AI
+Duplicate uploads of the same document return the stored OCR result without a Vision call
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """Two-tier cache: a bounded in-memory LRU in front of an optional directory of JSON files"""
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_content: bytes, document_type: str) -> str:
+        """Key on the upload bytes plus the document type they were parsed as"""
+        return OCRResultCache.key_from_digest(hashlib.sha256(file_content), document_type)
+
+    @staticmethod
+    def key_from_digest(content_digest, document_type: str) -> str:
+        """Same key as make_key, from a sha256 already fed the upload bytes while streaming"""
+        digest = content_digest.copy()
+        digest.update(b'\0' + document_type.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(result)
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._store(key, result)
+        self._write_disk(key, result)
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(result, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("OCR cache disk write failed: %s", e, extra={"path": path})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk_tier': bool(self.cache_dir),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
+
+
+def cache_from_env() -> OCRResultCache:
+    """Build the cache from OCR_CACHE_SIZE and OCR_CACHE_DIR (e.g. /tmp/ocr-cache on Vercel)"""
+    return OCRResultCache(
+        max_entries=int(os.getenv('OCR_CACHE_SIZE', '256')),
+        cache_dir=os.getenv('OCR_CACHE_DIR') or None
+    )
@@ -0,0 +1,164 @@
+"""
+OCR Field Extraction Engine for Rentum AI
+Declarative field specs compiled once at import and shared by every OCR service
+"""
+
+import re
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _strip(value: str) -> str:
+    return value.strip()
+
+
+def _title(value: str) -> str:
+    return value.strip().title()
+
+
+def _amount(value: str) -> str:
+    return value.replace(',', '')
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """One regex rule for one output field.
+
+    Specs for the same field are listed in priority order: the first spec
+    that matches anywhere in the text wins, using its leftmost match.
+    """
+    field: str
+    pattern: str
+    case_sensitive: bool = False  # False: matched against the lowercased text
+    clean: Optional[Callable[[str], str]] = None
+    value: Optional[str] = None  # constant value instead of the captured group
+    extras: Optional[Dict[str, str]] = None  # constant fields set alongside a hit
+
+
+class FieldExtractor:
+    """Compiled field specs for one document type.
+
+    ``sequences`` maps a spec field to the output fields its matches fill in
+    order, e.g. the first two dates found become the lease start and end.
+    """
+
+    def __init__(self, specs: Tuple[FieldSpec, ...], sequences: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.specs = specs
+        self.sequences = sequences or {}
+        self._compiled = [re.compile(spec.pattern) for spec in specs]
+        self._by_field: Dict[str, List[int]] = {}
+        for index, spec in enumerate(specs):
+            self._by_field.setdefault(spec.field, []).append(index)
+
+    def _value(self, index: int, match) -> str:
+        spec = self.specs[index]
+        if spec.value is not None:
+            return spec.value
+        value = match.group(1)
+        return spec.clean(value) if spec.clean else value
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Resolve each field to its highest-priority match.
+
+        Each field searches its specs in priority order and stops at the first
+        hit, and a sequence stops once all of its output fields are filled, so
+        low-priority specs usually never run. That early exit is why fields
+        are not resolved from one merged pass over every spec's matches.
+        """
+        text_lower = text.lower()
+        data: Dict[str, Any] = {}
+
+        for field, indexes in self._by_field.items():
+            targets = self.sequences.get(field)
+            if targets:
+                values: List[str] = []
+                for index in indexes:
+                    haystack = text if self.specs[index].case_sensitive else text_lower
+                    matches = islice(self._compiled[index].finditer(haystack), len(targets) - len(values))
+                    values.extend(self._value(index, match) for match in matches)
+                    if len(values) == len(targets):
+                        break
+                data.update(zip(targets, values))
+                continue
+
+            for index in indexes:
+                spec = self.specs[index]
+                match = self._compiled[index].search(text if spec.case_sensitive else text_lower)
+                if match:
+                    data[field] = self._value(index, match)
+                    if spec.extras:
+                        data.update(spec.extras)
+                    break
+
+        return data
+
+
+# ===== FIELD SPECS =====
+
+_NAME = r'[:\s]+([A-Za-z\s]{2,30})'
+_AMOUNT = r'[:\s]+\$?(\d+[\d,]*\.?\d*)'
+_ADDRESS = r'[:\s]+([0-9][^.\n\r]{10,100})'
+
+RENTAL_AGREEMENT_FIELDS = (
+    FieldSpec('tenant_name', r'renter' + _NAME, clean=_title),
+    FieldSpec('tenant_name', r'lessee' + _NAME, clean=_title),
+    FieldSpec('tenant_name', r'tenant' + _NAME, clean=_title),
+    FieldSpec('landlord_name', r'owner' + _NAME, clean=_title),
+    FieldSpec('landlord_name', r'lessor' + _NAME, clean=_title),
+    FieldSpec('landlord_name', r'landlord' + _NAME, clean=_title),
+    FieldSpec('monthly_rent', r'rent' + _AMOUNT, clean=_amount),
+    FieldSpec('monthly_rent', r'monthly[:\s]+rent' + _AMOUNT, clean=_amount),
+    FieldSpec('monthly_rent', r'\$(\d+[\d,]*\.?\d*)[:\s]*(?:per|/)\s*month', clean=_amount),
+    FieldSpec('monthly_rent', r'amount' + _AMOUNT, clean=_amount),
+    FieldSpec('security_deposit', r'security\s+deposit' + _AMOUNT, clean=_amount),
+    FieldSpec('security_deposit', r'deposit' + _AMOUNT, clean=_amount),
+    FieldSpec('security_deposit', r'advance' + _AMOUNT, clean=_amount),
+    FieldSpec('property_address', r'property\s+(?:address|located)' + _ADDRESS, clean=_strip),
+    FieldSpec('property_address', r'premises' + _ADDRESS, clean=_strip),
+    FieldSpec('property_address', r'address' + _ADDRESS, clean=_strip),
+    FieldSpec('property_address', r'located\s+at' + _ADDRESS, clean=_strip),
+    FieldSpec('lease_dates', r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'),
+    FieldSpec('lease_dates', r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})'),
+    FieldSpec('lease_dates', r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{2,4})'),
+)
+
+ID_CARD_FIELDS = (
+    FieldSpec('name', r'([A-Z][a-z]+ [A-Z][a-z]+(?: [A-Z][a-z]+)?)', case_sensitive=True, clean=_strip),
+    FieldSpec('name', r'name' + _NAME, case_sensitive=True, clean=_strip),
+    FieldSpec('id_number', r'(\d{4}\s?\d{4}\s?\d{4})', case_sensitive=True, extras={'id_type': 'aadhaar'}),
+    FieldSpec('id_number', r'([A-Z]{5}\d{4}[A-Z])', case_sensitive=True, extras={'id_type': 'pan'}),
+    FieldSpec('id_number', r'([A-Z]{2}\d{13})', case_sensitive=True, extras={'id_type': 'driving_license'}),
+    FieldSpec('id_number', r'([A-Z]\d{7})', case_sensitive=True, extras={'id_type': 'passport'}),
+    FieldSpec('date_of_birth', r'(?:dob|birth)[:\s]+(\d{2}[/-]\d{2}[/-]\d{4})'),
+    FieldSpec('date_of_birth', r'(\d{2}[/-]\d{2}[/-]\d{4})'),
+)
+
+PROPERTY_DOCUMENT_FIELDS = (
+    FieldSpec('property_type', r'apartment|flat|unit', value='Apartment'),
+    FieldSpec('property_type', r'house|villa|bungalow|cottage', value='House'),
+    FieldSpec('property_type', r'commercial|office|shop|store|warehouse', value='Commercial'),
+    FieldSpec('area', r'(\d+[\d,]*)\s*(?:sq\.?\s*ft|square\s*feet|sqft)', clean=_amount),
+    FieldSpec('area', r'area[:\s]+(\d+[\d,]*)', clean=_amount),
+    FieldSpec('area', r'size[:\s]+(\d+[\d,]*)', clean=_amount),
+    FieldSpec('bedrooms', r'(\d+)\s*(?:bedroom|bed|bhk)'),
+    FieldSpec('bathrooms', r'(\d+)\s*(?:bathroom|bath)'),
+)
+
+DOCUMENT_EXTRACTORS: Dict[str, FieldExtractor] = {
+    'rental_agreement': FieldExtractor(
+        RENTAL_AGREEMENT_FIELDS,
+        sequences={'lease_dates': ('lease_start_date', 'lease_end_date')}
+    ),
+    'id_card': FieldExtractor(ID_CARD_FIELDS),
+    'property_document': FieldExtractor(PROPERTY_DOCUMENT_FIELDS),
+}
+
+
+def extract_fields(text: str, document_type: str) -> Optional[Dict[str, Any]]:
+    """Extract structured fields, or None if the document type has no specs"""
+    extractor = DOCUMENT_EXTRACTORS.get(document_type)
+    if extractor is None:
+        return None
+    return extractor.extract(text)
+
@@ -0,0 +1,150 @@
+"""
+OCR Job Queue for Rentum AI
+Lets /ocr/scan return a job id at once while a bounded worker pool does the OCR
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+JobWork = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class OCRJobQueue(ABC):
+    """Interface for job queue backends: submit work, poll a job, report metrics"""
+
+    @abstractmethod
+    async def submit(self, work: JobWork, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue work and return the job record; raises QueueFull when at capacity"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if unknown or expired"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, job counts and wait-time metrics"""
+
+
+class InProcessJobQueue(OCRJobQueue):
+    """asyncio.Queue with a fixed pool of worker tasks, no external broker.
+
+    Workers start on the first submit, on whichever event loop is running,
+    since the Vercel deployment has no lifespan hook. Jobs only live as long
+    as the process, and finished jobs beyond ``retention`` are dropped oldest
+    first.
+    """
+
+    def __init__(self, workers: int = 4, max_queue_size: int = 100, retention: int = 1000):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.retention = retention
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker_tasks = []
+        self._wait_ms = deque(maxlen=500)
+        self.submitted = 0
+        self.processing = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or the previous loop is gone (e.g. a new test client)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, work: JobWork, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        self._ensure_workers()
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            **metadata,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'wait_ms': None,
+            'result': None,
+            'error': None,
+        }
+        try:
+            self._queue.put_nowait((job, work, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(f"OCR job queue is full ({self.max_queue_size} jobs waiting)")
+
+        self.submitted += 1
+        self._jobs[job['id']] = job
+        self._trim()
+        return job
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            job, work, enqueued = await queue.get()
+            wait_ms = (time.perf_counter() - enqueued) * 1000
+            self._wait_ms.append(wait_ms)
+            job.update(status='processing', started_at=datetime.now().isoformat(), wait_ms=round(wait_ms, 2))
+            self.processing += 1
+            try:
+                job['result'] = await work()
+                job['status'] = 'completed'
+                self.completed += 1
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'failed'
+                self.failed += 1
+            finally:
+                job['finished_at'] = datetime.now().isoformat()
+                self.processing -= 1
+                queue.task_done()
+
+    def _trim(self):
+        while len(self._jobs) > self.retention:
+            oldest_id = next(iter(self._jobs))
+            if self._jobs[oldest_id]['status'] in ('queued', 'processing'):
+                break
+            self._jobs.popitem(last=False)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_ms)
+        return {
+            'backend': 'in_process',
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_size': self.max_queue_size,
+            'processing': self.processing,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'avg_wait_ms': round(sum(waits) / len(waits), 2) if waits else 0.0,
+            'p95_wait_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+            'max_wait_ms': round(waits[-1], 2) if waits else 0.0
+        }
+
+
+def job_queue_from_env() -> OCRJobQueue:
+    """Build the job queue from OCR_JOB_WORKERS, OCR_JOB_QUEUE_SIZE and OCR_JOB_RETENTION"""
+    return InProcessJobQueue(
+        workers=int(os.getenv('OCR_JOB_WORKERS', '4')),
+        max_queue_size=int(os.getenv('OCR_JOB_QUEUE_SIZE', '100')),
+        retention=int(os.getenv('OCR_JOB_RETENTION', '1000'))
+    )
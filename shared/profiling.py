@@ -0,0 +1,237 @@
+"""
+On-Demand Request Profiling for Rentum AI
+Profiles single requests picked by a header or a sampling rate and keeps the results in a bounded on-disk ring
+"""
+
+import asyncio
+import cProfile
+import hmac
+import json
+import marshal
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from shared.route_labels import route_template
+
+PROFILE_HEADER = b'x-profile'
+PROFILE_ID = re.compile(r'^\d{13}-[0-9a-f]{8}$')
+EXTENSIONS = {'sample': 'txt', 'cprofile': 'prof'}
+
+
+class ProfileStore:
+    """A directory holding the newest ``max_profiles`` profiles, each with a JSON metadata file.
+
+    Ids start with the millisecond timestamp, so sorting them sorts by age
+    and the oldest profile is the first one deleted.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        if max_profiles < 1:
+            raise ValueError(f"max_profiles must be at least 1, got {max_profiles}")
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, data: bytes, metadata: Dict[str, Any]) -> None:
+        extension = EXTENSIONS[metadata['mode']]
+        with open(os.path.join(self.directory, f'{profile_id}.{extension}'), 'wb') as f:
+            f.write(data)
+        metadata = {'id': profile_id, 'file': f'{profile_id}.{extension}', 'bytes': len(data), **metadata}
+        with open(os.path.join(self.directory, f'{profile_id}.json'), 'w') as f:
+            json.dump(metadata, f)
+        with self._lock:
+            for old_id in self._ids()[:-self.max_profiles]:
+                for name in os.listdir(self.directory):
+                    if name.startswith(old_id + '.'):
+                        os.remove(os.path.join(self.directory, name))
+
+    def _ids(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(self.directory)
+                      if name.endswith('.json') and PROFILE_ID.match(name[:-5]))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of the stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(os.path.join(self.directory, f'{profile_id}.json')) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # deleted by a concurrent save, or still being written
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[str]:
+        """The profile's data file, or None for an unknown (or malformed) id"""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        for extension in EXTENSIONS.values():
+            path = os.path.join(self.directory, f'{profile_id}.{extension}')
+            if os.path.exists(path):
+                return path
+        return None
+
+
+class SamplingProfiler:
+    """Wall-clock sampler over every thread, so work on the OCR thread pool shows up too.
+
+    Output is collapsed stacks ('outer;inner;leaf count' per line), which
+    speedscope and flamegraph.pl read directly. Idle threads are sampled as
+    well and show up as their wait frames.
+    """
+
+    mode = 'sample'
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> bytes:
+        self._stop.set()
+        self._thread.join()
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common()).encode('utf-8')
+
+
+class DeterministicProfiler:
+    """cProfile over the event loop thread only; the .prof output opens in pstats or snakeviz.
+
+    Every function call is timed, including other requests' coroutines that
+    run on the loop meanwhile, and work sent to thread pools is not seen.
+    """
+
+    mode = 'cprofile'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> bytes:
+        self.profile.disable()
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a request when it carries X-Profile or is sampled.
+
+    With a token configured, X-Profile must carry it. One request is
+    profiled at a time; triggers that arrive meanwhile run unprofiled. The
+    response gets an X-Profile-Id header naming the stored profile. Apps
+    only add this middleware when profiling is enabled, so requests pay
+    nothing for it otherwise.
+    """
+
+    def __init__(self, app, store: ProfileStore, mode: str = 'sample', sample_rate: float = 0.0,
+                 token: Optional[str] = None, interval: float = 0.005):
+        if mode not in EXTENSIONS:
+            raise ValueError(f"Unknown profiling mode {mode!r}; use 'sample' or 'cprofile'")
+        self.app = app
+        self.store = store
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _trigger(self, scope) -> Optional[str]:
+        for name, value in scope['headers']:
+            if name == PROFILE_HEADER:
+                if self.token is None or hmac.compare_digest(value, self.token.encode()):
+                    return 'header'
+                break
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope['type'] == 'http' else None
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id()
+        status = 500
+
+        async def tagged_send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval) if self.mode == 'sample' else DeterministicProfiler()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, tagged_send)
+        finally:
+            data = profiler.stop()
+            self._busy.release()
+            metadata = {
+                'mode': self.mode,
+                'trigger': trigger,
+                'method': scope['method'],
+                'path': scope['path'],
+                'route': route_template(scope),
+                'status': status,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'created_at': datetime.now().isoformat(),
+            }
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.store.save, profile_id, data, metadata)
+
+
+def profile_store_from_env() -> Optional[ProfileStore]:
+    """The profile store when PROFILING_ENABLED is set (PROFILING_DIR, PROFILING_MAX_PROFILES), else None"""
+    if os.getenv('PROFILING_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    return ProfileStore(
+        directory=os.getenv('PROFILING_DIR', '/tmp/rentum-profiles'),
+        max_profiles=int(os.getenv('PROFILING_MAX_PROFILES', '50'))
+    )
+
+
+def profiling_options_from_env() -> Dict[str, Any]:
+    """Middleware options from PROFILING_MODE, PROFILING_SAMPLE_RATE and PROFILING_TOKEN"""
+    return {
+        'mode': os.getenv('PROFILING_MODE', 'sample'),
+        'sample_rate': float(os.getenv('PROFILING_SAMPLE_RATE', '0')),
+        'token': os.getenv('PROFILING_TOKEN') or None,
+    }
+
+
+def admin_token_valid(store: Optional[ProfileStore], expected: Optional[str], token: Optional[str]) -> bool:
+    """Whether the profile admin routes may answer: profiling is on and a PROFILING_TOKEN is set and given"""
+    return store is not None and bool(expected) and token is not None and hmac.compare_digest(token.encode(), expected.encode())
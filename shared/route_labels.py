@@ -0,0 +1,33 @@
+"""
+Route Labels for Rentum AI
+Route templates for per-route stats, so /ocr/jobs/abc and /ocr/jobs/def count as one route
+"""
+
+from typing import Any, Callable, Dict, MutableMapping
+
+UNMATCHED_ROUTE = 'unmatched'
+
+# endpoint -> path template, per app, filled on first use and refreshed when routes are added later
+_templates: Dict[int, Dict[Callable[..., Any], str]] = {}
+
+
+def route_template(scope: MutableMapping[str, Any]) -> str:
+    """The path template of the route that handled the request ('/ocr/jobs/{job_id}').
+
+    Starlette's router writes the matched endpoint into the shared scope, so
+    this only works once the app has routed the request (e.g. when the
+    response starts). Requests no route matched are labelled 'unmatched'.
+    """
+    endpoint = scope.get('endpoint')
+    app = scope.get('app')
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    templates = _templates.get(id(app))
+    if templates is None or endpoint not in templates:
+        templates = {
+            route.endpoint: route.path
+            for route in getattr(app, 'routes', ())
+            if hasattr(route, 'endpoint') and hasattr(route, 'path')
+        }
+        _templates[id(app)] = templates
+    return templates.get(endpoint, UNMATCHED_ROUTE)
@@ -0,0 +1,123 @@
+"""
+OCR Scan Store for Rentum AI
+In-memory scan history with a per-user index and cursor pagination
+"""
+
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Large fields left out of listings unless asked for; the full record is kept in the store
+LISTING_EXCLUDED_FIELDS = ('raw_text',)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ScanStore:
+    """Append-only list of scan records plus a user_id -> positions index.
+
+    Scan ids are sequential ("1", "2", ...), so a record's position is its id
+    minus one and the cursor for the next page is simply the last id returned.
+    Listing a page costs a bisect plus the page size, however long the history.
+    Stored records are never mutated; ``replace`` swaps in a new one, so a
+    reader on another thread sees either the old record or the new one.
+    """
+
+    def __init__(self):
+        self._records: List[Dict[str, Any]] = []
+        self._positions_by_user: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def next_id(self) -> str:
+        return str(len(self._records) + 1)
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a record whose id came from next_id()"""
+        with self._lock:
+            position = len(self._records)
+            if record.get('id') != str(position + 1):
+                raise ValueError(f"Scan id {record.get('id')!r} is not the next id {position + 1}")
+            self._records.append(record)
+            self._positions_by_user[record['user_id']].append(position)
+        return record
+
+    def replace(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Swap in a new version of a stored record (same id and user_id)"""
+        position = _position_of(record.get('id'))
+        with self._lock:
+            if position is None or position >= len(self._records):
+                raise ValueError(f"Scan id {record.get('id')!r} is not stored")
+            if record.get('user_id') != self._records[position]['user_id']:
+                raise ValueError(f"Scan {record['id']} cannot move to another user")
+            self._records[position] = record
+        return record
+
+    def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        position = _position_of(scan_id)
+        return self._records[position] if position is not None and position < len(self._records) else None
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        if user_id is None:
+            return len(self._records)
+        positions = self._positions_by_user.get(user_id)
+        return len(positions) if positions else 0
+
+    def page(self, user_id: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+             after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return up to ``limit`` records after the ``after`` cursor, oldest first,
+        and the cursor for the following page (None on the last page)"""
+        start = 0
+        if after is not None:
+            after_position = _position_of(after)
+            if after_position is None:
+                raise InvalidCursor(f"Invalid cursor {after!r}")
+            start = after_position + 1
+
+        if user_id is None:
+            records = self._records[start:start + limit]
+            has_more = start + limit < len(self._records)
+        else:
+            positions = self._positions_by_user.get(user_id, [])
+            first = bisect_right(positions, start - 1)
+            records = [self._records[p] for p in positions[first:first + limit]]
+            has_more = first + limit < len(positions)
+
+        next_cursor = records[-1]['id'] if records and has_more else None
+        return records, next_cursor
+
+    def list_page(self, user_id: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                  after: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+        """The paginated listing response shared by the API and backend /ocr/scans routes"""
+        records, next_cursor = self.page(user_id, limit, after)
+        if not full:
+            records = [summarize_scan(record) for record in records]
+        return {
+            "scans": records,
+            "total": self.count(user_id),
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+
+
+def summarize_scan(record: Dict[str, Any]) -> Dict[str, Any]:
+    if not any(field in record for field in LISTING_EXCLUDED_FIELDS):
+        return record
+    return {key: value for key, value in record.items() if key not in LISTING_EXCLUDED_FIELDS}
+
+
+def _position_of(scan_id: str) -> Optional[int]:
+    try:
+        position = int(scan_id) - 1
+    except (TypeError, ValueError):
+        return None
+    return position if position >= 0 else None
@@ -0,0 +1,261 @@
+"""
+Structured Logging for Rentum AI
+JSON log lines with per-module levels, a non-blocking queue handler, request ids and credential redaction
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+REQUEST_ID_HEADER = b'x-request-id'
+DEFAULT_QUEUE_SIZE = 10000
+REDACTED = '[REDACTED]'
+
+# Set per request by RequestContextMiddleware; None outside a request
+request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+# Whether this request's DEBUG lines are kept (LOG_DEBUG_SAMPLE_RATE)
+debug_sampled: ContextVar[bool] = ContextVar('debug_sampled', default=True)
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+SECRET_FIELD = re.compile(r'secret|token|password|passwd|private_key|credential|authorization|api_key', re.I)
+SECRET_PATTERNS = [
+    # PEM private keys, raw or JSON-escaped
+    (re.compile(r'-----BEGIN [A-Z ]*PRIVATE KEY-----.*?-----END [A-Z ]*PRIVATE KEY-----', re.S), REDACTED),
+    # Service account JSON fields
+    (re.compile(r'("(?:private_key|private_key_id|client_secret|refresh_token|access_token)"\s*:\s*")[^"]*"'),
+     r'\1' + REDACTED + '"'),
+    (re.compile(r'(Bearer\s+)[A-Za-z0-9._~+/-]+=*', re.I), r'\1' + REDACTED),
+    # Google API keys
+    (re.compile(r'AIza[0-9A-Za-z_-]{35}'), REDACTED),
+    # Base64 JSON, e.g. GOOGLE_APPLICATION_CREDENTIALS_BASE64, and JWTs
+    (re.compile(r'eyJ[A-Za-z0-9+/=_-]{40,}'), REDACTED),
+    (re.compile(r'\b((?:key|token|password|secret)=)[^&\s]+', re.I), r'\1' + REDACTED),
+]
+
+
+def redact(text: str) -> str:
+    """text with private keys, tokens and other credential material replaced by [REDACTED]"""
+    for pattern, replacement in SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request_id and any extra={...} fields.
+
+    With json_lines=False the same fields are written as text with the
+    extras as key=value pairs, which reads better in a local terminal.
+    Everything is redacted before it is written.
+    """
+
+    def __init__(self, json_lines: bool = True):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: Dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+        }
+        if getattr(record, 'request_id', None):
+            fields['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                if SECRET_FIELD.search(key):
+                    value = REDACTED
+                elif isinstance(value, str):
+                    value = redact(value)
+                fields[key] = value
+        if record.exc_info:
+            fields['exception'] = redact(self.formatException(record.exc_info))
+
+        if self.json_lines:
+            return json.dumps(fields, default=str, ensure_ascii=False)
+        extras = ' '.join(f'{key}={value}' for key, value in fields.items()
+                          if key not in ('time', 'level', 'logger', 'message', 'exception'))
+        line = f"{fields['time']} {fields['level']:<7} {fields['logger']}: {fields['message']}"
+        line = f'{line} {extras}' if extras else line
+        return f"{line}\n{fields['exception']}" if 'exception' in fields else line
+
+
+class RequestContextFilter(logging.Filter):
+    """Tags records with the current request id and drops DEBUG lines of requests not sampled"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.INFO and not debug_sampled.get():
+            return False
+        record.request_id = request_id.get()
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never waits: when the queue is full the record is counted and dropped.
+
+    Formatting, redaction and the write to stdout happen on the listener
+    thread, so a slow or blocked stdout never holds up a request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.addFilter(RequestContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener formats; only resolve args and tracebacks here, since
+        # the objects they refer to may change once the record is queued
+        if not record.args and not record.exc_info:
+            return record
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.msg = f'{record.msg}\n{record.exc_text}'
+            record.exc_info = record.exc_text = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time, so redirected stdout gets the logs too"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+class LogListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() writes out what is queued and may be called more than once"""
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+_listener: Optional[LogListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_module_levels: Dict[str, str] = {}
+
+
+def configure_logging(level: str = 'INFO', levels: Optional[Dict[str, str]] = None, json_lines: bool = True,
+                      queue_size: int = DEFAULT_QUEUE_SIZE,
+                      handler: Optional[logging.Handler] = None) -> LogListener:
+    """Route all logging through one queue drained by a background thread.
+
+    level is the root level; levels maps logger names ('api.index',
+    'shared.ocr_jobs') to their own. Output goes to handler, stdout by
+    default. Calling this again replaces the previous setup.
+    """
+    global _listener, _handler, _module_levels
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_handler)
+        for name in _module_levels:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+
+    handler = handler or StdoutHandler()
+    handler.setFormatter(StructuredFormatter(json_lines))
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _listener = LogListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level.upper())
+    _module_levels = dict(levels or {})
+    for name, module_level in _module_levels.items():
+        logging.getLogger(name).setLevel(module_level.upper())
+    return _listener
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full"""
+    return _handler.dropped if _handler is not None else 0
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+class RequestContextMiddleware:
+    """ASGI middleware giving each request an id for its log lines and deciding whether its DEBUG lines are kept.
+
+    The id comes from an incoming X-Request-ID header (so ids from a proxy
+    or the frontend carry through) or is generated, and is returned in the
+    response's X-Request-ID header. Background jobs and OCR pool work
+    started by the request inherit it.
+    """
+
+    def __init__(self, app, debug_sample_rate: float = 1.0):
+        self.app = app
+        self.debug_sample_rate = debug_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        current_id = None
+        for name, value in scope['headers']:
+            if name == REQUEST_ID_HEADER:
+                current_id = value.decode('latin-1')[:128]
+                break
+        current_id = current_id or uuid.uuid4().hex
+
+        async def tagged_send(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', [])) + [(REQUEST_ID_HEADER, current_id.encode('latin-1'))]
+            await send(message)
+
+        id_token = request_id.set(current_id)
+        sampled_token = debug_sampled.set(self.debug_sample_rate >= 1.0 or random.random() < self.debug_sample_rate)
+        try:
+            await self.app(scope, receive, tagged_send)
+        finally:
+            request_id.reset(id_token)
+            debug_sampled.reset(sampled_token)
+
+
+def logging_options_from_env() -> Dict[str, Any]:
+    """configure_logging options from LOG_LEVEL, LOG_LEVELS ('api.index=DEBUG,shared.ocr_jobs=WARNING'),
+    LOG_FORMAT (json or text) and LOG_QUEUE_SIZE"""
+    levels = {}
+    for entry in os.getenv('LOG_LEVELS', '').split(','):
+        if '=' in entry:
+            name, module_level = entry.split('=', 1)
+            levels[name.strip()] = module_level.strip()
+    return {
+        'level': os.getenv('LOG_LEVEL', 'INFO'),
+        'levels': levels,
+        'json_lines': os.getenv('LOG_FORMAT', 'json').lower() != 'text',
+        'queue_size': int(os.getenv('LOG_QUEUE_SIZE', str(DEFAULT_QUEUE_SIZE))),
+    }
+
+
+def debug_sample_rate_from_env() -> float:
+    """Fraction of requests whose DEBUG lines are kept (LOG_DEBUG_SAMPLE_RATE, default all)"""
+    return float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test the CSV/NDJSON bulk import endpoints of the asyncpg backend
+"""
+
+import json
+from datetime import datetime, timezone
+
+import asyncpg
+from fastapi.testclient import TestClient
+
+from backend import main_backup
+from backend.main_backup import INSERTS, app, agreements_db, payments_db
+
+client = TestClient(app)
+
+class CopyConnection:
+    """Accepts COPY unless a chunk references user "ghost", like a foreign key violation"""
+
+    def __init__(self):
+        self.copied = []
+        self.inserted = []
+
+    async def copy_records_to_table(self, table, columns, records):
+        if any("ghost" in record for record in records):
+            raise asyncpg.ForeignKeyViolationError("violates foreign key constraint")
+        self.copied.append((table, columns, records))
+
+    async def fetchrow(self, sql, *args):
+        if "ghost" in args:
+            raise asyncpg.ForeignKeyViolationError('user "ghost" does not exist')
+        self.inserted.append(args)
+        return {"status": "pending", "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc)}
+
+class Pool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        connection = self.connection
+
+        class Acquire:
+            async def __aenter__(self):
+                return connection
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+def test_csv_import_keeps_good_rows_and_reports_bad_ones_in_memory():
+    main_backup.app.state.db = None
+    before = len(payments_db)
+    body = ("user_id,property_id,amount,payment_type,proof_url\n"
+            "1,2,1500.00,rent,\n"
+            "1,2,not-a-number,rent,\n"
+            "\n"
+            "3,4,200,deposit,https://example.com/proof.png\n"
+            "5,,100,rent,\n")
+    report = client.post("/payments/import", content=body, headers={"Content-Type": "text/csv"}).json()
+
+    assert report["format"] == "csv" and report["storage"] == "in-memory"
+    assert (report["received"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 4]
+    added = payments_db[before:]
+    assert [p["amount"] for p in added] == [1500.0, 200.0] and added[0]["proof_url"] is None
+    assert all(p["status"] == "pending" for p in added)
+
+def test_ndjson_agreements_with_clauses_and_invalid_lines():
+    main_backup.app.state.db = None
+    before = len(agreements_db)
+    agreement = {"property_id": "1", "landlord_id": "2", "tenant_id": "1", "start_date": "2024-01-01",
+                 "end_date": "2024-12-31", "rent": 1500, "deposit": 3000, "clauses": {"pets": False}}
+    body = json.dumps(agreement) + "\n{not json\n" + json.dumps([1, 2]) + "\n"
+    report = client.post("/agreements/import", params={"format": "ndjson"}, content=body).json()
+    assert (report["imported"], report["failed"]) == (1, 2)
+    assert agreements_db[before]["clauses"] == {"pets": False}
+    assert client.post("/agreements/import", params={"format": "xml"}, content=body).status_code == 400
+
+def test_database_import_copies_chunks_and_isolates_rejected_rows(monkeypatch):
+    connection = CopyConnection()
+    monkeypatch.setattr(main_backup, "IMPORT_CHUNK_SIZE", 3)
+    main_backup.app.state.db = Pool(connection)
+    try:
+        rows = [{"user_id": user, "doc_type": "lease", "url": f"https://example.com/{i}.pdf"}
+                for i, user in enumerate(["1", "2", "3", "4", "ghost", "6", "7"])]
+        body = "".join(json.dumps(row) + "\n" for row in rows)
+        report = client.post("/documents/import", content=body,
+                             headers={"Content-Type": "application/x-ndjson"}).json()
+    finally:
+        main_backup.app.state.db = None
+
+    assert report["storage"] == "database"
+    assert (report["imported"], report["failed"]) == (6, 1) and report["errors"][0]["row"] == 5
+    # First and last chunks went through COPY; the chunk with the bad row was retried row by row
+    assert [len(records) for _, _, records in connection.copied] == [3, 1]
+    assert connection.copied[0][1] == list(INSERTS["documents"].columns)
+    assert len(connection.inserted) == 2
+
+def test_csv_quoted_fields_may_span_lines():
+    main_backup.app.state.db = None
+    before = len(agreements_db)
+    body = ('property_id,landlord_id,tenant_id,start_date,end_date,rent,deposit,clauses\r\n'
+            '1,2,1,2024-01-01,2024-12-31,1500,3000,"{""pets"": false,\r\n'
+            '\r\n'
+            '  ""notes"": ""no smoking, quiet after 10pm""}"\r\n'
+            '1,2,3,2024-02-01,2025-01-31,1200,2400,\r\n')
+    report = client.post("/agreements/import", content=body, headers={"Content-Type": "text/csv"}).json()
+    assert (report["received"], report["imported"], report["failed"]) == (2, 2, 0), report["errors"]
+    assert agreements_db[before]["clauses"] == {"pets": False, "notes": "no smoking, quiet after 10pm"}
+
+    unterminated = client.post("/agreements/import", content=body + '1,2,3,2024-01-01,2024-12-31,1,1,"{\n',
+                               headers={"Content-Type": "text/csv"}).json()
+    assert unterminated["failed"] == 1 and unterminated["errors"][0]["row"] == 3
+
+def test_storage_reports_a_fallback_partway_through(monkeypatch):
+    class FlakyPool(Pool):
+        def acquire(self):
+            if self.connection.copied:
+                raise ConnectionResetError("connection lost")
+            return super().acquire()
+
+    monkeypatch.setattr(main_backup, "IMPORT_CHUNK_SIZE", 2)
+    main_backup.app.state.db = FlakyPool(CopyConnection())
+    try:
+        rows = [{"user_id": str(i), "doc_type": "lease", "url": f"https://example.com/{i}.pdf"} for i in range(4)]
+        body = "".join(json.dumps(row) + "\n" for row in rows)
+        report = client.post("/documents/import", content=body,
+                             headers={"Content-Type": "application/x-ndjson"}).json()
+    finally:
+        main_backup.app.state.db = None
+    assert report["imported"] == 4 and report["storage"] == "mixed"
+
+def test_connection_lost_during_row_retry_falls_back_only_for_the_rest(monkeypatch):
+    class DroppingConnection(CopyConnection):
+        async def fetchrow(self, sql, *args):
+            if len(self.inserted) == 2:
+                raise ConnectionResetError("connection lost")
+            return await super().fetchrow(sql, *args)
+
+    connection = DroppingConnection()
+    monkeypatch.setattr(main_backup, "IMPORT_CHUNK_SIZE", 4)
+    main_backup.app.state.db = Pool(connection)
+    before = len(main_backup.documents_db)
+    try:
+        rows = [{"user_id": user, "doc_type": "lease", "url": f"https://example.com/{i}.pdf"}
+                for i, user in enumerate(["1", "2", "3", "ghost"])]
+        body = "".join(json.dumps(row) + "\n" for row in rows)
+        report = client.post("/documents/import", content=body,
+                             headers={"Content-Type": "application/x-ndjson"}).json()
+    finally:
+        main_backup.app.state.db = None
+
+    # Rows 1 and 2 were committed by the retry; only rows 3 and 4 went to memory
+    assert len(connection.inserted) == 2
+    assert [doc["user_id"] for doc in main_backup.documents_db[before:]] == ["3", "ghost"]
+    assert report["imported"] == 4 and report["failed"] == 0 and report["storage"] == "mixed"
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed, ETag-validated bodies of the polled demo and metadata routes
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.repositories import ListRepository
+from shared.cached_responses import CachedJSON, etag_matches
+
+def test_body_is_rebuilt_only_when_the_store_changes():
+    users = ListRepository("users", ("role",))
+    users.add({"name": "Alice", "role": "tenant"})
+    cached = CachedJSON(users.all, version=lambda: users.version)
+
+    body, etag = cached.body()
+    assert body == b'[{"id":"1","name":"Alice","role":"tenant"}]'
+    assert cached.body() == (body, etag) and cached.stats()["builds"] == 1
+
+    users.add({"name": "Bob", "role": "landlord"})
+    new_body, new_etag = cached.body()
+    assert new_etag != etag and b"Bob" in new_body
+    assert cached.stats() == {"builds": 2, "hits": 1, "not_modified": 0}
+
+def test_if_none_match_forms():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"old", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"old"', '"abc"') and not etag_matches(None, '"abc"')
+
+def test_both_apps_serve_cached_routes_with_etags():
+    from api.index import app as api_app
+    from backend.index import app as backend_app
+
+    for app in (api_app, backend_app):
+        client = TestClient(app)
+        for path in ("/", "/demo", "/users", "/properties"):
+            response = client.get(path)
+            assert response.status_code == 200 and response.headers["content-type"] == "application/json"
+            etag = response.headers["etag"]
+            assert client.get(path).json() == response.json()
+
+            revalidated = client.get(path, headers={"If-None-Match": etag})
+            assert revalidated.status_code == 304 and revalidated.content == b""
+            assert revalidated.headers["etag"] == etag
+
+def test_api_demo_etag_changes_with_new_scans():
+    from api.index import app, ocr_results
+
+    client = TestClient(app)
+    before = client.get("/demo")
+    ocr_results.add({"id": ocr_results.next_id(), "user_id": "cache-test", "document_type": "lease"})
+    after = client.get("/demo", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and after.json()["ocr_results"] == before.json()["ocr_results"] + 1
+
+def test_health_is_live_and_cached_bodies_carry_no_stale_timestamp():
+    from api.index import app as api_app
+    from backend.index import app as backend_app
+
+    for app in (api_app, backend_app):
+        client = TestClient(app)
+        first = client.get("/health")
+        time.sleep(0.01)
+        second = client.get("/health")
+        assert "etag" not in first.headers and first.json()["timestamp"] < second.json()["timestamp"]
+        assert "timestamp" not in client.get("/").json()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the response compression middleware
+"""
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from shared.compression import CompressionMiddleware, CompressionStats, choose_encoding
+
+SCANS = [{"id": str(i), "raw_text": "RESIDENTIAL LEASE AGREEMENT " * 5, "status": "completed"} for i in range(50)]
+
+app = FastAPI()
+stats = CompressionStats()
+app.add_middleware(CompressionMiddleware, stats=stats, minimum_size=500, gzip_level=6)
+
+@app.get("/scans/{user_id}")
+async def scans(user_id: str):
+    return {"user_id": user_id, "scans": SCANS}
+
+@app.get("/small")
+async def small():
+    return {"status": "ok"}
+
+@app.get("/photo")
+async def photo():
+    return Response(b"\xff\xd8\xff" + b"\x00" * 4096, media_type="image/jpeg")
+
+@app.get("/stream")
+async def stream():
+    async def rows():
+        for scan in SCANS:
+            yield (json.dumps(scan) + "\n").encode()
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+client = TestClient(app)
+
+def test_encoding_follows_accept_encoding_and_q_values():
+    assert choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert choose_encoding("gzip;q=0, identity", brotli_available=False) is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding("deflate", brotli_available=True) is None
+
+def test_large_json_is_gzipped_and_small_or_binary_bodies_are_not():
+    response = client.get("/scans/7", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["scans"] == SCANS  # httpx decodes gzip transparently
+    raw = client.get("/scans/7", headers={"Accept-Encoding": "gzip"}).headers["content-length"]
+    assert int(raw) < len(json.dumps({"user_id": "7", "scans": SCANS})) / 5
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/photo", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/scans/7", headers={"Accept-Encoding": "identity"}).headers
+
+def test_streamed_responses_are_compressed_chunk_by_chunk():
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line) for line in lines] == SCANS
+
+def test_ratios_are_kept_per_route_template():
+    for user_id in ("1", "2"):
+        client.get(f"/scans/{user_id}", headers={"Accept-Encoding": "gzip"})
+    route = stats.stats()["routes"]["/scans/{user_id}"]
+    assert route["compressed"] >= 2 and route["responses"] >= route["compressed"]
+    assert route["bytes_out"] < route["bytes_in"] and route["ratio"] < 0.5
+    assert stats.stats()["routes"]["/small"]["ratio"] == 1.0
+
+def test_every_etag_route_revalidates_with_the_weakened_tag():
+    # Compression turns ETags weak, so any handler that compares If-None-Match
+    # itself must accept W/"..." or compressed clients never get a 304
+    script = """
+from fastapi.testclient import TestClient
+from api.index import app as api_app
+from backend.index import app as backend_app
+client = TestClient(backend_app)
+request_id = client.post("/reviews/request", data={
+    "requester_id": "2", "reviewer_email": "tenant@example.com", "request_type": "landlord_review"
+}).json()["id"]
+client.post("/reviews/response", data={"request_id": request_id, "overall_rating": 4, "comments": "ok"})
+for app, paths in ((api_app, ["/demo", "/users", "/properties"]),
+                   (backend_app, ["/demo", "/users", "/properties", "/users/2/profile"])):
+    client = TestClient(app)
+    for path in paths:
+        first = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert first.headers["etag"].startswith('W/"'), (path, first.headers)
+        again = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304, (path, again.status_code)
+"""
+    env = {**os.environ, "COMPRESSION_MIN_SIZE": "100"}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
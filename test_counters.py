@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the counters registry behind the backend's /stats endpoint
+"""
+
+from fastapi.testclient import TestClient
+
+from backend.counters import CounterRegistry, EventRate
+from backend.repositories import ListRepository
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_event_rate_buckets_slide_without_keeping_history():
+    clock = Clock(1_000_000 * 60)
+    rate = EventRate(minutes=3, clock=clock)
+    rate.record(2)
+    clock.now += 60
+    rate.record()
+    assert rate.per_minute() == [0, 2, 1]
+
+    clock.now += 120  # the minute with 2 events has left the window; its slot is reused
+    rate.record(5)
+    assert rate.per_minute() == [1, 0, 5]
+    assert rate.stats() == {"current_minute": 5, "last_3_minutes": 6, "avg_per_minute": 2.0, "peak_per_minute": 5}
+
+def test_registry_tallies_existing_records_then_follows_writes():
+    users = ListRepository("users", ("role",))
+    users.add({"name": "Alice", "role": "tenant"})
+    clock = Clock(600.0)
+    counters = CounterRegistry(clock=clock)
+    counters.track("users", users, field="role", rate=True)
+    assert counters.count("users") == 1 and counters.rate_stats()["users_per_minute"]["current_minute"] == 0
+
+    users.add_many([{"name": "Bob", "role": "landlord"}, {"name": "Carol", "role": "tenant"}])
+    assert counters.count("users") == 3
+    assert counters.breakdown("users") == {"tenant": 2, "landlord": 1}
+    assert counters.rate_stats()["users_per_minute"]["current_minute"] == 2
+
+def test_registry_seeds_from_grouped_counts_not_records():
+    class GroupedOnly(ListRepository):
+        def page(self, *args, **kwargs):
+            raise AssertionError("track read the records")
+
+    properties = GroupedOnly("properties", ("status",))
+    properties.add_many([{"status": "active"}, {"status": "active"}, {}])
+    counters = CounterRegistry()
+    counters.track("properties", properties, field="status")
+    counters.track("all_properties", properties)
+    assert counters.breakdown("properties") == {"active": 2, "None": 1}
+    assert counters.count("properties") == counters.count("all_properties") == 3
+
+def test_stats_endpoint_reads_counters_that_match_the_stores():
+    from backend.index import app, ocr_scans_db, properties_db, review_responses_db, users_db
+
+    client = TestClient(app)
+    before = client.get("/stats").json()
+    client.post("/ocr/scan", files={"file": ("lease.jpg", b"\xff\xd8\xff", "image/jpeg")},
+                data={"user_id": "1", "document_type": "utility_bill"})
+    stats = client.get("/stats").json()
+
+    assert stats["total_ocr_scans"] == before["total_ocr_scans"] + 1 == len(ocr_scans_db)
+    assert stats["scans_by_document_type"]["utility_bill"] == len(ocr_scans_db.find(document_type="utility_bill"))
+    assert stats["rates"]["ocr_scans_per_minute"]["last_60_minutes"] >= 1
+    assert stats["total_users"] == len(users_db)
+    assert stats["user_breakdown"]["tenants"] == users_db.count(role="tenant")
+    assert stats["properties_by_status"] == {"active": len(properties_db)}
+    assert sum(stats["reviews_by_risk_level"].values()) == len(review_responses_db)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the single-statement INSERT ... RETURNING write path of the asyncpg backend
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from backend import main_backup
+from backend.main_backup import INSERTS, insert_record
+
+class RecordingConnection:
+    """Stands in for an asyncpg connection; returns the server defaults a real insert would"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetchrow(self, sql, *args):
+        self.calls.append((sql, args))
+        return {"status": "pending", "created_at": datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)}
+
+class RecordingPool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return pool.connection
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+def test_each_create_is_one_insert_returning_the_server_defaults():
+    for table, statement in INSERTS.items():
+        assert statement.sql.startswith(f"INSERT INTO {table} (")
+        assert "RETURNING" in statement.sql and "NOW()" not in statement.sql
+        assert "created_at" not in statement.columns and "uploaded_at" not in statement.columns
+
+    connection = RecordingConnection()
+    main_backup.app.state.db = RecordingPool(connection)
+    try:
+        fallback = []
+        payment = {"id": "7", "user_id": "1", "property_id": "2", "amount": 1500.0,
+                   "payment_type": "rent", "proof_url": None, "status": "pending",
+                   "created_at": "2024-01-01T00:00:00"}
+        saved = asyncio.run(insert_record("payments", payment, fallback))
+    finally:
+        main_backup.app.state.db = None
+
+    assert len(connection.calls) == 1 and fallback == []
+    sql, args = connection.calls[0]
+    assert sql == INSERTS["payments"].sql and args == ("7", "1", "2", 1500.0, "rent", None)
+    assert saved["created_at"] == "2024-05-01 12:00:00+00:00" and saved["status"] == "pending"
+
+def test_without_a_database_records_stay_in_memory():
+    main_backup.app.state.db = None
+    fallback = []
+    record = {"id": "8", "name": "Alice", "email": "a@example.com", "phone": None,
+              "profile_photo": None, "role": "tenant", "created_at": "2024-01-01T00:00:00"}
+    assert asyncio.run(insert_record("users", record, fallback)) is record
+    assert fallback == [record]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the Pillow preprocessing stage that runs before Google Vision uploads
+"""
+
+import io
+
+from PIL import Image, ImageDraw
+
+from shared.image_preprocessing import ImagePreprocessor
+
+def make_phone_photo(width=4000, height=3000, orientation=None):
+    """A noisy colour 'photo' of a printed page, optionally with an EXIF orientation tag"""
+    image = Image.effect_noise((width, height), 40).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for line in range(0, height, 120):
+        draw.text((200, line), "Tenant: John Doe   Monthly Rent: 25,000   Deposit: 75,000", fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, format='JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+def test_large_photo_is_rotated_downscaled_and_grayscale():
+    preprocessor = ImagePreprocessor(max_dimension=2048)
+    original = make_phone_photo(orientation=6)  # camera held in portrait
+
+    optimized, stats = preprocessor.optimize(original)
+    print(f"📉 {stats['original_bytes']} -> {stats['optimized_bytes']} bytes in {stats['preprocessing_ms']} ms")
+
+    with Image.open(io.BytesIO(optimized)) as image:
+        assert image.mode == 'L'
+        assert max(image.size) <= 2048
+        assert image.height > image.width
+    assert stats['outcome'] == 'optimized'
+    assert stats['optimized_bytes'] < stats['original_bytes'] / 4
+
+def test_unsupported_and_small_files_pass_through():
+    preprocessor = ImagePreprocessor()
+    pdf = b'%PDF-1.4\n% fake pdf body'
+    optimized, stats = preprocessor.optimize(pdf)
+    assert optimized is pdf
+    assert stats['outcome'].startswith('skipped')
+
+    buffer = io.BytesIO()
+    Image.new('L', (40, 20), color=255).save(buffer, format='PNG')
+    tiny_png = buffer.getvalue()
+    optimized, stats = preprocessor.optimize(tiny_png)
+    assert optimized is tiny_png
+    assert stats['outcome'] == 'kept_original'
+
+    totals = preprocessor.stats()
+    assert (totals['images_processed'], totals['images_optimized']) == (2, 0)
+
+def test_disabled_preprocessor_is_a_no_op():
+    original = make_phone_photo(800, 600)
+    optimized, stats = ImagePreprocessor(enabled=False).optimize(original)
+    assert optimized is original
+    assert stats['outcome'] == 'disabled'
+
+if __name__ == "__main__":
+    print("🧪 Testing OCR image preprocessing...")
+    test_large_photo_is_rotated_downscaled_and_grayscale()
+    test_unsupported_and_small_files_pass_through()
+    test_disabled_preprocessor_is_a_no_op()
+    print("✅ All image preprocessing tests passed")
+
+def test_huge_canvas_is_sent_as_uploaded_without_decoding():
+    # A 12000x12000 blank PNG compresses to a few hundred KB but decodes to over 1 GB
+    buffer = io.BytesIO()
+    Image.new('1', (12000, 12000), color=1).save(buffer, format='PNG')
+    bomb = buffer.getvalue()
+    assert len(bomb) < 5 * 1024 * 1024
+
+    optimized, stats = ImagePreprocessor().optimize(bomb)
+    assert optimized is bomb
+    assert stats['outcome'] == 'skipped: 12000x12000 exceeds 40000000 pixels'
+    assert stats['preprocessing_ms'] < 500
+
+def test_large_png_is_reduced_before_rotation():
+    image = Image.radial_gradient('L').resize((6000, 3000)).convert('RGB')
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', exif=exif, compress_level=1)
+
+    optimized, stats = ImagePreprocessor(max_dimension=2048).optimize(buffer.getvalue())
+    assert stats['outcome'] == 'optimized'
+    with Image.open(io.BytesIO(optimized)) as result:
+        assert result.mode == "L" and result.size == (1024, 2048)
+
+def test_bilevel_and_palette_scans_are_downscaled():
+    gradient = Image.radial_gradient('L').resize((5000, 3000))
+    for mode, file_format in (('1', 'TIFF'), ('P', 'PNG')):
+        buffer = io.BytesIO()
+        gradient.convert(mode).save(buffer, format=file_format)
+
+        optimized, stats = ImagePreprocessor(max_dimension=2048).optimize(buffer.getvalue())
+        assert stats['outcome'] == 'optimized', mode
+        with Image.open(io.BytesIO(optimized)) as result:
+            assert result.mode == "L" and result.size == (2048, 1229)
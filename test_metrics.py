@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus metrics registry, middleware and /metrics endpoints
+"""
+
+import re
+import threading
+
+from fastapi.testclient import TestClient
+
+from shared.metrics import MetricsRegistry
+from shared.ocr_backends import FakeVisionBackend
+from shared.ocr_cache import OCRResultCache
+
+def sample(text, name, **labels):
+    """The value of one sample line in a /metrics body"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(name + ("{" + label_text + "}" if labels else "")) + r" (\S+)"
+    match = re.search(r"^" + pattern + r"$", text, re.M)
+    assert match, f"no sample {name} {labels}"
+    return float(match.group(1))
+
+def test_render_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc(('/say "hi"',))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+    assert registry.counter("requests_total", "Requests", ("route",)) is requests
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text and "# TYPE latency_seconds histogram" in text
+    assert 'requests_total{route="/say \\"hi\\""} 1' in text
+    assert sample(text, "latency_seconds_bucket", le="0.1") == 1
+    assert sample(text, "latency_seconds_bucket", le="1") == 3
+    assert sample(text, "latency_seconds_bucket", le="+Inf") == 4
+    assert sample(text, "latency_seconds_count") == 4 and sample(text, "latency_seconds_sum") == 4.05
+
+def test_observations_from_many_threads_add_up():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("sizes", "Sizes", buckets=(10,))
+
+    def work():
+        for i in range(10000):
+            counter.inc()
+            histogram.observe(i % 20)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.values() == {(): 80000}
+    assert histogram.values()[()][:2] == [44000, 36000]
+
+def test_api_metrics_cover_routes_uploads_and_ocr():
+    from api.index import app, ocr_service
+
+    ocr_service.client, ocr_service.status = FakeVisionBackend(seed=3, error_rate=0), "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+    client = TestClient(app)
+    upload = b"\xff\xd8\xff metrics lease"
+    client.post("/ocr/scan", files={"file": ("lease.jpg", upload, "image/jpeg")},
+                data={"user_id": "1", "document_type": "rental_agreement"})
+    for job_id in ("missing-1", "missing-2"):
+        client.get(f"/ocr/jobs/{job_id}")
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "http_requests_total", method="GET", route="/ocr/jobs/{job_id}", status="200") >= 2
+    assert sample(text, "http_request_duration_seconds_count", method="POST", route="/ocr/scan") >= 1
+    assert sample(text, "http_request_size_bytes_sum", route="/ocr/scan") > len(upload)
+    assert sample(text, "http_requests_in_flight") == 1  # this /metrics request
+    assert sample(text, "ocr_vision_request_seconds_count", call="text_detection") >= 1
+    assert sample(text, "ocr_extraction_seconds_count") >= 1
+    assert sample(text, "ocr_text_length_chars_sum") > 0
+
+def test_backend_metrics_endpoint():
+    from backend.index import app
+
+    client = TestClient(app)
+    client.get("/users")
+    text = client.get("/metrics").text
+    assert sample(text, "http_requests_total", method="GET", route="/users", status="200") >= 1
+    assert sample(text, "http_response_size_bytes_count", route="/users") >= 1
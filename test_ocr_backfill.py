@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test re-running OCR field extraction over stored scan text
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from api.index import app, ocr_results, ocr_service, reparse_scan_text
+from shared.ocr_backends import DEFAULT_FIXTURE_TEXT, make_response
+from shared.ocr_backfill import backfill_file, backfill_store
+from shared.scan_store import ScanStore
+
+def stale_scan(scan_id, raw_text=DEFAULT_FIXTURE_TEXT):
+    return {"id": scan_id, "user_id": "1", "document_type": "rental_agreement",
+            "raw_text": raw_text, "extracted_data": {"stale": True}}
+
+def write_ndjson(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+def test_store_backfill_updates_in_place_and_resumes_by_cursor():
+    store = ScanStore()
+    for _ in range(5):
+        store.add(stale_scan(store.next_id()))
+    store.add(stale_scan(store.next_id(), raw_text=""))
+
+    first = backfill_store(store, reparse_scan_text, chunk_size=2, max_docs=3)
+    assert first["processed"] == 3 and first["next_cursor"] == "3"
+    rest = backfill_store(store, reparse_scan_text, chunk_size=2, after=first["next_cursor"])
+    assert rest["processed"] == 3 and rest["skipped"] == 1 and rest["next_cursor"] is None
+
+    expected = ocr_service.parse_text(DEFAULT_FIXTURE_TEXT, "rental_agreement")["extracted_data"]
+    assert all(store.get(str(i))["extracted_data"] == expected for i in range(1, 6))
+    assert store.get("6")["extracted_data"] == {"stale": True}
+
+def test_file_backfill_on_a_process_pool_resumes_after_interruption(tmp_path):
+    source, target = tmp_path / "scans.ndjson", tmp_path / "out.ndjson"
+    write_ndjson(source, [stale_scan(str(i)) for i in range(1, 8)])
+
+    # A previous run wrote two records and died partway through the third
+    target.write_text(json.dumps(stale_scan("1")) + "\n" + json.dumps(stale_scan("2")) + "\n{\"id\": \"3\"")
+    report = backfill_file(str(source), str(target), reparse_scan_text, processes=2, chunk_size=2)
+    assert report["resumed_from"] == 2 and report["processed"] == 5 and report["docs_per_sec"] > 0
+
+    records = [json.loads(line) for line in target.read_text().splitlines()]
+    assert [record["id"] for record in records] == [str(i) for i in range(1, 8)]
+    assert all("reparsed_at" in record for record in records[2:])
+
+def test_backfill_endpoint_and_full_raw_text_is_kept(monkeypatch):
+    long_text = DEFAULT_FIXTURE_TEXT + "Clause\n" * 200
+    assert ocr_service._build_ocr_result(make_response([long_text]), "rental_agreement")["raw_text"] == long_text
+
+    stale = ocr_results.add(stale_scan(ocr_results.next_id(), raw_text=long_text))
+    client = TestClient(app)
+    assert client.post("/ocr/backfill").status_code == 403
+    monkeypatch.setenv("OCR_BACKFILL_TOKEN", "secret")
+    assert client.post("/ocr/backfill", headers={"X-Admin-Token": "wrong"}).json()["error_code"] == "BACKFILL_FORBIDDEN"
+
+    report = client.post("/ocr/backfill", headers={"X-Admin-Token": "secret"}).json()
+    assert report["status"] == "completed" and report["failed"] == 0 and report["next_cursor"] is None
+    assert ocr_results.get(stale["id"])["extracted_data"]["monthly_rent"] == "1500"
+    # The scan was replaced, not mutated under readers still holding it
+    assert stale["extracted_data"] == {"stale": True}
+
+    bogus = client.post("/ocr/backfill", params={"after": "bogus"}, headers={"X-Admin-Token": "secret"})
+    assert bogus.json()["error_code"] == "INVALID_CURSOR"
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the batch OCR endpoint offline with a fake batched Vision client
+"""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from shared.ocr_cache import OCRResultCache
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+class FakeBatchVisionClient:
+    """Records the size of every batch_annotate_images call"""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def batch_annotate_images(self, requests):
+        self.batch_sizes.append(len(requests))
+        responses = []
+        for request in requests:
+            content = request.image.content
+            if content.endswith(b'blank page'):
+                responses.append(SimpleNamespace(text_annotations=[], error=SimpleNamespace(message="")))
+            else:
+                text = f"Tenant: John Doe\nRent: ${len(content)}"
+                responses.append(SimpleNamespace(
+                    text_annotations=[SimpleNamespace(description=text)],
+                    error=SimpleNamespace(message="")
+                ))
+        return SimpleNamespace(responses=responses)
+
+def test_batch_scan_groups_vision_calls():
+    from api.index import app, ocr_service
+
+    fake_client = FakeBatchVisionClient()
+    ocr_service.client, ocr_service.status = fake_client, "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+
+    files = [('files', (f'lease{i}.jpg', JPEG_MAGIC + b'x' * i, 'image/jpeg')) for i in range(20)]
+    files.append(('files', ('notes.txt', b'plain text', 'text/plain')))
+    files.append(('files', ('blank.png', PNG_MAGIC + b'blank page', 'image/png')))
+
+    response = TestClient(app).post(
+        "/ocr/scan/batch", files=files, data={'user_id': '7', 'document_type': 'rental_agreement'}
+    ).json()
+    print(f"📊 Batch: {response['succeeded']}/{response['total']}, Vision calls: {fake_client.batch_sizes}")
+
+    # 21 valid images: one full chunk of 16 plus one of 5
+    assert sorted(fake_client.batch_sizes) == [5, 16]
+    assert (response['total'], response['succeeded'], response['failed']) == (22, 20, 2)
+
+    results = response['results']
+    assert [r['filename'] for r in results[:20]] == [f'lease{i}.jpg' for i in range(20)]
+    assert results[3]['extracted_data']['monthly_rent'] == '6'
+    assert results[20]['error_code'] == 'UNSUPPORTED_FILE_TYPE'
+    assert results[21]['error_code'] == 'OCR_PROCESSING_FAILED'
+    assert all(r['user_id'] == '7' for r in results[:20])
+
+def test_batch_reuses_cached_results():
+    from api.index import app, ocr_service
+
+    fake_client = FakeBatchVisionClient()
+    ocr_service.client, ocr_service.status = fake_client, "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+
+    client = TestClient(app)
+    form = {'user_id': '7', 'document_type': 'rental_agreement'}
+    files = [('files', ('a.jpg', JPEG_MAGIC + b'same photo', 'image/jpeg')), ('files', ('b.jpg', JPEG_MAGIC + b'same photo', 'image/jpeg'))]
+
+    first = client.post("/ocr/scan/batch", files=files, data=form).json()
+    second = client.post("/ocr/scan/batch", files=files, data=form).json()
+
+    # The duplicate inside the first batch is annotated once; the second batch is all cache hits
+    assert fake_client.batch_sizes == [1]
+    assert [r['cache_hit'] for r in first['results']] == [False, False]
+    assert [r['cache_hit'] for r in second['results']] == [True, True]
+
+def test_failed_chunks_and_missing_responses_only_fail_their_files():
+    from api.index import app, ocr_service
+
+    class FlakyBatchVisionClient(FakeBatchVisionClient):
+        def batch_annotate_images(self, requests):
+            if len(requests) == 16:
+                raise RuntimeError("429 Quota exceeded")
+            response = super().batch_annotate_images(requests)
+            # Vision answers one image short
+            return SimpleNamespace(responses=response.responses[:-1])
+
+    ocr_service.client, ocr_service.status = FlakyBatchVisionClient(), "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+    files = [('files', (f'lease{i}.jpg', JPEG_MAGIC + b'y' * i, 'image/jpeg')) for i in range(20)]
+    response = TestClient(app).post(
+        "/ocr/scan/batch", files=files, data={'user_id': '7', 'document_type': 'rental_agreement'}
+    ).json()
+
+    # One chunk of 16 failed outright; the other 4 lost their last response
+    assert response['status'] == 'completed' and response['total'] == 20
+    assert (response['succeeded'], response['failed']) == (3, 17)
+    failed = [r for r in response['results'] if r.get('error_code') == 'OCR_PROCESSING_FAILED']
+    assert len(failed) == 17 and any('Quota exceeded' in r['message'] for r in failed)
+    assert any('3 responses for 4 images' in r['message'] for r in failed)
+
+if __name__ == "__main__":
+    print("🧪 Testing batch OCR endpoint...")
+    test_batch_scan_groups_vision_calls()
+    test_batch_reuses_cached_results()
+    test_failed_chunks_and_missing_responses_only_fail_their_files()
+    print("✅ All batch OCR tests passed")
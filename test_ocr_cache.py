@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed OCR result cache offline with a fake Vision client
+"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+from shared.ocr_cache import OCRResultCache
+
+LEASE_TEXT = "Tenant: John Doe\nRent: $1,500\nDeposit: $3,000"
+
+class FakeVisionClient:
+    """Counts text_detection calls and always returns the same lease text"""
+    def __init__(self):
+        self.calls = 0
+
+    def text_detection(self, image):
+        self.calls += 1
+        return SimpleNamespace(
+            text_annotations=[SimpleNamespace(description=LEASE_TEXT)],
+            error=SimpleNamespace(message="")
+        )
+
+def test_lru_eviction_and_counters():
+    cache = OCRResultCache(max_entries=2)
+    keys = [cache.make_key(bytes([i]), 'rental_agreement') for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'extracted_data': {'n': i}})
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == {'extracted_data': {'n': 2}}
+
+    stats = cache.stats()
+    print(f"📊 Cache stats: {stats}")
+    assert stats['entries'] == 2
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+def test_key_depends_on_document_type():
+    content = b"same bytes"
+    assert OCRResultCache.make_key(content, 'id_card') != OCRResultCache.make_key(content, 'rental_agreement')
+
+def test_disk_tier_survives_new_process():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        key = OCRResultCache.make_key(b"lease", 'rental_agreement')
+        OCRResultCache(cache_dir=cache_dir).put(key, {'extracted_data': {'monthly_rent': '1500'}})
+
+        fresh = OCRResultCache(cache_dir=cache_dir)
+        assert fresh.get(key) == {'extracted_data': {'monthly_rent': '1500'}}
+        assert fresh.stats()['disk_hits'] == 1
+        assert fresh.get(key) is not None
+        assert fresh.stats()['hits'] == 1
+
+def test_failed_disk_write_is_logged_and_memory_tier_still_serves(caplog):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = OCRResultCache(cache_dir=cache_dir)
+        key = OCRResultCache.make_key(b"lease", 'rental_agreement')
+        # A file where the key's shard directory should be makes the write fail
+        open(os.path.join(cache_dir, key[:2]), 'w').close()
+        cache.put(key, {'extracted_data': {}})
+
+    assert cache.get(key) == {'extracted_data': {}}
+    [record] = [r for r in caplog.records if r.name == "shared.ocr_cache"]
+    assert record.levelname == "WARNING" and record.path.startswith(cache_dir)
+
+def test_duplicate_upload_skips_vision():
+    from fastapi.testclient import TestClient
+    from api.index import app, ocr_service
+
+    fake_client = FakeVisionClient()
+    ocr_service.client, ocr_service.status = fake_client, "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+
+    client = TestClient(app)
+    upload = {'file': ('lease.jpg', b'\xff\xd8\xff same photo bytes', 'image/jpeg')}
+    form = {'user_id': '1', 'document_type': 'rental_agreement'}
+
+    first = client.post("/ocr/scan", files=upload, data=form).json()
+    second = client.post("/ocr/scan", files=upload, data=form).json()
+    print(f"📄 First: cache_hit={first['cache_hit']}, second: cache_hit={second['cache_hit']}")
+
+    assert fake_client.calls == 1
+    assert (first['cache_hit'], second['cache_hit']) == (False, True)
+    assert first['extracted_data'] == second['extracted_data']
+    assert first['confidence_scores'] == second['confidence_scores']
+
+    health = client.get("/health").json()
+    assert health['ocr_cache']['hits'] == 1
+    assert health['ocr_cache']['misses'] == 1
+
+if __name__ == "__main__":
+    print("🧪 Testing OCR result cache...")
+    test_lru_eviction_and_counters()
+    test_key_depends_on_document_type()
+    test_disk_tier_survives_new_process()
+    test_duplicate_upload_skips_vision()
+    print("✅ All OCR cache tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test that a slow Google Vision call does not block other requests
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from shared.ocr_cache import OCRResultCache
+
+VISION_LATENCY = 0.5
+
+class SlowVisionClient:
+    """Blocks like the real gRPC client for VISION_LATENCY seconds"""
+    def text_detection(self, image):
+        time.sleep(VISION_LATENCY)
+        return SimpleNamespace(
+            text_annotations=[SimpleNamespace(description="Tenant: John Doe\nRent: $1,500")],
+            error=SimpleNamespace(message="")
+        )
+
+def scan_upload(name):
+    # Different bytes per upload so the OCR cache never short-circuits Vision
+    return {'file': (f'{name}.jpg', b'\xff\xd8\xff' + name.encode(), 'image/jpeg')}
+
+async def run_concurrent_requests():
+    from api.index import app, ocr_service
+
+    ocr_service.client, ocr_service.status = SlowVisionClient(), "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+    form = {'user_id': '1', 'document_type': 'rental_agreement'}
+    timings = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def timed(label, request):
+            response = await request
+            timings[label] = time.perf_counter() - started
+            return response
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            timed('scan_a', client.post("/ocr/scan", files=scan_upload('a'), data=form)),
+            timed('scan_b', client.post("/ocr/scan", files=scan_upload('b'), data=form)),
+            timed('health', client.get("/health")),
+            timed('users', client.get("/users")),
+        )
+
+    return responses, timings
+
+def test_ocr_does_not_block_event_loop():
+    responses, timings = asyncio.run(run_concurrent_requests())
+    print(f"⏱️ Timings: { {k: round(v, 3) for k, v in timings.items()} }")
+
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json()['status'] == 'completed'
+    # Fast routes finish while both scans are still waiting on Vision
+    assert timings['health'] < VISION_LATENCY
+    assert timings['users'] < VISION_LATENCY
+    # The two scans overlap instead of running back to back
+    assert max(timings['scan_a'], timings['scan_b']) < 2 * VISION_LATENCY
+
+if __name__ == "__main__":
+    print("🧪 Testing non-blocking OCR path...")
+    test_ocr_does_not_block_event_loop()
+    print("✅ Concurrent requests overlap with OCR")
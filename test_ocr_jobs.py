@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test background OCR jobs: queue, worker pool and status polling
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from shared.ocr_cache import OCRResultCache
+from shared.ocr_jobs import InProcessJobQueue, QueueFull
+
+class FakeVisionClient:
+    def text_detection(self, image):
+        time.sleep(0.05)
+        return SimpleNamespace(
+            text_annotations=[SimpleNamespace(description="Tenant: John Doe\nRent: $1,500")],
+            error=SimpleNamespace(message="")
+        )
+
+def poll(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/ocr/jobs/{job_id}").json()
+        if job.get('status') in ('completed', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_background_scan_returns_job_and_completes():
+    from api.index import app, ocr_service, ocr_jobs
+
+    ocr_service.client, ocr_service.status = FakeVisionClient(), "google_vision_ready"
+    ocr_service.cache = OCRResultCache()
+    form = {'user_id': '1', 'document_type': 'rental_agreement', 'background': 'true'}
+
+    with TestClient(app) as client:
+        queued = []
+        for i in range(3):
+            files = {'file': (f'lease{i}.jpg', b'\xff\xd8\xff' + bytes([i]), 'image/jpeg')}
+            response = client.post("/ocr/scan", files=files, data=form).json()
+            assert response['status'] == 'queued'
+            assert response['poll_url'] == f"/ocr/jobs/{response['job_id']}"
+            queued.append(response['job_id'])
+
+        for job_id in queued:
+            job = poll(client, job_id)
+            assert job['status'] == 'completed'
+            assert job['wait_ms'] is not None
+            assert job['result']['extracted_data']['tenant_name'].startswith('John Doe')
+
+        stats = client.get("/health").json()['ocr_jobs']
+        assert stats['completed'] >= 3
+        assert stats['queue_depth'] == 0
+
+        missing = client.get("/ocr/jobs/does-not-exist").json()
+        assert missing['error_code'] == 'JOB_NOT_FOUND'
+
+def test_queue_rejects_when_full_and_records_failures():
+    async def scenario():
+        queue = InProcessJobQueue(workers=1, max_queue_size=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return {'ok': True}
+
+        async def broken():
+            raise RuntimeError("vision exploded")
+
+        first = await queue.submit(blocked, {})
+        await asyncio.sleep(0)  # worker picks up the first job
+        second = await queue.submit(broken, {})
+        try:
+            await queue.submit(blocked, {})
+            raise AssertionError("expected QueueFull")
+        except QueueFull:
+            pass
+
+        release.set()
+        await queue._queue.join()
+        return queue, first, second
+
+    queue, first, second = asyncio.run(scenario())
+    assert first['status'] == 'completed'
+    assert (second['status'], second['error']) == ('failed', 'vision exploded')
+    stats = queue.stats()
+    assert (stats['submitted'], stats['completed'], stats['failed'], stats['rejected']) == (2, 1, 1, 1)
+    assert stats['processing'] == 0
+
+if __name__ == "__main__":
+    test_background_scan_returns_job_and_completes()
+    test_queue_rejects_when_full_and_records_failures()
+    print("✅ OCR job tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test on-demand request profiling and the profile ring on disk
+"""
+
+import marshal
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.profiling import ProfileStore, ProfilingMiddleware
+
+def busy_app(store, **options):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, interval=0.001, **options)
+
+    @app.get("/reviews/{review_id}")
+    async def review(review_id: str):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"id": review_id}
+
+    return app
+
+def test_store_keeps_only_the_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=3)
+    ids = []
+    for i in range(5):
+        profile_id = f"{1700000000000 + i:013d}-{i:08x}"
+        store.save(profile_id, b"main 1\n", {"mode": "sample", "path": f"/{i}"})
+        ids.append(profile_id)
+    assert [profile["id"] for profile in store.list()] == ids[:1:-1]
+    assert len(os.listdir(tmp_path)) == 6
+    assert store.path(ids[0]) is None and store.path(ids[4]).endswith(".txt")
+    assert store.path("../../etc/passwd") is None
+    with pytest.raises(ValueError):
+        ProfileStore(str(tmp_path), max_profiles=0)
+
+def test_only_triggered_requests_are_profiled(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    client = TestClient(busy_app(store, token="secret"))
+
+    assert "x-profile-id" not in client.get("/reviews/1").headers
+    assert "x-profile-id" not in client.get("/reviews/1", headers={"X-Profile": "guess"}).headers
+    assert store.list() == []
+
+    response = client.get("/reviews/2", headers={"X-Profile": "secret"})
+    [profile] = store.list()
+    assert response.headers["x-profile-id"] == profile["id"]
+    assert profile["route"] == "/reviews/{review_id}" and profile["trigger"] == "header"
+    assert profile["status"] == 200 and profile["duration_ms"] >= 50
+    with open(store.path(profile["id"])) as f:
+        stacks = f.read()
+    assert "review (test_profiling.py" in stacks
+
+def test_sampling_rate_and_deterministic_mode(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    client = TestClient(busy_app(store, mode="cprofile", sample_rate=1.0))
+    client.get("/reviews/3")
+    [profile] = store.list()
+    assert profile["trigger"] == "sampled" and profile["file"].endswith(".prof")
+    with open(store.path(profile["id"]), "rb") as f:
+        stats = marshal.load(f)
+    assert any(function == "review" for _, _, function in stats)
+
+def test_admin_routes_need_profiling_and_the_token(tmp_path):
+    from api.index import app
+    assert TestClient(app).get("/admin/profiles").status_code == 403
+
+    # A fresh interpreter, since profiling is configured when api.index is imported
+    script = """
+from fastapi.testclient import TestClient
+from api.index import app
+client = TestClient(app)
+profile_id = client.get("/health", headers={"X-Profile": "secret"}).headers["x-profile-id"]
+assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+listing = client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).json()
+assert [profile["id"] for profile in listing["profiles"]] == [profile_id]
+download = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+assert download.status_code == 200 and profile_id in download.headers["content-disposition"]
+assert client.get("/admin/profiles/1700000000000-00000000", headers={"X-Admin-Token": "secret"}).status_code == 404
+"""
+    env = {**os.environ, "PROFILING_ENABLED": "true", "PROFILING_DIR": str(tmp_path), "PROFILING_TOKEN": "secret"}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
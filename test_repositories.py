@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the list and SQLite record repositories against the same contract
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from backend.repositories import ListRepository, SQLiteDatabase
+from shared.scan_store import InvalidCursor
+
+@pytest.fixture(params=["list", "sqlite"])
+def scans(request, tmp_path):
+    if request.param == "list":
+        yield ListRepository("ocr_scans", ("user_id", "document_type"))
+        return
+    database = SQLiteDatabase(str(tmp_path / "rentum.db"))
+    yield database.repository("ocr_scans", ("user_id", "document_type"))
+    database.close()
+
+def test_ids_filters_and_pages(scans):
+    first = scans.add({"user_id": "1", "document_type": "id_card", "extracted_data": {"name": "Alice"}})
+    assert first == {"id": "1", "user_id": "1", "document_type": "id_card", "extracted_data": {"name": "Alice"}}
+    scans.add_many({"user_id": str(i % 3), "document_type": "rental_agreement"} for i in range(2, 12))
+
+    assert len(scans) == 11 and scans.get("1") == first
+    assert scans.get("12") is None and scans.get("bogus") is None
+    assert [scan["id"] for scan in scans.find(user_id="1")] == ["1", "4", "7", "10"]
+    assert scans.count(user_id="1", document_type="rental_agreement") == 3
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = scans.page(2, cursor, user_id="2")
+        seen += [scan["id"] for scan in page]
+        if cursor is None:
+            break
+    assert seen == ["2", "5", "8", "11"]
+
+    assert scans.count_by("document_type") == {"id_card": 1, "rental_agreement": 10}
+    assert scans.count_by("user_id") == {"1": 4, "2": 4, "0": 3}
+
+    with pytest.raises(InvalidCursor):
+        scans.page(2, "bogus")
+    with pytest.raises(ValueError):
+        scans.find(extracted_data="x")
+    with pytest.raises(ValueError):
+        scans.count_by("extracted_data")
+
+def test_sqlite_persists_and_reads_from_many_threads(tmp_path):
+    path = str(tmp_path / "rentum.db")
+    database = SQLiteDatabase(path)
+    users = database.repository("users", ("role",))
+    users.seed([{"id": "1", "name": "Alice", "role": "tenant"}, {"id": "2", "name": "Bob", "role": "landlord"}])
+    database.close()
+
+    reopened = SQLiteDatabase(path)
+    users = reopened.repository("users", ("role",))
+    users.seed([{"id": "1", "name": "Someone else", "role": "tenant"}])
+    assert users.all() == [{"id": "1", "name": "Alice", "role": "tenant"},
+                           {"id": "2", "name": "Bob", "role": "landlord"}]
+
+    counts = []
+    readers = [threading.Thread(target=lambda: counts.append(users.count(role="tenant"))) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    assert counts == [1] * 8
+    assert reopened.writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
+
+def test_backend_app_runs_on_sqlite(tmp_path):
+    # A fresh interpreter, since the stores are chosen when backend.index is imported
+    script = """
+from fastapi.testclient import TestClient
+from backend.index import app
+client = TestClient(app)
+assert client.get("/health").json()["database"] == "sqlite"
+assert [user["id"] for user in client.get("/users").json()] == ["1", "2", "3", "4"]
+request_id = client.post("/reviews/request", data={
+    "requester_id": "1", "reviewer_email": "bob@example.com", "request_type": "tenant_review"
+}).json()["id"]
+client.post("/reviews/response", data={"request_id": request_id, "overall_rating": 4})
+assert client.get("/users/1/profile").json()["total_reviews"] == 1
+assert client.get("/stats").json()["user_breakdown"] == {"tenants": 2, "landlords": 2}
+"""
+    env = {**os.environ, "BACKEND_STORE": "sqlite", "BACKEND_SQLITE_PATH": str(tmp_path / "rentum.db")}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test word-boundary keyword matching in AIReviewAnalyzer comment analysis
+"""
+
+from backend.ai_review_service import AIReviewAnalyzer
+from shared.keyword_matcher import KeywordMatcher
+
+def test_matcher_is_word_bounded_and_finds_phrases():
+    matcher = KeywordMatcher([('late', 'late'), ('every time', 'phrase'), ('time', 'time'),
+                              ('well-maintained', 'kept'), ("didn't", 'negation')])
+    assert matcher.find("Please translate the lease") == set()
+    assert matcher.find("Rent was LATE, twice.") == {'late'}
+    assert matcher.find("Paid every time") == {'phrase', 'time'}
+    assert matcher.find("A well maintained, well-maintained flat") == {'kept'}
+    assert matcher.find("They didn’t call back") == {'negation'}
+    # Overlapping phrases share a prefix and are both reported
+    overlapping = KeywordMatcher([('on time', 'a'), ('time every month', 'b'), ('on time every month', 'c')])
+    assert overlapping.find("paid on time every month") == {'a', 'b', 'c'}
+
+def test_analyze_comments_flags():
+    analyzer = AIReviewAnalyzer()
+    green, red = analyzer._analyze_comments("always paid rent on time, very clean and respectful. never late.")
+    assert green == ['Maintenance: clean', 'Behavior: respectful', 'Payment: Consistent positive behavior']
+    assert red == ['Payment: late', 'Payment: Negative payment history mentioned']
+
+    # Substrings inside other words no longer raise flags
+    green, red = analyzer._analyze_comments("nothing to translate; the parent company was current")
+    assert (green, red) == ([], [])
+
+def test_inflected_forms_count_as_their_keyword():
+    analyzer = AIReviewAnalyzer()
+    green, red = analyzer._analyze_comments("they did not make payments and damages were left")
+    assert red == ['Maintenance: damaged', 'Payment: Negative payment history mentioned']
+
+    green, red = analyzer._analyze_comments("always paid promptly; left the flat cleaned and behaved respectfully")
+    assert green == ['Payment: prompt', 'Maintenance: clean', 'Behavior: respectful',
+                     'Payment: Consistent positive behavior']
+    assert red == []
+
+    # Whole words only: "lately" is not a late payment
+    assert analyzer._analyze_comments("lately they have been great") == ([], [])
+
+if __name__ == "__main__":
+    test_matcher_is_word_bounded_and_finds_phrases()
+    test_analyze_comments_flags()
+    test_inflected_forms_count_as_their_keyword()
+    print("✅ Review keyword tests passed")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the per-user scan index and cursor pagination of /ocr/scans
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from shared.scan_store import InvalidCursor, ScanStore
+
+def make_store(user_ids):
+    store = ScanStore()
+    for user_id in user_ids:
+        store.add({"id": store.next_id(), "user_id": user_id, "raw_text": "x" * 100})
+    return store
+
+def test_pages_walk_a_users_history_in_order():
+    store = make_store(["1", "2", "1", "1", "2", "1", "1"])
+    seen, cursor = [], None
+    while True:
+        scans, cursor = store.page("1", limit=2, after=cursor)
+        seen.extend(scan["id"] for scan in scans)
+        if cursor is None:
+            break
+    assert seen == ["1", "3", "4", "6", "7"]
+    assert store.count("1") == 5 and store.count("2") == 2 and store.count("9") == 0
+
+    listing = store.list_page("2", limit=1)
+    assert listing["total"] == 2 and listing["has_more"] and listing["next_cursor"] == "2"
+    assert "raw_text" not in listing["scans"][0]
+    assert "raw_text" in store.list_page("2", limit=1, full=True)["scans"][0]
+
+    with pytest.raises(InvalidCursor):
+        store.page(after="not-a-cursor")
+    with pytest.raises(ValueError):
+        store.add({"id": "99", "user_id": "1"})
+
+def test_replace_swaps_in_a_new_record():
+    store = make_store(["1", "2"])
+    old = store.get("2")
+    store.replace({**old, "raw_text": "new"})
+    assert store.get("2")["raw_text"] == "new" and old["raw_text"] == "x" * 100
+    assert [scan["id"] for scan in store.page("2")[0]] == ["2"]
+
+    with pytest.raises(ValueError):
+        store.replace({"id": "3", "user_id": "1"})
+    with pytest.raises(ValueError):
+        store.replace({**old, "user_id": "1"})
+
+def test_api_and_backend_share_the_pagination_contract():
+    from api.index import app as api_app, ocr_results
+    from backend.index import app as backend_app, ocr_scans_db
+
+    for _ in range(2):
+        ocr_results.add({"id": ocr_results.next_id(), "user_id": "pager", "raw_text": "lease"})
+    backend_client = TestClient(backend_app)
+    for _ in range(3):
+        backend_client.post("/ocr/scan", files={"file": ("a.jpg", b"x", "image/jpeg")},
+                            data={"user_id": "pager", "document_type": "rental_agreement"})
+
+    for client, expected_total in ((TestClient(api_app), 2), (backend_client, 3)):
+        first = client.get("/ocr/scans", params={"user_id": "pager", "limit": 1}).json()
+        assert first["total"] == expected_total and len(first["scans"]) == 1 and first["has_more"]
+        rest = client.get("/ocr/scans", params={"user_id": "pager", "limit": 50, "after": first["next_cursor"]}).json()
+        assert len(rest["scans"]) == expected_total - 1 and rest["next_cursor"] is None
+
+    assert TestClient(api_app).get("/ocr/scans", params={"after": "bogus"}).json()["error_code"] == "INVALID_CURSOR"
+    assert backend_client.get("/ocr/scans", params={"after": "bogus"}).status_code == 400
+    assert len(ocr_scans_db) >= 3
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test the streamed list endpoints of the asyncpg backend
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from backend import main_backup
+from backend.main_backup import app, payments_db, users_db
+
+client = TestClient(app)
+
+class Cursor:
+    def __init__(self, rows, fetches):
+        self.rows = rows
+        self.fetches = fetches
+
+    async def fetch(self, n):
+        self.fetches.append(n)
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+class Transaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def start(self):
+        self.connection.events.append("begin")
+
+    async def rollback(self):
+        self.connection.events.append("rollback")
+
+class CursorConnection:
+    """Stands in for an asyncpg connection serving rows through a cursor"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.events = []
+        self.fetches = []
+
+    def transaction(self, readonly=False):
+        assert readonly
+        return Transaction(self)
+
+    async def cursor(self, sql):
+        self.events.append(sql)
+        return Cursor(list(self.rows), self.fetches)
+
+class CursorPool:
+    def __init__(self, connection):
+        self.connection = connection
+        self.released = 0
+
+    async def acquire(self):
+        return self.connection
+
+    async def release(self, connection):
+        self.released += 1
+
+def test_in_memory_lists_stream_as_json_array_and_ndjson(monkeypatch):
+    main_backup.app.state.db = None
+    monkeypatch.setattr(main_backup, "STREAM_BATCH_ROWS", 2)
+    response = client.get("/users")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == users_db
+
+    response = client.get("/users", params={"format": "ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == users_db
+
+    response = client.get("/payments", headers={"Accept": "application/x-ndjson"})
+    assert len(response.text.splitlines()) == len(payments_db)
+
+def test_database_lists_fetch_cursor_batches_and_release_the_connection(monkeypatch):
+    monkeypatch.setattr(main_backup, "STREAM_BATCH_ROWS", 2)
+    rows = [{"id": str(i), "amount": Decimal("1500.50"), "status": "pending",
+             "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc)} for i in range(5)]
+    connection = CursorConnection(rows)
+    pool = CursorPool(connection)
+    main_backup.app.state.db = pool
+    try:
+        body = client.get("/payments").json()
+    finally:
+        main_backup.app.state.db = None
+
+    assert [row["id"] for row in body] == ["0", "1", "2", "3", "4"]
+    assert body[0]["amount"] == 1500.5 and body[0]["created_at"] == "2024-05-01 00:00:00+00:00"
+    assert connection.fetches == [2, 2, 2]
+    assert connection.events[0] == "begin" and connection.events[1].startswith("SELECT")
+    assert connection.events[-1] == "rollback" and pool.released == 1
+
+def test_database_errors_before_streaming_fall_back_to_memory():
+    class BrokenConnection(CursorConnection):
+        async def cursor(self, sql):
+            raise OSError("connection reset")
+
+    pool = CursorPool(BrokenConnection([]))
+    main_backup.app.state.db = pool
+    try:
+        body = client.get("/users").json()
+    finally:
+        main_backup.app.state.db = None
+    assert body == users_db and pool.released == 1
+
+def test_client_disconnect_mid_stream_still_releases_the_connection(monkeypatch):
+    monkeypatch.setattr(main_backup, "STREAM_BATCH_ROWS", 2)
+
+    async def run():
+        fetching = asyncio.Event()
+
+        class StalledCursor(Cursor):
+            async def fetch(self, n):
+                if self.fetches:
+                    # The client goes away while the second batch is still being fetched
+                    fetching.set()
+                    await asyncio.Event().wait()
+                return await super().fetch(n)
+
+        class SlowCleanupConnection(CursorConnection):
+            async def cursor(self, sql):
+                return StalledCursor(list(self.rows), self.fetches)
+
+            def transaction(self, readonly=False):
+                transaction = super().transaction(readonly)
+                rollback = transaction.rollback
+
+                async def slow_rollback():
+                    await asyncio.sleep(0.01)
+                    await rollback()
+
+                transaction.rollback = slow_rollback
+                return transaction
+
+        class SlowReleasePool(CursorPool):
+            async def release(self, connection):
+                await asyncio.sleep(0.01)
+                await super().release(connection)
+
+        connection = SlowCleanupConnection([{"id": str(i)} for i in range(5)])
+        pool = SlowReleasePool(connection)
+        main_backup.app.state.db = pool
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+        async def receive():
+            message = next(messages, None)
+            if message:
+                return message
+            await fetching.wait()
+            return {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "http_version": "1.1", "method": "GET", "path": "/payments", "raw_path": b"/payments",
+                 "root_path": "", "scheme": "http", "query_string": b"", "headers": [],
+                 "client": ("test", 0), "server": ("test", 80), "app": app}
+        await app(scope, receive, send)
+        return connection, pool, sent
+
+    try:
+        connection, pool, sent = asyncio.run(run())
+    finally:
+        main_backup.app.state.db = None
+    assert sent[0]["status"] == 200 and sent[-1].get("more_body") is not False
+    assert connection.events[-1] == "rollback" and pool.released == 1
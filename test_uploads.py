@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test size-bounded upload ingestion for the OCR endpoints
+"""
+
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from shared.uploads import read_upload, sniff_file_type
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+def test_sniff_file_type():
+    assert sniff_file_type(JPEG_MAGIC + b'\xe0 rest of jpeg') == 'jpeg'
+    assert sniff_file_type(b'\x89PNG\r\n\x1a\n....') == 'png'
+    assert sniff_file_type(b'%PDF-1.7') == 'pdf'
+    assert sniff_file_type(b'MM\x00*') == 'tiff'
+    assert sniff_file_type(b'Tenant: John Doe') is None
+
+def test_read_upload_hashes_and_stops_at_limit():
+    content = JPEG_MAGIC + b'x' * 200_000
+    upload = asyncio.run(read_upload(UploadFile(io.BytesIO(content)), max_bytes=len(content), chunk_size=4096))
+    assert upload.content == content
+    assert upload.digest.hexdigest() == hashlib.sha256(content).hexdigest()
+    assert (upload.sniffed_type, upload.too_large) == ('jpeg', False)
+
+    upload = asyncio.run(read_upload(UploadFile(io.BytesIO(content)), max_bytes=10_000, chunk_size=4096))
+    assert upload.too_large
+    assert upload.content == b""
+    assert upload.size <= 10_000 + 4096
+
+class SizelessUpload:
+    """UploadFile as Starlette releases before 0.24 build it: no size attribute"""
+
+    def __init__(self, content):
+        self.file = io.BytesIO(content)
+
+    async def read(self, size=-1):
+        return self.file.read(size)
+
+def test_read_upload_without_a_size_attribute():
+    content = JPEG_MAGIC + b'x' * 20_000
+    upload = asyncio.run(read_upload(SizelessUpload(content), max_bytes=len(content), chunk_size=4096))
+    assert upload.content == content and not upload.too_large
+    assert asyncio.run(read_upload(SizelessUpload(content), max_bytes=1000, chunk_size=4096)).too_large
+
+def test_oversized_content_length_rejected_before_body():
+    from api.index import app, MAX_FILE_SIZE
+
+    def body():
+        yield b'x'
+
+    response = TestClient(app).post(
+        "/ocr/scan",
+        content=body(),
+        headers={'content-type': 'multipart/form-data; boundary=x', 'content-length': str(MAX_FILE_SIZE * 4)}
+    )
+    print(f"📊 Oversized upload: {response.status_code} {response.json()}")
+    assert response.status_code == 413
+    assert response.json()['error_code'] == 'FILE_TOO_LARGE'
+
+    # A trailing slash gets the same limit rather than slipping past it
+    response = TestClient(app).post(
+        "/ocr/scan/", follow_redirects=False,
+        content=body(),
+        headers={'content-type': 'multipart/form-data; boundary=x', 'content-length': str(MAX_FILE_SIZE * 4)}
+    )
+    assert response.status_code == 413
+
+def test_chunked_upload_cut_off_at_limit():
+    from api.index import app, MAX_FILE_SIZE
+
+    sent = []
+    def body():
+        # No Content-Length: the middleware has to count the streamed bytes
+        chunk = b'x' * (1024 * 1024)
+        for _ in range(MAX_FILE_SIZE // len(chunk) * 3):
+            sent.append(len(chunk))
+            yield chunk
+
+    response = TestClient(app).post(
+        "/ocr/scan", content=body(), headers={'content-type': 'multipart/form-data; boundary=x'}
+    )
+    print(f"📊 Chunked upload: {response.status_code}, {sum(sent)} bytes streamed")
+    assert response.status_code == 413
+    assert response.json()['error_code'] == 'FILE_TOO_LARGE'
+
+def test_content_that_is_not_an_image_is_rejected():
+    from api.index import app, ocr_service
+
+    ocr_service.status = "google_vision_ready"
+    response = TestClient(app).post(
+        "/ocr/scan",
+        files={'file': ('lease.jpg', b'Tenant: John Doe', 'image/jpeg')},
+        data={'user_id': '1', 'document_type': 'rental_agreement'}
+    ).json()
+    assert response['error_code'] == 'UNSUPPORTED_FILE_TYPE'
+
+if __name__ == "__main__":
+    print("🧪 Testing upload ingestion...")
+    test_sniff_file_type()
+    test_read_upload_hashes_and_stops_at_limit()
+    test_oversized_content_length_rejected_before_body()
+    test_chunked_upload_cut_off_at_limit()
+    test_content_that_is_not_an_image_is_rejected()
+    print("✅ All upload ingestion tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test incremental user profile aggregation against a from-scratch recompute
+"""
+
+import json
+import random
+
+from backend.ai_review_service import AIReviewAnalyzer, UserProfileAggregate
+
+def recompute_profile(analyzer, user_reviews):
+    """The original walk over every review, kept as the reference"""
+    category_sums, green, red, ai_scores = {}, {}, {}, []
+    for review in user_reviews:
+        if 'ai_overall_score' in review:
+            ai_scores.append(review['ai_overall_score'])
+        for category in analyzer.category_weights:
+            if review.get(category) is not None:
+                category_sums.setdefault(category, []).append(review[category])
+        for flag in review.get('ai_green_flags', []):
+            green[flag] = green.get(flag, 0) + 1
+        for flag in review.get('ai_red_flags', []):
+            red[flag] = red.get(flag, 0) + 1
+    if len(ai_scores) >= 3:
+        recent = ai_scores[-3:]
+        trend = 'improving' if all(s >= 7 for s in recent) else 'declining' if all(s <= 5 for s in recent) else 'stable'
+    else:
+        trend = 'insufficient_data'
+    return {
+        'overall_ai_score': round(sum(ai_scores) / len(ai_scores) if ai_scores else 0, 1),
+        'total_reviews': len(user_reviews),
+        'category_averages': {c: round(sum(v) / len(v), 2) for c, v in category_sums.items()},
+        'green_flags_summary': green,
+        'red_flags_summary': red,
+        'risk_trend': trend
+    }
+
+def random_review(rng, analyzer):
+    review = {'ai_green_flags': rng.sample(['Payment: timely', 'Behavior: quiet', 'Maintenance: clean'], rng.randint(0, 2)),
+              'ai_red_flags': rng.sample(['Payment: late', 'Behavior: noisy'], rng.randint(0, 1))}
+    if rng.random() < 0.9:
+        review['ai_overall_score'] = round(rng.uniform(2, 10), 1)
+    for category in analyzer.category_weights:
+        if rng.random() < 0.6:
+            review[category] = rng.choice([1, 2, 3, 4, 5, None])
+    return review
+
+def test_incremental_updates_match_recompute():
+    analyzer = AIReviewAnalyzer()
+    rng = random.Random(5)
+    reviews = [random_review(rng, analyzer) for _ in range(200)]
+
+    aggregate = analyzer.new_profile_aggregate()
+    assert aggregate.to_profile()['risk_trend'] == 'unknown'
+    for count, review in enumerate(reviews, start=1):
+        aggregate.add(review)
+        if count in (1, 2, 3, 50, 200):
+            assert aggregate.to_profile() == recompute_profile(analyzer, reviews[:count])
+    assert analyzer.aggregate_user_profile(reviews) == recompute_profile(analyzer, reviews)
+
+def test_serialization_round_trip_is_compact():
+    analyzer = AIReviewAnalyzer()
+    rng = random.Random(9)
+    aggregate = analyzer.new_profile_aggregate()
+    for _ in range(1000):
+        aggregate.add(random_review(rng, analyzer))
+
+    encoded = json.dumps(aggregate.to_dict())
+    assert len(encoded) < 1000
+    restored = UserProfileAggregate.from_dict(list(analyzer.category_weights), json.loads(encoded))
+    assert restored.to_profile() == aggregate.to_profile()
+
+    review = random_review(rng, analyzer)
+    aggregate.add(review)
+    restored.add(review)
+    assert restored.to_profile() == aggregate.to_profile()
+
+if __name__ == "__main__":
+    test_incremental_updates_match_recompute()
+    test_serialization_round_trip_is_compact()
+    print("✅ User profile aggregate tests passed")
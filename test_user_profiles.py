@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the write-through user_profiles cache behind GET /users/{id}/profile
+"""
+
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from backend.index import app, review_requests_db, reviews_about_user, user_profiles
+from backend.ai_review_service import ai_review_analyzer
+
+client = TestClient(app)
+
+def submit_review(request_id, rating, **categories):
+    data = {"request_id": request_id, "overall_rating": rating, "comments": "ok", **categories}
+    response = client.post("/reviews/response", data=data)
+    assert response.status_code == 200
+    return response.json()
+
+def test_profile_is_written_through_and_served_with_etag():
+    request_id = client.post("/reviews/request", data={
+        "requester_id": "2", "reviewer_email": "tenant@example.com", "request_type": "landlord_review"
+    }).json()["id"]
+    assert review_requests_db.get(request_id)["requester_id"] == "2"
+
+    submit_review(request_id, 5, payment_reliability=5)
+    first = client.get("/users/2/profile")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["total_reviews"] == len(reviews_about_user("2"))
+
+    hits_before = user_profiles.hits
+    unchanged = client.get("/users/2/profile", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+    assert user_profiles.hits == hits_before + 1
+
+    # A new review updates the cached profile in place and changes the ETag
+    submit_review(request_id, 2, communication=2)
+    changed = client.get("/users/2/profile", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+    reference = ai_review_analyzer.aggregate_user_profile(reviews_about_user("2"))
+    profile = changed.json()
+    assert {key: profile[key] for key in reference} == reference
+
+    stats = client.get("/stats").json()["user_profile_cache"]
+    assert stats["not_modified"] >= 1 and 0 < stats["hit_rate"] <= 1
+
+def test_unknown_user_profile_is_404():
+    assert client.get("/users/nobody/profile").status_code == 404
+
+def test_compressed_profile_revalidates_with_the_weak_etag():
+    # A fresh interpreter, since compression is configured when backend.index is imported
+    script = """
+from fastapi.testclient import TestClient
+from backend.index import app
+client = TestClient(app)
+request_id = client.post("/reviews/request", data={
+    "requester_id": "2", "reviewer_email": "tenant@example.com", "request_type": "landlord_review"
+}).json()["id"]
+client.post("/reviews/response", data={"request_id": request_id, "overall_rating": 4, "comments": "ok"})
+first = client.get("/users/2/profile", headers={"Accept-Encoding": "gzip"})
+assert first.headers["content-encoding"] == "gzip" and first.headers["etag"].startswith('W/"')
+again = client.get("/users/2/profile", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+assert again.status_code == 304, again.status_code
+"""
+    env = {**os.environ, "COMPRESSION_MIN_SIZE": "100"}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr